@@ -0,0 +1,169 @@
+# apps/api/app/_bench/_common.py
+#
+# Общая обвязка бенчмарков: временная SQLite-база, сидинг, счётчик SQL.
+# Импортировать ДО app.db — иначе engine уже создан на боевом DATABASE_URL.
+#
+# PostgreSQL: DATABASE_URL=postgresql+asyncpg://user@host/bench python -m app._bench.<name>
+# (база должна быть пустой/одноразовой — схема пересоздаётся).
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# одноразовый каталог прогона: bench.db и отдельные базы бенчмарков
+BENCH_DIR = Path(tempfile.mkdtemp(prefix="lt_bench_"))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{BENCH_DIR / 'bench.db'}")
+os.environ.setdefault("AUTH_MODE", "DEV")
+
+import hashlib
+import hmac
+import json
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from sqlalchemy import event, insert, delete, select, and_
+
+from app.db import Base, engine
+from app.models import User, Challenge, DailyLog
+from app.repositories.daily_summary_repo import rebuild_daily_summary
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+
+
+@contextmanager
+def timer():
+    out = {"ms": 0.0}
+    start = time.perf_counter()
+    try:
+        yield out
+    finally:
+        out["ms"] = (time.perf_counter() - start) * 1000
+
+
+async def reset_schema(bind=None) -> None:
+    async with (bind or engine).begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def truncate_all(bind=None) -> None:
+    async with (bind or engine).begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(delete(table))
+
+
+async def seed(
+    *,
+    users: int,
+    challenges_per_user: int,
+    days_of_logs: int = 0,
+    last_closed_date: date | None = None,
+    timezone: str = "UTC",
+    start_user_id: int = 1,
+    bind=None,
+) -> None:
+    """Быстрый сидинг через multi-row INSERT (без ORM-объектов)."""
+    today = date.today()
+    user_rows = [
+        {
+            "id": start_user_id + i,
+            "telegram_id": 10_000_000 + start_user_id + i,
+            "username": f"u{start_user_id + i}",
+            "timezone": timezone,
+            "last_closed_date": last_closed_date,
+        }
+        for i in range(users)
+    ]
+
+    ch_rows = []
+    log_rows = []
+    ch_id = (start_user_id - 1) * challenges_per_user
+    for u in user_rows:
+        for j in range(challenges_per_user):
+            ch_id += 1
+            ch_rows.append(
+                {
+                    "id": ch_id,
+                    "user_id": u["id"],
+                    "title": f"Challenge {j}",
+                    "type": "DO",
+                    "miss_policy": "FAIL",
+                    "is_active": True,
+                    "is_template": False,
+                }
+            )
+            for k in range(1, days_of_logs + 1):
+                log_rows.append(
+                    {
+                        "user_id": u["id"],
+                        "challenge_id": ch_id,
+                        "date": today - timedelta(days=k),
+                        "origin": "MANUAL",
+                        "flag_min": k % 4 == 0,
+                        "flag_bonus": k % 4 == 1,
+                        "flag_skip": k % 4 == 2,
+                        "flag_fail": k % 4 == 3,
+                        "minutes_fact": 10 + k % 30,
+                    }
+                )
+
+    async with (bind or engine).begin() as conn:
+        for table, rows in (
+            (User.__table__, user_rows),
+            (Challenge.__table__, ch_rows),
+            (DailyLog.__table__, log_rows),
+        ):
+            if rows:
+                await conn.execute(insert(table), rows)
+        # логи вставлены в обход сервисов — сводку дня собираем заново
+        if log_rows:
+            await conn.run_sync(rebuild_daily_summary)
+
+
+async def orm_challenge_logs_since(db, user_id: int, challenge_id: int | None, since: date) -> list:
+    """Прежний путь чтения истории: DailyLog ORM-объектами (база для сравнения в бенчах)."""
+    conditions = [DailyLog.user_id == user_id, DailyLog.date >= since]
+    if challenge_id is not None:
+        conditions.append(DailyLog.challenge_id == challenge_id)
+    q = await db.execute(select(DailyLog).where(and_(*conditions)).order_by(DailyLog.date.desc()))
+    return q.scalars().all()
+
+
+def sign_init_data(tg_user: dict, bot_token: str, auth_date: int | None = None) -> str:
+    """initData в формате Telegram WebApp, подписанный токеном бота."""
+    data = {
+        "auth_date": str(auth_date if auth_date is not None else int(time.time())),
+        "query_id": "AAbench",
+        "user": json.dumps(tg_user, separators=(",", ":")),
+    }
+    check_string = "\n".join(f"{k}={v}" for k, v in sorted(data.items()))
+    secret = hmac.new(b"WebAppData", bot_token.encode("utf-8"), hashlib.sha256).digest()
+    data["hash"] = hmac.new(secret, check_string.encode("utf-8"), hashlib.sha256).hexdigest()
+    return urlencode(data)
+
+
+def print_table(title: str, header: list[str], rows: list[list]) -> None:
+    print(f"\n== {title}")
+    widths = [max(len(str(x)) for x in col) for col in zip(header, *rows)]
+    fmt = "  ".join(f"{{:>{w}}}" for w in widths)
+    print(fmt.format(*header))
+    for r in rows:
+        print(fmt.format(*r))
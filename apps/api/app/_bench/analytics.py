@@ -0,0 +1,86 @@
+# apps/api/app/_bench/analytics.py
+#
+# python -m app._bench.analytics
+#
+# /challenges/{id}/analytics: прежний способ (90 дней логов ORM-объектами,
+# compute_status_view в цикле) против кортежей со статусом из SQL и против кэша.
+
+from app._bench._common import count_queries, timer, reset_schema, seed, print_table, orm_challenge_logs_since
+
+import asyncio
+from datetime import date, timedelta
+from statistics import median
+
+from sqlalchemy import select
+
+from app.db import SessionLocal
+from app.models import User
+from app.services.challenge_analytics import (
+    ANALYTICS_WINDOWS,
+    analytics_cache,
+    build_challenge_analytics,
+    get_challenge_analytics,
+)
+from app.services.status import compute_status_view
+
+CHALLENGES = 10
+ITERATIONS = 200
+CHALLENGE_ID = 1
+
+
+async def _orm_loop(db, user, today: date) -> dict:
+    logs = await orm_challenge_logs_since(db, user.id, CHALLENGE_ID, today - timedelta(days=89))
+    out = {}
+    for days in ANALYTICS_WINDOWS:
+        since = today - timedelta(days=days - 1)
+        totals = {"MIN": 0, "BONUS": 0, "SKIP": 0, "FAIL": 0}
+        minutes = []
+        for log in logs:
+            if log.date < since:
+                continue
+            status = compute_status_view(log)
+            if status:
+                totals[status] += 1
+            if log.minutes_fact is not None:
+                minutes.append(log.minutes_fact)
+        out[days] = (totals, sum(minutes), median(minutes) if minutes else None)
+    return out
+
+
+async def _sql(db, user, today: date) -> dict:
+    return await build_challenge_analytics(db, user.id, CHALLENGE_ID, today)
+
+
+async def _cached(db, user, today: date) -> dict:
+    return await get_challenge_analytics(db, user, CHALLENGE_ID)
+
+
+async def _per_call(fn) -> list:
+    async with SessionLocal() as db:
+        user = (await db.execute(select(User).where(User.id == 1))).scalar_one()
+        today = date.today()
+        analytics_cache.clear()
+        await fn(db, user, today)  # прогрев кэша компиляции (и analytics_cache)
+        with count_queries() as q, timer() as t:
+            for _ in range(ITERATIONS):
+                await fn(db, user, today)
+    return [f"{q.count / ITERATIONS:g}", f"{t['ms'] * 1000 / ITERATIONS:.0f}"]
+
+
+async def main() -> None:
+    rows = []
+    for years in (1, 3):
+        await reset_schema()
+        await seed(users=3, challenges_per_user=CHALLENGES, days_of_logs=years * 365)
+        for name, fn in (("ORM + python loop", _orm_loop), ("tuples + one pass", _sql), ("cached", _cached)):
+            rows.append([years, name, *await _per_call(fn)])
+
+    print_table(
+        f"analytics of 1 challenge, 3 users x {CHALLENGES} challenges",
+        ["years", "path", "sql/call", "us/call"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
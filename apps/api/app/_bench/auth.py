@@ -0,0 +1,63 @@
+# apps/api/app/_bench/auth.py
+#
+# python -m app._bench.auth
+#
+# get_current_user в PROD-режиме: холодный путь (HMAC секрета + HMAC строки +
+# json + SELECT users по telegram_id) против тёплого (кэш initData + кэш
+# telegram_id -> id, строка users — SELECT по первичному ключу).
+
+from app._bench._common import (
+    count_queries,
+    timer,
+    reset_schema,
+    seed,
+    sign_init_data,
+    print_table,
+)
+
+import asyncio
+
+from app.db import SessionLocal
+from app.settings import settings
+from app.core import auth, security
+
+BOT_TOKEN = "123456:bench-token"
+ITERATIONS = 2000
+
+
+def _drop_caches() -> None:
+    security._webapp_secret_key.cache_clear()
+    security.init_data_cache.clear()
+    auth.user_cache.clear()
+
+
+async def _measure(label: str, cold: bool, init_data: str) -> list:
+    async with SessionLocal() as db:
+        await auth.get_current_user(db=db, x_telegram_init_data=init_data)
+
+        with count_queries() as q, timer() as t:
+            for _ in range(ITERATIONS):
+                if cold:
+                    _drop_caches()
+                await auth.get_current_user(db=db, x_telegram_init_data=init_data)
+
+    return [label, f"{q.count / ITERATIONS:.2f}", f"{t['ms'] * 1000 / ITERATIONS:.1f}"]
+
+
+async def main() -> None:
+    settings.auth_mode = "PROD"
+    settings.telegram_bot_token = BOT_TOKEN
+
+    await reset_schema()
+    await seed(users=1, challenges_per_user=0)
+    init_data = sign_init_data({"id": 10_000_001, "username": "u1"}, BOT_TOKEN)
+
+    rows = [
+        await _measure("cold (no caches)", True, init_data),
+        await _measure("warm", False, init_data),
+    ]
+    print_table("get_current_user", ["path", "sql/call", "us/call"], rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+# apps/api/app/_bench/auto_assign.py
+#
+# python -m app._bench.auto_assign
+#
+# Стоимость одного тика auto_assign_missed:
+#  - при фиксированном числе "должников" и растущей базе — почти константа;
+#  - растёт линейно по числу пользователей, чей день надо закрыть;
+#  - догон после простоя: весь диапазон одним проходом против прежнего
+#    "один день за тик" (эмулируется chunk_days=1 по дню на вызов).
+
+from app._bench._common import (
+    count_queries,
+    timer,
+    reset_schema,
+    seed,
+    print_table,
+)
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert
+
+from app.db import SessionLocal, engine
+from app.models import DailyLog
+from app.services.auto_assign import auto_assign_missed, close_due_users
+from app.services.challenge_stats import recompute_all_challenge_stats
+
+CHALLENGES_PER_USER = 5
+
+
+async def _tick(total_users: int, due_users: int) -> list:
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+
+    await reset_schema()
+    # уже закрытые — не должны ничего стоить
+    await seed(
+        users=total_users - due_users,
+        challenges_per_user=CHALLENGES_PER_USER,
+        last_closed_date=yesterday,
+        start_user_id=1,
+    )
+    # должники: вчера не закрыто
+    await seed(
+        users=due_users,
+        challenges_per_user=CHALLENGES_PER_USER,
+        last_closed_date=yesterday - timedelta(days=1),
+        start_user_id=total_users - due_users + 1,
+    )
+    # рабочее состояние: счётчики челленджей уже есть (иначе каждый — пересчёт)
+    await recompute_all_challenge_stats()
+
+    with count_queries() as q, timer() as t:
+        await auto_assign_missed()
+
+    return [total_users, due_users, due_users * CHALLENGES_PER_USER, q.count, f"{t['ms']:.1f}"]
+
+
+async def _catch_up(users: int, backlog: int, logged_today: bool) -> list:
+    today = datetime.now(timezone.utc).date()
+    last_closed = today - timedelta(days=backlog + 1)
+
+    await reset_schema()
+    await seed(users=users, challenges_per_user=CHALLENGES_PER_USER, days_of_logs=90, last_closed_date=last_closed)
+    async with engine.begin() as conn:
+        # простой: после last_closed_date логов нет
+        await conn.execute(delete(DailyLog).where(DailyLog.date > last_closed))
+        if logged_today:
+            # ...кроме ручных отметок "сегодня" — закрытие пишет в прошлое
+            await conn.execute(
+                insert(DailyLog.__table__),
+                [
+                    {"user_id": (cid - 1) // CHALLENGES_PER_USER + 1, "challenge_id": cid, "date": today,
+                     "origin": "MANUAL", "flag_min": True, "flag_bonus": False,
+                     "flag_skip": False, "flag_fail": False}
+                    for cid in range(1, users * CHALLENGES_PER_USER + 1)
+                ],
+            )
+    await recompute_all_challenge_stats()
+    return [users, backlog, "yes" if logged_today else "no"]
+
+
+async def _backlog(users: int, backlog: int, logged_today: bool) -> list:
+    rows = []
+    for per_day in (True, False):
+        row = await _catch_up(users, backlog, logged_today)
+        yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+        with count_queries() as q, timer() as t:
+            if per_day:
+                async with SessionLocal() as db:
+                    for n in range(backlog, 0, -1):
+                        await close_due_users(db, "UTC", yesterday - timedelta(days=n - 1), chunk_days=1)
+            else:
+                await auto_assign_missed()
+        rows.append([*row, "day per tick" if per_day else "one pass", q.count, f"{t['ms']:.1f}"])
+    return rows
+
+
+async def main() -> None:
+    header = ["users", "due", "rows_written", "sql", "ms"]
+
+    rows = [await _tick(5000, due) for due in (0, 50, 500, 2000, 5000)]
+    print_table("growing due users, fixed 5000 users", header, rows)
+
+    rows = [await _tick(total, 100) for total in (100, 1000, 5000, 20000)]
+    print_table("fixed 100 due users, growing base", header, rows)
+
+    rows = []
+    for backlog, logged_today in ((1, False), (7, False), (30, False), (7, True)):
+        rows += await _backlog(1000, backlog, logged_today)
+    print_table(
+        f"catch-up after downtime, 1000 users x {CHALLENGES_PER_USER}",
+        ["users", "backlog days", "logged today", "path", "sql", "ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
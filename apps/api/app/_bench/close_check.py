@@ -0,0 +1,186 @@
+# apps/api/app/_bench/close_check.py
+#
+# python -m app._bench.close_check [--seeds 6] [--users 40]   # exit 1 при расхождении
+#
+# Рандомизированная сверка закрытия дня с полным перебором: случайные
+# пользователи (last_closed_date от "не закрывался" до 40 дней назад),
+# челленджи DO/NO_DO, MIN/FAIL, активные и нет, дырявая история логов.
+# После close_due_users (мелкие пачки, окна chunk_days = 1/3/7) проверяется:
+#  - last_closed_date = вчера у всех, кто был позади;
+#  - у активного челленджа есть лог на каждый закрытый день, новые — AUTO
+#    с флагом по политике; неактивные не тронуты;
+#  - challenge_stats (инкрементальные) = пересчёт с нуля;
+#  - daily_summary без расхождений с daily_log (find_summary_drift);
+#  - второй проход ничего не пишет.
+
+from app._bench._common import reset_schema, print_table
+
+import argparse
+import asyncio
+import random
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+
+from app.db import SessionLocal, engine
+from app.models import Challenge, ChallengeStats, DailyLog, User
+from app.repositories.daily_summary_repo import find_summary_drift, rebuild_daily_summary
+from app.services.auto_assign import close_due_users
+from app.services.challenge_stats import recompute_all_challenge_stats, recompute_stats
+
+CHUNKS = (1, 3, 7)
+# мелкая пачка — чтобы keyset-пагинация пользователей шла в несколько страниц
+BATCH_SIZE = 7
+HISTORY_DAYS = 60
+FLAGS = ("MIN", "BONUS", "SKIP", "FAIL")
+
+
+async def _build(rnd: random.Random, users: int, yesterday: date) -> tuple[list, list, set]:
+    today = yesterday + timedelta(days=1)
+    backlog = (None, today, yesterday, yesterday - timedelta(days=1), yesterday - timedelta(days=3),
+               yesterday - timedelta(days=10), yesterday - timedelta(days=40))
+    user_rows, ch_rows, log_rows = [], [], []
+    cid = 0
+    for uid in range(1, users + 1):
+        user_rows.append({
+            "id": uid,
+            "telegram_id": uid,
+            "username": f"u{uid}",
+            "timezone": "UTC",
+            "last_closed_date": rnd.choice(backlog),
+        })
+        for _ in range(rnd.randint(0, 4)):
+            cid += 1
+            ch_rows.append({
+                "id": cid,
+                "user_id": uid,
+                "title": f"Challenge {cid}",
+                "type": rnd.choice(("DO", "DO", "NO_DO")),
+                "miss_policy": rnd.choice(("FAIL", "MIN")),
+                "is_active": rnd.random() > 0.1,
+                "is_template": False,
+            })
+            for back in range(HISTORY_DAYS):
+                if rnd.random() < 0.5:
+                    continue
+                flag = rnd.choice(FLAGS)
+                log_rows.append({
+                    "user_id": uid,
+                    "challenge_id": cid,
+                    "date": today - timedelta(days=back),
+                    "origin": "MANUAL",
+                    "flag_min": flag == "MIN",
+                    "flag_bonus": flag == "BONUS",
+                    "flag_skip": flag == "SKIP",
+                    "flag_fail": flag == "FAIL",
+                    "minutes_fact": rnd.choice((None, 5)),
+                })
+
+    await reset_schema()
+    async with engine.begin() as conn:
+        await conn.execute(insert(User.__table__), user_rows)
+        if ch_rows:
+            await conn.execute(insert(Challenge.__table__), ch_rows)
+        if log_rows:
+            await conn.execute(insert(DailyLog.__table__), log_rows)
+        await conn.run_sync(rebuild_daily_summary)
+    await recompute_all_challenge_stats()
+    return user_rows, ch_rows, {(log["challenge_id"], log["date"]) for log in log_rows}
+
+
+def _check_logs(users: list, challenges: list, had: set, logs: dict, closed: dict, yesterday: date) -> list[str]:
+    errors = []
+    last_closed = {u["id"]: u["last_closed_date"] for u in users}
+    for user_id, before in last_closed.items():
+        expected = before if before is not None and before >= yesterday else yesterday
+        if closed[user_id] != expected:
+            errors.append(f"user {user_id}: last_closed_date {closed[user_id]}, expected {expected}")
+
+    for ch in challenges:
+        before = last_closed[ch["user_id"]]
+        if before is not None and before >= yesterday:
+            continue
+        policy = "MIN" if ch["type"] == "NO_DO" else ch["miss_policy"]
+        day = before + timedelta(days=1) if before is not None else yesterday
+        while day <= yesterday:
+            key = (ch["id"], day)
+            log = logs.get(key)
+            if key in had:
+                pass
+            elif not ch["is_active"]:
+                if log is not None:
+                    errors.append(f"challenge {ch['id']} {day}: inactive challenge got a log")
+            elif log is None:
+                errors.append(f"challenge {ch['id']} {day}: day left open")
+            elif log.origin != "AUTO" or log.flag_min != (policy == "MIN") or log.flag_fail != (policy != "MIN"):
+                errors.append(f"challenge {ch['id']} {day}: wrong AUTO log for policy {policy}")
+            day += timedelta(days=1)
+    return errors
+
+
+async def _check(seed: int, users: int, chunk_days: int) -> tuple[list, list[str]]:
+    rnd = random.Random(seed)
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    user_rows, ch_rows, had = await _build(rnd, users, yesterday)
+
+    async with SessionLocal() as db:
+        written = await close_due_users(db, "UTC", yesterday, batch_size=BATCH_SIZE, chunk_days=chunk_days)
+        again = await close_due_users(db, "UTC", yesterday, batch_size=BATCH_SIZE, chunk_days=chunk_days)
+
+    async with SessionLocal() as db:
+        logs = {(log.challenge_id, log.date): log for log in (await db.execute(select(DailyLog))).scalars()}
+        closed = dict((await db.execute(select(User.id, User.last_closed_date))).tuples().all())
+        stats = {s.challenge_id: s for s in (await db.execute(select(ChallengeStats))).scalars()}
+        fresh = await recompute_stats(db, {ch["id"]: ch["user_id"] for ch in ch_rows})
+
+    errors = _check_logs(user_rows, ch_rows, had, logs, closed, yesterday)
+    if again:
+        errors.append(f"second pass wrote {again} rows")
+    for expected in fresh:
+        current = stats.get(expected["challenge_id"])
+        if current is None:
+            if expected["last_date"] is not None:
+                errors.append(f"challenge {expected['challenge_id']}: no challenge_stats row")
+            continue
+        for name, value in expected.items():
+            if getattr(current, name) != value:
+                errors.append(f"challenge {expected['challenge_id']}: stats {name} {getattr(current, name)} != {value}")
+                break
+
+    async with engine.connect() as conn:
+        drift, sample = await conn.run_sync(find_summary_drift)
+    if drift:
+        errors.append(f"daily_summary drift: {drift} day(s), e.g. {sample}")
+
+    return [seed, chunk_days, len(user_rows), len(ch_rows), written, len(errors)], errors
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="randomized day-close check")
+    parser.add_argument("--seeds", type=int, default=6)
+    parser.add_argument("--users", type=int, default=40)
+    args = parser.parse_args()
+
+    rows, failures = [], []
+    for seed in range(args.seeds):
+        for chunk_days in CHUNKS:
+            row, errors = await _check(seed, args.users, chunk_days)
+            rows.append(row)
+            failures += [f"seed {seed} chunk {chunk_days}: {e}" for e in errors]
+
+    print_table(
+        "close_due_users vs brute force",
+        ["seed", "chunk days", "users", "challenges", "auto rows", "errors"],
+        rows,
+    )
+    if failures:
+        print("\n" + "\n".join(failures[:20]))
+        print(f"\nCLOSE CHECK FAIL: {len(failures)} error(s)")
+        return 1
+    print("\nCLOSE CHECK OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
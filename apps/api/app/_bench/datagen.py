@@ -0,0 +1,187 @@
+# apps/api/app/_bench/datagen.py
+#
+# python -m app._bench.datagen --users 1000 --challenges 5 --years 2 [--seed 1]
+#
+# Синтетический набор данных для нагрузочных прогонов: N пользователей,
+# M челленджей на каждого, Y лет daily_log. Детерминирован по --seed.
+# Логи пишутся пачками (executemany по CHUNK_ROWS), без накопления всей
+# истории в памяти; после вставки собираются daily_summary и challenge_stats —
+# база сразу в установившемся состоянии, как у живого сервера.
+#
+# Последние `open_days` дней (по умолчанию 3) остаются без логов, а
+# last_closed_date стоит перед ними: первый тик auto_assign_missed закрывает
+# весь этот диапазон всем пользователям одним проходом, следующие — пустые
+# (см. _bench/load.py).
+#
+# Соглашения (на них опирается load.py): users.id = 1..N,
+# telegram_id = 10_000_000 + id, челленджи пользователя u — id (u-1)*M+1 .. u*M.
+
+from app._bench._common import timer, reset_schema, print_table
+
+import argparse
+import asyncio
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from app.db import engine
+from app.models import User, Challenge, DailyLog
+from app.repositories.daily_summary_repo import rebuild_daily_summary
+from app.services.challenge_stats import recompute_all_challenge_stats
+
+CHUNK_ROWS = 20_000
+TELEGRAM_ID_BASE = 10_000_000
+
+TIMEZONES = ("UTC", "Europe/Vilnius", "America/New_York", "Asia/Tokyo")
+
+# доля дней по исходу (остаток — день без лога)
+DAY_OUTCOMES = (("MIN", 0.45), ("BONUS", 0.15), ("SKIP", 0.08), ("FAIL", 0.22))
+
+
+def telegram_id(user_id: int) -> int:
+    return TELEGRAM_ID_BASE + user_id
+
+
+def challenge_ids(user_id: int, challenges: int) -> range:
+    return range((user_id - 1) * challenges + 1, user_id * challenges + 1)
+
+
+def _outcome(rnd: random.Random) -> str | None:
+    x = rnd.random()
+    for flag, share in DAY_OUTCOMES:
+        if x < share:
+            return flag
+        x -= share
+    return None
+
+
+def _log_row(rnd: random.Random, user_id: int, challenge_id: int, day: date, flag: str) -> dict:
+    done = flag in ("MIN", "BONUS")
+    # FAIL чаще проставляет закрытие дня, остальное — руками
+    auto = flag == "FAIL" and rnd.random() < 0.7
+    return {
+        "user_id": user_id,
+        "challenge_id": challenge_id,
+        "date": day,
+        "origin": "AUTO" if auto else "MANUAL",
+        "flag_min": flag == "MIN",
+        "flag_bonus": flag == "BONUS",
+        "flag_skip": flag == "SKIP",
+        "flag_fail": flag == "FAIL",
+        "minutes_fact": rnd.randint(5, 90) if done and rnd.random() < 0.6 else None,
+        "comment": None if done or auto else "bench",
+    }
+
+
+async def generate(
+    *,
+    users: int,
+    challenges: int,
+    years: float,
+    seed: int = 1,
+    open_days: int = 3,
+    bind=None,
+) -> dict:
+    """Пересоздаёт схему и заполняет её; возвращает параметры и объёмы набора."""
+    bind = bind or engine
+    rnd = random.Random(seed)
+    today = date.today()
+    last_closed = today - timedelta(days=open_days + 1)
+    history_days = int(years * 365)
+
+    await reset_schema(bind)
+
+    user_rows = [
+        {
+            "id": uid,
+            "telegram_id": telegram_id(uid),
+            "username": f"u{uid}",
+            "timezone": rnd.choice(TIMEZONES),
+            "last_closed_date": last_closed,
+        }
+        for uid in range(1, users + 1)
+    ]
+    ch_rows = [
+        {
+            "id": cid,
+            "user_id": uid,
+            "title": f"Challenge {cid}",
+            "type": "NO_DO" if rnd.random() < 0.2 else "DO",
+            "miss_policy": "FAIL",
+            "is_active": True,
+            "is_template": False,
+        }
+        for uid in range(1, users + 1)
+        for cid in challenge_ids(uid, challenges)
+    ]
+    for ch in ch_rows:
+        if ch["type"] == "NO_DO":
+            ch["miss_policy"] = "MIN"
+
+    logs = 0
+    async with bind.begin() as conn:
+        await conn.execute(insert(User.__table__), user_rows)
+        await conn.execute(insert(Challenge.__table__), ch_rows)
+
+        chunk: list[dict] = []
+        for ch in ch_rows:
+            # челлендж начат в случайный момент окна истории
+            started = rnd.randint(0, history_days // 2) if history_days else 0
+            for back in range(history_days - started, 0, -1):
+                day = last_closed - timedelta(days=back - 1)
+                flag = _outcome(rnd)
+                if flag is None:
+                    continue
+                chunk.append(_log_row(rnd, ch["user_id"], ch["id"], day, flag))
+                if len(chunk) >= CHUNK_ROWS:
+                    await conn.execute(insert(DailyLog.__table__), chunk)
+                    logs += len(chunk)
+                    chunk = []
+        if chunk:
+            await conn.execute(insert(DailyLog.__table__), chunk)
+            logs += len(chunk)
+
+        await conn.run_sync(rebuild_daily_summary)
+
+    if bind is engine:
+        # пересчёт идёт через SessionLocal приложения
+        await recompute_all_challenge_stats()
+
+    return {
+        "users": users,
+        "challenges_per_user": challenges,
+        "years": years,
+        "seed": seed,
+        "open_days": open_days,
+        "daily_log_rows": logs,
+    }
+
+
+def add_dataset_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--challenges", type=int, default=5)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_dataset_args(parser)
+    args = parser.parse_args()
+
+    with timer() as t:
+        info = await generate(
+            users=args.users, challenges=args.challenges, years=args.years, seed=args.seed
+        )
+    rows = info["daily_log_rows"]
+    print_table(
+        f"datagen ({engine.url.render_as_string(hide_password=True)})",
+        ["users", "challenges", "years", "daily_log", "s", "rows/s"],
+        [[args.users, args.users * args.challenges, args.years, rows,
+          f"{t['ms'] / 1000:.1f}", f"{rows / (t['ms'] / 1000):.0f}"]],
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+# apps/api/app/_bench/export.py
+#
+# python -m app._bench.export
+#
+# Потоковый экспорт: пиковая память (tracemalloc) и время против длины истории.
+# Пик должен оставаться ~постоянным — в памяти одна пачка курсора.
+
+from app._bench._common import timer, reset_schema, seed, print_table
+
+import asyncio
+import tracemalloc
+
+from app.services.export_service import export_csv, export_ndjson
+
+CHALLENGES = 10
+
+
+async def _drain(gen) -> tuple[int, int]:
+    chunks = size = 0
+    async for chunk in gen:
+        chunks += 1
+        size += len(chunk)
+    return chunks, size
+
+
+async def _measure(fn, years: int) -> list:
+    # время — без tracemalloc (он замедляет аллокации в разы), пик — отдельным проходом
+    with timer() as t:
+        _, size = await _drain(fn(1))
+    tracemalloc.start()
+    await _drain(fn(1))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return [
+        fn.__name__,
+        years,
+        years * 365 * CHALLENGES,
+        f"{size / 1024 / 1024:.1f}",
+        f"{peak / 1024:.0f}",
+        f"{t['ms']:.0f}",
+    ]
+
+
+async def main() -> None:
+    rows = []
+    for years in (1, 3, 10):
+        await reset_schema()
+        await seed(users=1, challenges_per_user=CHALLENGES, days_of_logs=years * 365)
+        for fn in (export_ndjson, export_csv):
+            await _drain(fn(1))  # прогрев кэша компиляции
+            rows.append(await _measure(fn, years))
+
+    print_table(
+        "export, 1 user",
+        ["format", "years", "rows", "out MiB", "peak KiB", "ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+# apps/api/app/_bench/heatmap.py
+#
+# python -m app._bench.heatmap
+#
+# Годовая карта: прежний путь (год логов ORM-объектами -> список словарей)
+# против /history/heatmap (кортежи/daily_summary -> два base64-массива),
+# с кодированием на NumPy и на чистом Python. Размер — тело JSON-ответа.
+
+from app._bench._common import count_queries, timer, reset_schema, seed, print_table, orm_challenge_logs_since
+
+import asyncio
+import json
+from datetime import date, timedelta
+
+from app.db import SessionLocal
+from app.services import heatmap
+from app.services.status import compute_status_view
+
+CHALLENGES = 10
+ITERATIONS = 200
+USER_ID = 1
+
+
+async def _orm_year(db, challenge_id: int | None) -> list:
+    since = date.today() - timedelta(days=364)
+    logs = await orm_challenge_logs_since(db, USER_ID, challenge_id, since)
+    return [
+        {"date": str(log.date), "challenge_id": log.challenge_id, "status_view": compute_status_view(log)}
+        for log in logs
+    ]
+
+
+def _use_encoders(numpy: bool) -> None:
+    if numpy:
+        heatmap.encode_counts, heatmap.encode_flags = heatmap._encode_counts_np, heatmap._encode_flags_np
+    else:
+        heatmap.encode_counts, heatmap.encode_flags = heatmap._encode_counts_py, heatmap._encode_flags_py
+
+
+async def _heatmap_year(db, challenge_id: int | None) -> dict:
+    return await heatmap.build_heatmap(db, USER_ID, date.today().year, challenge_id)
+
+
+async def _per_call(fn, challenge_id: int | None) -> list:
+    async with SessionLocal() as db:
+        body = await fn(db, challenge_id)  # прогрев кэша компиляции
+        with count_queries() as q, timer() as t:
+            for _ in range(ITERATIONS):
+                await fn(db, challenge_id)
+    size = len(json.dumps(body, separators=(",", ":")))
+    return [q.count // ITERATIONS, f"{t['ms'] * 1000 / ITERATIONS:.0f}", size]
+
+
+def _encode_costs() -> list:
+    counts = [(i + 1, i % 3, i % 2, int(i % 5 == 0), int(i % 4 == 0)) for i in range(365)]
+    flags = [(doy, bool(a), bool(b), bool(c), bool(d)) for doy, a, b, c, d in counts]
+    n = ITERATIONS * 10
+    out = []
+    for name, rows, np_fn, py_fn in (
+        ("counts", counts, heatmap._encode_counts_np, heatmap._encode_counts_py),
+        ("flags", flags, heatmap._encode_flags_np, heatmap._encode_flags_py),
+    ):
+        row = [name]
+        for fn in (np_fn, py_fn):
+            with timer() as t:
+                for _ in range(n):
+                    fn(rows, 365)
+            row.append(f"{t['ms'] * 1000 / n:.0f}")
+        out.append(row)
+    return out
+
+
+async def main() -> None:
+    await reset_schema()
+    # два года истории: окно года должно отсекаться индексом, а не фильтром
+    await seed(users=3, challenges_per_user=CHALLENGES, days_of_logs=730)
+
+    rows = []
+    for label, challenge_id in (("all challenges", None), ("one challenge", 1)):
+        rows.append([label, "ORM logs -> dicts", *await _per_call(_orm_year, challenge_id)])
+        for numpy in (True, False):
+            _use_encoders(numpy)
+            rows.append(
+                [
+                    label,
+                    "heatmap numpy" if numpy else "heatmap python",
+                    *await _per_call(_heatmap_year, challenge_id),
+                ]
+            )
+
+    print_table(
+        f"year heatmap, 1 of 3 users x {CHALLENGES} challenges",
+        ["scope", "path", "sql", "us/call", "json bytes"],
+        rows,
+    )
+    print_table("encoding alone, 365 rows, us", ["input", "numpy", "python"], _encode_costs())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
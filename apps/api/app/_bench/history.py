@@ -0,0 +1,106 @@
+# apps/api/app/_bench/history.py
+#
+# python -m app._bench.history
+#
+# /history/days: готовые строки daily_summary против прежнего GROUP BY
+# по daily_log, на пользователях с историей в несколько лет.
+# Окно 30 дней (обычный экран) и 365 (годовой обзор).
+# Плюс цена записи: ручной upsert со сводкой дня.
+
+from app._bench._common import count_queries, timer, reset_schema, seed, print_table
+
+import asyncio
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.db import SessionLocal
+from app.models import DailyLog, User
+from app.repositories.daily_summary_repo import summary_from_logs
+from app.schemas import DailyFlagSet
+from app.services.daily_log_service import upsert_daily_log
+from app.services.history_service import build_days_history
+
+CHALLENGES = 10
+ITERATIONS = 200
+USER_ID = 1
+
+
+async def _legacy_days(db, user_id: int, days: int, before: date | None = None) -> list:
+    end = before or (date.today() + timedelta(days=1))
+    since = end - timedelta(days=days)
+    q = await db.execute(
+        summary_from_logs(
+            DailyLog.user_id == user_id,
+            DailyLog.date >= since,
+            DailyLog.date < end,
+        ).order_by(DailyLog.date.desc())
+    )
+    rows = q.all()
+    await db.execute(
+        select(DailyLog.id)
+        .where(DailyLog.user_id == user_id, DailyLog.date < since)
+        .limit(1)
+    )
+    return rows
+
+
+async def _summary_days(db, user_id: int, days: int) -> list:
+    items, _ = await build_days_history(db, user_id, days)
+    return items
+
+
+async def _per_call(fn, *args) -> tuple[int, float]:
+    async with SessionLocal() as db:
+        await fn(db, *args)  # прогрев кэша компиляции
+        with count_queries() as q, timer() as t:
+            for _ in range(ITERATIONS):
+                await fn(db, *args)
+    return q.count // ITERATIONS, t["ms"] * 1000 / ITERATIONS
+
+
+async def _write_cost() -> str:
+    async with SessionLocal() as db:
+        user = (await db.execute(select(User).where(User.id == USER_ID))).scalar_one()
+        payload = DailyFlagSet(challenge_id=1, flag="MIN", date=date.today() - timedelta(days=3))
+        await upsert_daily_log(db, user, payload)
+        with count_queries() as q, timer() as t:
+            for i in range(ITERATIONS):
+                payload.flag = ("MIN", "FAIL")[i % 2]
+                await upsert_daily_log(db, user, payload)
+    return f"{q.count // ITERATIONS} sql, {t['ms'] * 1000 / ITERATIONS:.0f} us"
+
+
+async def main() -> None:
+    rows = []
+    writes = []
+    for years in (1, 3, 10):
+        await reset_schema()
+        # соседи той же длины: индексы по user_id должны отсекать чужие строки
+        await seed(users=5, challenges_per_user=CHALLENGES, days_of_logs=years * 365)
+        for days in (30, 365):
+            legacy_sql, legacy_us = await _per_call(_legacy_days, USER_ID, days)
+            summary_sql, summary_us = await _per_call(_summary_days, USER_ID, days)
+            rows.append(
+                [
+                    years,
+                    days,
+                    legacy_sql,
+                    f"{legacy_us:.0f}",
+                    summary_sql,
+                    f"{summary_us:.0f}",
+                    f"x{legacy_us / summary_us:.1f}",
+                ]
+            )
+        writes.append([years, await _write_cost()])
+
+    print_table(
+        f"/history/days, 1 of 5 users x {CHALLENGES} challenges, us/call",
+        ["years", "window", "group by sql", "group by us", "summary sql", "summary us", "speedup"],
+        rows,
+    )
+    print_table("manual upsert (logs + stats + daily_summary)", ["years", "cost"], writes)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
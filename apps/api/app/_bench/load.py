@@ -0,0 +1,286 @@
+# apps/api/app/_bench/load.py
+#
+# python -m app._bench.load --users 200 --years 1 --mix mixed --concurrency 16 --duration 20 \
+#     --out load.json [--baseline prev.json]
+#
+# Сквозной нагрузочный прогон: datagen-набор -> асинхронные клиенты с
+# подписанным X-Telegram-Init-Data (PROD-авторизация) по /today,
+# /daily-log/upsert, /history/days, /history/day/{day}, /challenges в
+# заданной пропорции -> K тиков auto_assign_missed (мс, SQL, записанные строки).
+# Итог — JSON-отчёт (p50/p95/p99, rps, ошибки по эндпоинтам + meta: сборка,
+# диалект, набор, смесь, seed); --baseline печатает разницу с прошлым отчётом.
+#
+# По умолчанию приложение крутится в процессе (httpx.ASGITransport, без
+# lifespan: планировщик не стартует и не мешает тикам). --url — внешний
+# сервер с тем же TELEGRAM_BOT_TOKEN и уже заполненной базой (datagen с теми
+# же --users/--challenges): локальная база не трогается, тики не меряются —
+# в отчёте только задержки эндпоинтов, meta.dialect = "remote".
+# --no-generate — взять уже заполненную базу (те же --users/--challenges).
+
+from app._bench._common import count_queries, timer, sign_init_data, print_table
+from app._bench.datagen import add_dataset_args, generate, telegram_id, challenge_ids
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import func, select
+
+from app.db import engine, SessionLocal
+from app.main import app
+from app.models import DailyLog
+from app.services.auto_assign import auto_assign_missed
+from app.services.health_sampler import latency_percentiles, resolve_build
+from app.settings import settings
+
+BOT_TOKEN = "123456:bench-token"
+
+# доли запросов по эндпоинтам
+MIXES = {
+    "read": {"today": 50, "history_days": 20, "history_day": 15, "challenges": 15},
+    "mixed": {"today": 40, "upsert": 25, "history_days": 15, "history_day": 10, "challenges": 10},
+    "write": {"today": 20, "upsert": 70, "history_days": 5, "history_day": 5},
+}
+
+ENDPOINTS = {
+    "today": "GET /today",
+    "upsert": "POST /daily-log/upsert",
+    "history_days": "GET /history/days",
+    "history_day": "GET /history/day/{day}",
+    "challenges": "GET /challenges",
+}
+
+UPSERT_FLAGS = ("MIN", "MIN", "BONUS", "SKIP", "FAIL")
+
+
+class Driver:
+    def __init__(self, client: httpx.AsyncClient, users: int, challenges: int, history_days: int):
+        self.client = client
+        self.users = users
+        self.challenges = challenges
+        self.history_days = max(history_days, 1)
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self._headers: dict[int, dict] = {}
+
+    def headers(self, user_id: int) -> dict:
+        # подпись один раз на пользователя: initData живёт сутки
+        h = self._headers.get(user_id)
+        if h is None:
+            init_data = sign_init_data({"id": telegram_id(user_id), "username": f"u{user_id}"}, BOT_TOKEN)
+            h = self._headers[user_id] = {"X-Telegram-Init-Data": init_data}
+        return h
+
+    def _request(self, rnd: random.Random, kind: str, user_id: int) -> tuple[str, str, dict | None]:
+        if kind == "today":
+            return "GET", "/today", None
+        if kind == "challenges":
+            return "GET", "/challenges", None
+        if kind == "history_days":
+            return "GET", "/history/days?days=30", None
+        if kind == "history_day":
+            day = date.today() - timedelta(days=rnd.randint(1, self.history_days))
+            return "GET", f"/history/day/{day.isoformat()}", None
+        flag = rnd.choice(UPSERT_FLAGS)
+        body = {
+            "challenge_id": rnd.choice(challenge_ids(user_id, self.challenges)),
+            "flag": flag,
+            "minutes_fact": rnd.randint(5, 90) if flag in ("MIN", "BONUS") else None,
+            "comment": "load" if flag in ("SKIP", "FAIL") else None,
+        }
+        return "POST", "/daily-log/upsert", body
+
+    async def worker(self, rnd: random.Random, mix: dict, deadline: float, budget: list[int]) -> None:
+        kinds, weights = list(mix), list(mix.values())
+        while time.perf_counter() < deadline and budget[0] != 0:
+            budget[0] -= 1
+            kind = rnd.choices(kinds, weights)[0]
+            user_id = rnd.randint(1, self.users)
+            method, url, body = self._request(rnd, kind, user_id)
+            start = time.perf_counter()
+            try:
+                r = await self.client.request(method, url, json=body, headers=self.headers(user_id))
+                failed = r.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            self.samples[kind].append((time.perf_counter() - start) * 1000)
+            if failed:
+                self.errors[kind] += 1
+
+    async def run(self, mix: dict, concurrency: int, seconds: float, requests: int, seed: int) -> float:
+        """Возвращает фактическую длительность прогона, с."""
+        # requests > 0 — фиксированное число запросов (сравнимость между коммитами), иначе по времени
+        budget = [requests if requests > 0 else -1]
+        deadline = time.perf_counter() + (seconds if requests <= 0 else float("inf"))
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(self.worker(random.Random(seed * 1000 + i), mix, deadline, budget) for i in range(concurrency))
+        )
+        return time.perf_counter() - start
+
+    def reset(self) -> None:
+        self.samples.clear()
+        self.errors.clear()
+
+
+def _endpoint_report(driver: Driver, elapsed: float) -> dict:
+    out = {}
+    for kind, samples in sorted(driver.samples.items()):
+        out[ENDPOINTS[kind]] = {
+            **latency_percentiles(samples, ndigits=2),
+            "errors": driver.errors.get(kind, 0),
+            "rps": round(len(samples) / elapsed, 1),
+        }
+    everything = [x for samples in driver.samples.values() for x in samples]
+    out["total"] = {
+        **latency_percentiles(everything, ndigits=2),
+        "errors": sum(driver.errors.values()),
+        "rps": round(len(everything) / elapsed, 1),
+    }
+    return out
+
+
+async def _count_logs() -> int:
+    async with SessionLocal() as db:
+        return (await db.execute(select(func.count()).select_from(DailyLog))).scalar_one()
+
+
+async def _ticks(n: int) -> dict:
+    ticks = []
+    for _ in range(n):
+        before = await _count_logs()
+        with count_queries() as q, timer() as t:
+            await auto_assign_missed()
+        ticks.append({"ms": round(t["ms"], 1), "sql": q.count, "rows": await _count_logs() - before})
+    return {"ticks": ticks, **latency_percentiles([t["ms"] for t in ticks], ndigits=2)}
+
+
+def _print_report(report: dict) -> None:
+    rows = [
+        [name, r["n"], r["errors"], r["rps"], r["p50"], r["p95"], r["p99"], r["max"]]
+        for name, r in report["endpoints"].items()
+    ]
+    print_table(
+        f"load: {report['meta']['mix']}, concurrency {report['meta']['concurrency']}",
+        ["endpoint", "n", "err", "rps", "p50 ms", "p95 ms", "p99 ms", "max ms"],
+        rows,
+    )
+    ticks = (report["auto_assign"] or {}).get("ticks")
+    if ticks:
+        print_table(
+            "auto_assign_missed ticks",
+            ["#", "ms", "sql", "rows"],
+            [[i + 1, t["ms"], t["sql"], t["rows"]] for i, t in enumerate(ticks)],
+        )
+
+
+def _delta(old, new) -> str:
+    if old in (None, 0) or new is None:
+        return "-"
+    return f"{(new - old) / old * 100:+.0f}%"
+
+
+def _print_baseline(report: dict, path: str) -> None:
+    with open(path, encoding="utf-8") as f:
+        base = json.load(f)
+    for key in ("dialect", "dataset", "mix", "concurrency"):
+        if base.get("meta", {}).get(key) != report["meta"][key]:
+            print(f"\nwarning: baseline {key} differs: {base.get('meta', {}).get(key)} vs {report['meta'][key]}")
+    rows = []
+    for name, cur in report["endpoints"].items():
+        old = base.get("endpoints", {}).get(name)
+        if old is None:
+            continue
+        for key in ("rps", "p50", "p95", "p99"):
+            rows.append([name, key, old[key], cur[key], _delta(old[key], cur[key])])
+    old_ticks, cur_ticks = base.get("auto_assign"), report["auto_assign"]
+    if old_ticks and cur_ticks:
+        for key in ("p50", "max"):
+            rows.append(["auto_assign tick", key, old_ticks.get(key), cur_ticks.get(key), _delta(old_ticks.get(key), cur_ticks.get(key))])
+    print_table(
+        f"vs baseline {path} (build {base.get('meta', {}).get('build')})",
+        ["endpoint", "metric", "baseline", "current", "delta"],
+        rows,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="end-to-end load run")
+    add_dataset_args(parser)
+    parser.add_argument("--no-generate", action="store_true")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--requests", type=int, default=0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--ticks", type=int, default=3)
+    parser.add_argument("--url")
+    parser.add_argument("--out")
+    parser.add_argument("--baseline")
+    args = parser.parse_args()
+
+    if args.url:
+        global BOT_TOKEN
+        BOT_TOKEN = settings.telegram_bot_token or BOT_TOKEN
+    else:
+        settings.auth_mode = "PROD"
+        settings.telegram_bot_token = BOT_TOKEN
+
+    dataset = {"users": args.users, "challenges_per_user": args.challenges, "years": args.years, "seed": args.seed}
+    generate_s = None
+    # --url: база — у удалённого сервера, локальную не пересоздаём
+    if not (args.no_generate or args.url):
+        with timer() as t:
+            dataset = await generate(
+                users=args.users, challenges=args.challenges, years=args.years, seed=args.seed
+            )
+        generate_s = round(t["ms"] / 1000, 1)
+
+    transport = None if args.url else httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(
+        transport=transport, base_url=args.url or "http://bench", timeout=30.0
+    ) as client:
+        driver = Driver(client, args.users, args.challenges, int(args.years * 365))
+        mix = MIXES[args.mix]
+        if args.warmup > 0:
+            await driver.run(mix, args.concurrency, args.warmup, 0, args.seed + 1)
+            driver.reset()
+        elapsed = await driver.run(mix, args.concurrency, args.duration, args.requests, args.seed)
+
+    report = {
+        "meta": {
+            "build": resolve_build(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "dialect": "remote" if args.url else engine.dialect.name,
+            "target": args.url or "in-process",
+            "python": platform.python_version(),
+            "dataset": dataset,
+            "generate_s": generate_s,
+            "mix": args.mix,
+            "weights": mix,
+            "concurrency": args.concurrency,
+            "duration_s": round(elapsed, 2),
+            "seed": args.seed,
+        },
+        "endpoints": _endpoint_report(driver, elapsed),
+        # тики меряются только на своей базе
+        "auto_assign": None if args.url else await _ticks(args.ticks),
+    }
+
+    _print_report(report)
+    if args.baseline:
+        _print_baseline(report, args.baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nreport -> {args.out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,151 @@
+# apps/api/app/_bench/metrics_overhead.py
+#
+# python -m app._bench.metrics_overhead
+#
+# Цена инструментирования на /today: полный ASGI-стек приложения
+# с MetricsMiddleware + DB-слушателями и без них.
+# warm — ответ из кэша /today, cold — кэш сброшен (SQL каждый раз).
+# Сквозные цифры шумят на единицы процентов, поэтому отдельно — чистая
+# цена middleware на пустом ASGI-приложении и пары DB-слушателей на запрос.
+
+from app._bench._common import timer, reset_schema, seed, print_table
+
+import asyncio
+
+from sqlalchemy import select
+from starlette.middleware import Middleware
+
+from app.core.metrics import (
+    MetricsMiddleware,
+    install_db_metrics,
+    uninstall_db_metrics,
+    _before_cursor_execute,
+    _after_cursor_execute,
+)
+from app.db import engine
+from app.main import app
+from app.models import Challenge
+from app.settings import settings
+from app.services.today_service import today_cache
+
+ITERATIONS = 2000
+ROUNDS = 3
+
+
+async def _get(asgi, path: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await asgi(scope, receive, send)
+    return status
+
+
+def _stack(instrumented: bool):
+    app.user_middleware = [
+        m for m in app.user_middleware if m.cls is not MetricsMiddleware
+    ]
+    if instrumented:
+        app.user_middleware.insert(0, Middleware(MetricsMiddleware))
+        install_db_metrics(engine)
+    else:
+        uninstall_db_metrics(engine)
+    return app.build_middleware_stack()
+
+
+async def _measure(asgi, cold: bool) -> float:
+    assert await _get(asgi, "/today") == 200
+    with timer() as t:
+        for _ in range(ITERATIONS):
+            if cold:
+                today_cache.clear()
+            await _get(asgi, "/today")
+    return t["ms"] * 1000 / ITERATIONS
+
+
+async def _noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class _FakeConn:
+    def __init__(self):
+        self.info = {}
+
+
+async def _unit_costs() -> list:
+    n = ITERATIONS * 50
+    wrapped = MetricsMiddleware(_noop_app)
+
+    with timer() as bare:
+        for _ in range(n):
+            await _get(_noop_app, "/today")
+    with timer() as mw:
+        for _ in range(n):
+            await _get(wrapped, "/today")
+
+    conn = _FakeConn()
+    stmt = str(select(Challenge.id))
+    with timer() as listeners:
+        for _ in range(n):
+            _before_cursor_execute(conn, None, stmt, None, None, False)
+            _after_cursor_execute(conn, None, stmt, None, None, False)
+
+    return [
+        ["MetricsMiddleware / request", f"{(mw['ms'] - bare['ms']) * 1000 / n:.2f}"],
+        ["DB listeners / statement", f"{listeners['ms'] * 1000 / n:.2f}"],
+    ]
+
+
+async def main() -> None:
+    await reset_schema()
+    await seed(users=1, challenges_per_user=10, days_of_logs=30)
+    # DEV-режим: /today отвечает сидированному пользователю
+    settings.dev_user_telegram_id = 10_000_001
+
+    rows = []
+    for cold in (False, True):
+        # чередуем варианты и берём лучший раунд — меньше шума от дрейфа
+        plain, instrumented = float("inf"), float("inf")
+        for _ in range(ROUNDS):
+            plain = min(plain, await _measure(_stack(False), cold))
+            instrumented = min(instrumented, await _measure(_stack(True), cold))
+        rows.append(
+            [
+                "cold" if cold else "warm",
+                f"{plain:.0f}",
+                f"{instrumented:.0f}",
+                f"{instrumented - plain:+.0f}",
+                f"{(instrumented / plain - 1) * 100:+.1f}%",
+            ]
+        )
+    print_table(
+        "/today, us/request",
+        ["cache", "plain", "metrics", "delta", "overhead"],
+        rows,
+    )
+    print_table("instrumentation alone, us", ["what", "us"], await _unit_costs())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
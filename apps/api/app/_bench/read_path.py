@@ -0,0 +1,167 @@
+# apps/api/app/_bench/read_path.py
+#
+# python -m app._bench.read_path
+#
+# Путь чтения view-эндпоинтов: ORM-объекты (прежние запросы, теперь только
+# здесь, + compute_status_view в Python) против строк repositories/views_repo
+# (только нужные колонки, статус считает БД, запросы собраны при импорте).
+# На каждый эндпоинт: медиана времени вызова, пик аллокаций (tracemalloc)
+# на вызов и число ORM-объектов, загруженных в сессию за вызов.
+# Перед каждым вызовом сессия очищается — как новый запрос.
+# На PostgreSQL в пик аллокаций входит буфер чтения asyncpg (~250 KiB на
+# вызов) — сравнивать стоит разницу колонок, а не абсолютные значения.
+
+from app._bench._common import reset_schema, seed, print_table, orm_challenge_logs_since
+
+import asyncio
+import time
+import tracemalloc
+from datetime import date, timedelta
+from statistics import median
+
+from sqlalchemy import and_, event, select
+from sqlalchemy.orm import Mapper
+
+from app.db import SessionLocal, engine
+from app.models import Challenge, ChallengeStats, DailyLog
+from app.repositories.challenge_stats_repo import STATS_COLUMNS
+from app.repositories.views_repo import (
+    get_challenge_history_rows,
+    get_challenge_list_rows,
+    get_day_detail_rows,
+    get_today_rows,
+)
+from app.services.status import compute_status_view
+
+ITERATIONS = 300
+CHALLENGES = 20
+DAYS = 90
+USER_ID = 1
+
+
+async def _orm_today(db, day):
+    q = await db.execute(
+        select(Challenge, DailyLog)
+        .outerjoin(
+            DailyLog,
+            and_(
+                DailyLog.challenge_id == Challenge.id,
+                DailyLog.user_id == USER_ID,
+                DailyLog.date == day,
+            ),
+        )
+        .where(
+            and_(
+                Challenge.user_id == USER_ID,
+                Challenge.is_active == True,
+                Challenge.is_template == False,
+                Challenge.deleted_at.is_(None),
+            )
+        )
+        .order_by(Challenge.id.asc())
+    )
+    return [(ch.id, ch.title, ch.type, compute_status_view(log)) for ch, log in q.tuples().all()]
+
+
+async def _orm_challenges(db):
+    q = await db.execute(
+        select(Challenge, *(getattr(ChallengeStats, c) for c in STATS_COLUMNS))
+        .outerjoin(ChallengeStats, ChallengeStats.challenge_id == Challenge.id)
+        .where(Challenge.user_id == USER_ID)
+        .where(Challenge.deleted_at.is_(None))
+        .order_by(Challenge.id.desc())
+    )
+    return [(row[0].id, row[0].title, dict(zip(STATS_COLUMNS, row[1:]))) for row in q.all()]
+
+
+async def _orm_history(db, since):
+    return [
+        (log.date, compute_status_view(log), log.minutes_fact, log.comment)
+        for log in await orm_challenge_logs_since(db, USER_ID, 1, since)
+    ]
+
+
+async def _orm_day(db, day):
+    q = await db.execute(
+        select(DailyLog, Challenge.title)
+        .join(Challenge, Challenge.id == DailyLog.challenge_id)
+        .where(DailyLog.user_id == USER_ID)
+        .where(DailyLog.date == day)
+        .order_by(Challenge.title.asc())
+    )
+    return [
+        (log.challenge_id, title, compute_status_view(log), log.minutes_fact, log.comment)
+        for log, title in q.all()
+    ]
+
+
+async def _measure(db, call) -> tuple[float, float, int, int]:
+    """(us/call, peak KiB/call, ORM objects/call, rows)."""
+    db.expunge_all()
+    rows = await call(db)  # прогрев: кэш компиляции SQL
+
+    samples = []
+    for _ in range(ITERATIONS):
+        db.expunge_all()
+        start = time.perf_counter()
+        await call(db)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+
+    loaded = [0]
+
+    def on_load(target, context):
+        loaded[0] += 1
+
+    db.expunge_all()
+    event.listen(Mapper, "load", on_load)
+    try:
+        await call(db)
+    finally:
+        event.remove(Mapper, "load", on_load)
+
+    peaks = []
+    for _ in range(20):
+        db.expunge_all()
+        tracemalloc.start()
+        await call(db)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+    return median(samples), median(peaks), loaded[0], len(rows)
+
+
+async def main() -> None:
+    await reset_schema()
+    await seed(users=1, challenges_per_user=CHALLENGES, days_of_logs=DAYS)
+    today = date.today()
+    since = today - timedelta(days=DAYS - 1)
+    day = today - timedelta(days=3)
+
+    cases = [
+        ("/today", lambda db: _orm_today(db, today), lambda db: get_today_rows(db, USER_ID, today)),
+        ("/challenges", _orm_challenges, lambda db: get_challenge_list_rows(db, USER_ID)),
+        (f"challenge history {DAYS}d", lambda db: _orm_history(db, since),
+         lambda db: get_challenge_history_rows(db, USER_ID, 1, since)),
+        ("/history/day", lambda db: _orm_day(db, day), lambda db: get_day_detail_rows(db, USER_ID, day)),
+    ]
+
+    rows = []
+    async with SessionLocal() as db:
+        for name, orm_call, core_call in cases:
+            orm_us, orm_kib, orm_objs, n = await _measure(db, orm_call)
+            core_us, core_kib, core_objs, _ = await _measure(db, core_call)
+            rows.append([
+                name, n,
+                f"{orm_us:.0f}", f"{core_us:.0f}", f"{orm_us / core_us:.1f}x",
+                f"{orm_kib:.0f}", f"{core_kib:.0f}",
+                orm_objs, core_objs,
+            ])
+
+    print_table(
+        f"read path: ORM entities vs column rows ({engine.dialect.name})",
+        ["endpoint", "rows", "orm us", "rows us", "speedup", "orm KiB", "rows KiB", "orm objs", "rows objs"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+# apps/api/app/_bench/serialization.py
+#
+# python -m app._bench.serialization
+#
+# Стоимость сериализации ответа (без БД): готовый dict сервиса -> байты тела.
+# Было: без response_model (jsonable_encoder) + JSONResponse (stdlib json).
+# Стало: response_model маршрута (pydantic-core validate + serialize) +
+# класс ответа по умолчанию (orjson, если установлен).
+# Поле и класс ответа берутся у настоящих маршрутов app.
+
+from app._bench._common import timer, reset_schema, seed, print_table
+
+import asyncio
+from datetime import date
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy import select
+
+from app.db import SessionLocal
+from app.main import app
+from app.models import User
+from app.services.challenges_service import list_user_challenges
+from app.services.history_service import build_challenge_history, build_days_history
+from app.services.today_service import build_today_view
+
+ITERATIONS = 2000
+CHALLENGES = 20
+DAYS = 90
+
+
+def _route(path: str) -> APIRoute:
+    return next(r for r in app.routes if isinstance(r, APIRoute) and r.path == path and "GET" in r.methods)
+
+
+async def _serialize(field, response_class, content) -> bytes:
+    value = await serialize_response(field=field, response_content=content, is_coroutine=True)
+    return response_class(value).body
+
+
+async def _measure(label: str, path: str, content) -> list:
+    route = _route(path)
+    row = [label]
+    bodies = []
+    for field, response_class in ((None, JSONResponse), (route.response_field, route.response_class)):
+        body = await _serialize(field, response_class, content)
+        with timer() as t:
+            for _ in range(ITERATIONS):
+                await _serialize(field, response_class, content)
+        row.append(f"{t['ms'] * 1000 / ITERATIONS:.0f}")
+        bodies.append(body)
+    before, after = row[1:]
+    row += [f"{int(before) / max(int(after), 1):.1f}x", len(bodies[1]), "yes" if bodies[0] == bodies[1] else "NO"]
+    return row
+
+
+async def main() -> None:
+    await reset_schema()
+    await seed(users=1, challenges_per_user=CHALLENGES, days_of_logs=DAYS)
+
+    async with SessionLocal() as db:
+        user = (await db.execute(select(User))).scalar_one()
+        payloads = [
+            (f"challenge history {DAYS}d", "/challenges/{challenge_id}/history",
+             await build_challenge_history(db, user.id, 1, DAYS)),
+            (f"days history {DAYS}d", "/history/days", (await build_days_history(db, user.id, DAYS))[0]),
+            (f"challenges x{CHALLENGES}", "/challenges", await list_user_challenges(db, user.id)),
+            (f"today x{CHALLENGES}", "/today", await build_today_view(db, user, date.today())),
+        ]
+
+    rows = [await _measure(*p) for p in payloads]
+    print_table(
+        f"response serialization, us/response ({_route('/today').response_class.__name__})",
+        ["payload", "dict+json", "model+default", "speedup", "bytes", "same body"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
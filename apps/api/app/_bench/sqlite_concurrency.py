@@ -0,0 +1,102 @@
+# apps/api/app/_bench/sqlite_concurrency.py
+#
+# python -m app._bench.sqlite_concurrency
+#
+# Латентность читателей /today, пока писатель крутит большие транзакции
+# (как закрытие дня планировщиком): rollback journal против PROD-профиля (WAL).
+
+from app._bench._common import (
+    BENCH_DIR,
+    reset_schema,
+    seed,
+    print_table,
+)
+
+import asyncio
+import random
+import time
+from datetime import date
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.db import engine, install_sqlite_pragmas, sqlite_pragmas_from_settings
+from app.models import User, DailyLog
+from app.services.health_sampler import latency_percentiles
+from app.services.today_service import build_today_view
+
+USERS = 300
+CHALLENGES_PER_USER = 5
+DAYS_OF_LOGS = 30
+READERS = 4
+DURATION_S = 3.0
+
+PROFILES = {
+    # journal_mode персистентен в файле — откатываем явно
+    "rollback journal": {"journal_mode": "DELETE"},
+    "PROD (WAL)": sqlite_pragmas_from_settings() or {"journal_mode": "WAL"},
+}
+
+
+async def _run(name: str, pragmas: dict) -> list:
+    path = BENCH_DIR / f"concurrency_{abs(hash(name))}.db"
+    eng = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    install_sqlite_pragmas(eng, pragmas)
+    Session = async_sessionmaker(bind=eng, expire_on_commit=False, class_=AsyncSession)
+
+    await reset_schema(eng)
+    await seed(
+        users=USERS,
+        challenges_per_user=CHALLENGES_PER_USER,
+        days_of_logs=DAYS_OF_LOGS,
+        bind=eng,
+    )
+
+    deadline = time.perf_counter() + DURATION_S
+    samples: list[float] = []
+    writes = 0
+
+    async def writer():
+        nonlocal writes
+        while time.perf_counter() < deadline:
+            async with eng.begin() as conn:
+                await conn.execute(
+                    update(DailyLog)
+                    .where(DailyLog.user_id <= USERS // 2)
+                    .values(minutes_fact=DailyLog.minutes_fact + 1)
+                )
+            writes += 1
+
+    async def reader(seed_: int):
+        rnd = random.Random(seed_)
+        day = date.today()
+        while time.perf_counter() < deadline:
+            async with Session() as db:
+                uid = rnd.randint(1, USERS)
+                user = (await db.execute(select(User).where(User.id == uid))).scalar_one()
+                start = time.perf_counter()
+                await build_today_view(db, user, day)
+                samples.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(writer(), *(reader(i) for i in range(READERS)))
+    await eng.dispose()
+
+    p = latency_percentiles(samples, ndigits=2)
+    return [name, writes, p["n"], p["p50"], p["p95"], p["p99"], p["max"]]
+
+
+async def main() -> None:
+    if engine.dialect.name != "sqlite":
+        print(f"SKIP: SQLite-only benchmark (DATABASE_URL dialect={engine.dialect.name})")
+        return
+
+    rows = [await _run(name, pragmas) for name, pragmas in PROFILES.items()]
+    print_table(
+        f"/today readers under a writer ({READERS} readers, {DURATION_S:.0f}s)",
+        ["profile", "write_tx", "reads", "p50_ms", "p95_ms", "p99_ms", "max_ms"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
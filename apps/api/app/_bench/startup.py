@@ -0,0 +1,65 @@
+# apps/api/app/_bench/startup.py
+#
+# python -m app._bench.startup
+#
+# Схемная часть старта: прежняя последовательность (create_all + SAFE ALTER +
+# индексы + сверка шаблонов на каждом старте) против migrate() с версией.
+
+from app._bench._common import count_queries, timer, reset_schema, print_table
+
+import asyncio
+
+from app.db import Base, engine
+from app.repositories.schema_repo import (
+    migrate,
+    ensure_added_columns,
+    ensure_daily_log_unique_key,
+    create_missing_indexes,
+    seed_default_templates,
+)
+
+ITERATIONS = 50
+
+
+async def _legacy_startup() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with engine.begin() as conn:
+        await conn.run_sync(ensure_added_columns)
+    async with engine.begin() as conn:
+        await conn.run_sync(ensure_daily_log_unique_key)
+        await conn.run_sync(create_missing_indexes)
+    async with engine.begin() as conn:
+        await conn.run_sync(seed_default_templates)
+
+
+async def _migrate() -> None:
+    await migrate(engine)
+
+
+async def _measure(label: str, fn) -> list:
+    with count_queries() as q, timer() as t:
+        for _ in range(ITERATIONS):
+            await fn()
+    return [label, q.count // ITERATIONS, f"{t['ms'] / ITERATIONS:.2f}"]
+
+
+async def main() -> None:
+    header = ["path", "sql/start", "ms/start"]
+    rows = []
+
+    await reset_schema()
+    await _legacy_startup()  # прогрев
+    rows.append(await _measure("legacy (every start)", _legacy_startup))
+
+    await reset_schema()
+    with count_queries() as q, timer() as t:
+        await _migrate()
+    rows.append(["migrate: empty db", q.count, f"{t['ms']:.2f}"])
+
+    rows.append(await _measure("migrate: current", _migrate))
+    print_table(f"startup schema work, {engine.dialect.name}", header, rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
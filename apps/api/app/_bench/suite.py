@@ -0,0 +1,217 @@
+# apps/api/app/_bench/suite.py
+#
+# python -m app._bench.suite            # сравнить с suite_baseline.json, exit 1 при регрессии
+# python -m app._bench.suite --update   # перезаписать базовую линию
+#
+# Микробенчмарки сервисного слоя: функции вызываются напрямую (без HTTP) на
+# засеянной SQLite в памяти. На каждый случай — медиана времени вызова и
+# число SQL-запросов на вызов. Число запросов детерминировано и сверяется
+# строго (рост = N+1 или лишний round-trip); время — с допуском
+# (--max-slowdown, --slack-us): оно зависит от машины, базовую линию стоит
+# обновлять на той же машине, где гоняется проверка.
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from app._bench._common import count_queries, reset_schema, seed, sign_init_data, print_table
+
+import argparse
+import asyncio
+import json
+import platform
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from statistics import median
+
+from sqlalchemy import delete, select, update
+
+from app.core import security
+from app.db import SessionLocal, engine
+from app.models import DailyLog, User
+from app.schemas import DailyFlagSet
+from app.services.auto_assign import auto_assign_missed
+from app.services.challenge_stats import recompute_all_challenge_stats
+from app.services.challenges_service import list_user_challenges
+from app.services.daily_log_service import upsert_daily_log
+from app.services.health_sampler import resolve_build
+from app.services.history_service import build_challenge_history, build_day_detail, build_days_history
+from app.services.today_service import build_today_view
+
+BASELINE_PATH = Path(__file__).with_name("suite_baseline.json")
+
+USERS = 20
+CHALLENGES = 10
+HISTORY_DAYS = 90
+BOT_TOKEN = "123456:bench-token"
+USER_ID = 1
+
+
+class Case:
+    """Бенчмарк: call(db) под замером; setup(db) — до каждого вызова, вне замера."""
+
+    def __init__(self, name: str, call, *, iterations: int = 200, setup=None):
+        self.name = name
+        self.call = call
+        self.iterations = iterations
+        self.setup = setup
+
+
+def _cases(user: User) -> list[Case]:
+    today = date.today()
+    flags = ("MIN", "BONUS")
+    counter = [0]
+
+    async def upsert(db):
+        # чередуем флаг: каждый вызов — настоящая запись, а не no-op
+        counter[0] += 1
+        payload = DailyFlagSet(challenge_id=1, date=today, flag=flags[counter[0] % 2], minutes_fact=15)
+        assert await upsert_daily_log(db, user, payload)
+
+    async def reopen_yesterday(db):
+        # вчерашний день снова не закрыт и пуст; счётчики согласованы с историей,
+        # чтобы закрытие шло обычным путём записи "в хвост"
+        yesterday = today - timedelta(days=1)
+        await db.execute(delete(DailyLog).where(DailyLog.date == yesterday))
+        await db.execute(update(User).values(last_closed_date=today - timedelta(days=2)))
+        await db.commit()
+        await recompute_all_challenge_stats()
+
+    init_data = sign_init_data({"id": 10_000_000 + USER_ID, "username": "u1"}, BOT_TOKEN)
+
+    async def verify_cold(db):
+        security._webapp_secret_key.cache_clear()
+        security.init_data_cache.clear()
+        security.verify_telegram_init_data(init_data, BOT_TOKEN)
+
+    async def verify_warm(db):
+        security.verify_telegram_init_data(init_data, BOT_TOKEN)
+
+    return [
+        Case("build_today_view", lambda db: build_today_view(db, user, today)),
+        Case("upsert_daily_log", upsert),
+        Case("build_days_history", lambda db: build_days_history(db, USER_ID, 30)),
+        Case("build_challenge_history", lambda db: build_challenge_history(db, USER_ID, 1, 30)),
+        Case("build_day_detail", lambda db: build_day_detail(db, USER_ID, today - timedelta(days=3))),
+        Case("list_user_challenges", lambda db: list_user_challenges(db, USER_ID)),
+        Case("auto_assign_missed", lambda db: auto_assign_missed(), iterations=15, setup=reopen_yesterday),
+        Case("verify_init_data cold", verify_cold, iterations=2000),
+        Case("verify_init_data warm", verify_warm, iterations=2000),
+    ]
+
+
+async def _run(case: Case) -> dict:
+    samples = []
+    queries = 0
+    async with SessionLocal() as db:
+        # прогрев: кэш компиляции SQL, первое заполнение служебных строк
+        if case.setup:
+            await case.setup(db)
+        await case.call(db)
+
+        for _ in range(case.iterations):
+            if case.setup:
+                await case.setup(db)
+            with count_queries() as q:
+                start = time.perf_counter()
+                await case.call(db)
+                samples.append((time.perf_counter() - start) * 1_000_000)
+            queries += q.count
+    return {"us": round(median(samples), 1), "sql": round(queries / case.iterations, 2)}
+
+
+async def measure() -> dict:
+    await reset_schema()
+    await seed(
+        users=USERS,
+        challenges_per_user=CHALLENGES,
+        days_of_logs=HISTORY_DAYS,
+        last_closed_date=date.today() - timedelta(days=1),
+    )
+    await recompute_all_challenge_stats()
+    async with SessionLocal() as db:
+        user = (await db.execute(select(User).where(User.id == USER_ID))).scalar_one()
+
+    return {case.name: await _run(case) for case in _cases(user)}
+
+
+def compare(results: dict, baseline: dict, max_slowdown: float, slack_us: float) -> tuple[list, list]:
+    rows, failures = [], []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if base is None:
+            rows.append([name, cur["sql"], "-", cur["us"], "-", "-", "new"])
+            continue
+        verdict = "ok"
+        if cur["sql"] > base["sql"]:
+            verdict = "SQL REGRESSION"
+        elif cur["us"] > base["us"] * max_slowdown and cur["us"] - base["us"] > slack_us:
+            verdict = "SLOWER"
+        elif cur["sql"] < base["sql"]:
+            verdict = "fewer sql, --update"
+        if verdict in ("SQL REGRESSION", "SLOWER"):
+            failures.append(name)
+        rows.append(
+            [name, cur["sql"], base["sql"], cur["us"], base["us"], f"{cur['us'] / base['us']:.2f}x", verdict]
+        )
+    return rows, failures
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="service micro-benchmarks")
+    parser.add_argument("--update", action="store_true")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--max-slowdown", type=float, default=1.5)
+    parser.add_argument("--slack-us", type=float, default=25.0)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "sqlite":
+        print("suite: базовая линия снята на SQLite в памяти, другие СУБД несравнимы")
+
+    results = await measure()
+
+    if args.update:
+        payload = {
+            "meta": {
+                "build": resolve_build(),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "dataset": {"users": USERS, "challenges_per_user": CHALLENGES, "days": HISTORY_DAYS},
+            },
+            "cases": results,
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print_table(
+            f"baseline -> {args.baseline}",
+            ["case", "sql/call", "us/call"],
+            [[name, r["sql"], r["us"]] for name, r in results.items()],
+        )
+        return 0
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"suite: нет базовой линии {args.baseline}, запустите с --update")
+        return 1
+
+    rows, failures = compare(results, baseline["cases"], args.max_slowdown, args.slack_us)
+    print_table(
+        f"service suite vs baseline (build {baseline['meta'].get('build')})",
+        ["case", "sql", "base sql", "us", "base us", "ratio", "verdict"],
+        rows,
+    )
+    if failures:
+        print(f"\nSUITE FAIL: {', '.join(failures)}")
+        return 1
+    print("\nSUITE OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,82 @@
+# apps/api/app/_bench/today.py
+#
+# python -m app._bench.today
+#
+# build_today_view: один LEFT OUTER JOIN против прежнего N+1
+# (список челленджей + SELECT лога на каждый).
+
+from app._bench._common import (
+    count_queries,
+    timer,
+    reset_schema,
+    seed,
+    print_table,
+)
+
+import asyncio
+from datetime import date
+
+from sqlalchemy import select, and_
+
+from app.db import SessionLocal
+from app.models import Challenge, DailyLog, User
+from app.services.status import compute_status_view
+from app.services.today_service import build_today_view
+
+ITERATIONS = 200
+
+
+async def _legacy_today(db, user, day: date) -> list:
+    out = []
+    challenges = await db.execute(
+        select(Challenge)
+        .where(
+            and_(
+                Challenge.user_id == user.id,
+                Challenge.is_active == True,
+                Challenge.is_template == False,
+                Challenge.deleted_at.is_(None),
+            )
+        )
+        .order_by(Challenge.id.asc())
+    )
+    for ch in challenges.scalars().all():
+        log = await db.execute(
+            select(DailyLog).where(
+                and_(DailyLog.user_id == user.id, DailyLog.challenge_id == ch.id, DailyLog.date == day)
+            )
+        )
+        out.append((ch.id, compute_status_view(log.scalar_one_or_none())))
+    return out
+
+
+async def _measure(fn, n_challenges: int) -> list:
+    await reset_schema()
+    # 30 дней истории на челлендж: join должен оставаться точечным по дате
+    await seed(users=1, challenges_per_user=n_challenges, days_of_logs=30)
+    day = date.today()
+
+    async with SessionLocal() as db:
+        user = (await db.execute(select(User))).scalar_one()
+        await fn(db, user, day)  # прогрев кэша компиляции
+
+        with count_queries() as q, timer() as t:
+            for _ in range(ITERATIONS):
+                await fn(db, user, day)
+
+    return [n_challenges, q.count // ITERATIONS, f"{t['ms'] * 1000 / ITERATIONS:.0f}"]
+
+
+async def main() -> None:
+    header = ["challenges", "sql/call", "us/call"]
+    sizes = (1, 5, 20, 50)
+
+    rows = [await _measure(_legacy_today, n) for n in sizes]
+    print_table("legacy N+1", header, rows)
+
+    rows = [await _measure(build_today_view, n) for n in sizes]
+    print_table("build_today_view (LEFT OUTER JOIN)", header, rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,16 +3,38 @@
 from fastapi import Depends, HTTPException, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
 from app.core.security import verify_telegram_init_data
 from app.db import get_db
 from app.models import User
 from app.settings import settings
 from app.repositories.users_repo import (
+    get_user_by_id,
     get_user_by_telegram_id,
     create_user,
     get_or_create_user_by_telegram,
 )
 
+# telegram_id -> users.id: связь не меняется, кэш не устаревает между воркерами.
+# Сама строка users (timezone, last_closed_date) читается заново в каждом
+# запросе — по первичному ключу.
+user_cache = TTLCache(
+    "users",
+    maxsize=settings.user_cache_max_entries,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+)
+
+
+async def _cached_user(db: AsyncSession, tg_id: int) -> User | None:
+    user_id = user_cache.get((tg_id,))
+    if user_id is None:
+        return None
+    user = await get_user_by_id(db, user_id)
+    if user is None:
+        # строку удалили — связь больше не верна
+        user_cache.invalidate((tg_id,))
+    return user
+
 
 async def get_current_user(
     db: AsyncSession = Depends(get_db),
@@ -23,9 +45,12 @@ async def get_current_user(
     # DEV: один фиксированный пользователь
     if mode == "DEV":
         tid = settings.dev_user_telegram_id
-        user = await get_user_by_telegram_id(db, tid)
-        if not user:
-            user = await create_user(db, tid, "dev")
+        user = await _cached_user(db, tid)
+        if user is None:
+            user = await get_user_by_telegram_id(db, tid)
+            if not user:
+                user = await create_user(db, tid, "dev")
+            user_cache.set((tid,), user.id)
         return user
 
     # PROD: Telegram initData
@@ -40,4 +65,23 @@ async def get_current_user(
     if not tg_id:
         raise HTTPException(status_code=401, detail="Missing telegram user id")
 
-    return await get_or_create_user_by_telegram(db, int(tg_id), tg_user)
+    tg_id = int(tg_id)
+    user = await _cached_user(db, tg_id)
+    if user is None:
+        user = await get_or_create_user_by_telegram(db, tg_id, tg_user)
+        user_cache.set((tg_id,), user.id)
+    return user
+
+
+def require_diag_token(
+    x_diag_token: str | None = Header(default=None, alias="X-Diag-Token"),
+) -> None:
+    # Security model (/diag, /metrics):
+    # - DEV: allowed without token (local dev/tests)
+    # - PROD: requires X-Diag-Token == settings.diag_token
+    mode = (settings.auth_mode or "DEV").upper()
+    if mode == "PROD":
+        if not settings.diag_token:
+            raise HTTPException(status_code=500, detail="diag_token not set")
+        if not x_diag_token or x_diag_token != settings.diag_token:
+            raise HTTPException(status_code=401, detail="Invalid X-Diag-Token")
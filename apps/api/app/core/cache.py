@@ -0,0 +1,91 @@
+# apps/api/app/core/cache.py
+#
+# Маленький in-process кэш: TTL + LRU-вытеснение + счётчики hit/miss.
+# Живёт в одном процессе (один event loop) — без блокировок и без await внутри.
+# Ключи — кортежи; первый элемент считается "группой" (обычно user_id),
+# чтобы инвалидировать все ключи пользователя за O(его ключей).
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+_REGISTRY: dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int, ttl_seconds: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._groups: dict[Hashable, set[tuple]] = {}
+        _REGISTRY[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: tuple) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: tuple, value: Any, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._groups.setdefault(key[0], set()).add(key)
+
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._drop(oldest)
+
+    def invalidate(self, key: tuple) -> None:
+        if key in self._data:
+            self._drop(key)
+
+    def invalidate_group(self, group: Hashable) -> None:
+        for key in self._groups.pop(group, ()):
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._groups.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+    def _drop(self, key: tuple) -> None:
+        self._data.pop(key, None)
+        group = self._groups.get(key[0])
+        if group is not None:
+            group.discard(key)
+            if not group:
+                del self._groups[key[0]]
+
+
+def cache_stats() -> dict[str, dict]:
+    return {name: c.stats() for name, c in _REGISTRY.items()}
@@ -1,7 +1,187 @@
+# apps/api/app/core/logging.py
+#
+# Логирование без блокировок event loop:
+# logger -> QueueHandler (put_nowait, в памяти) -> QueueListener (фоновый поток) -> stderr.
+# Записи — JSON по строке (LOG_FORMAT=TEXT — прежний человекочитаемый формат).
+# request_id/route/... подмешиваются из contextvar на стороне вызывающего,
+# шумные логгеры прореживаются 1-из-N (settings.log_sample_every).
+
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from app.settings import settings
+
+# id текущего запроса (ставит RequestLogMiddleware)
+request_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "request_id", default=None
+)
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+
+# стандартные атрибуты LogRecord — всё остальное считаем extra-полями
+_RECORD_ATTRS = set(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "taskName"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and value is not None:
+                out[key] = value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Проставляет request_id из contextvar (в потоке вызывающего, до очереди)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SampleFilter(logging.Filter):
+    """Пропускает каждую N-ю запись логгера (WARNING и выше — всегда)."""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, int(every))
+        self._seen = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        self._seen += 1
+        if self._seen % self.every:
+            return False
+        record.sampled_every = self.every
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Очередь переполнена — запись теряется (и считается), а не блокирует запрос."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # копия с уже подставленными args и текстом исключения: фоновый поток
+        # не должен видеть объекты, которые вызывающий изменит после возврата
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
 
 def setup_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-    )
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stderr)
+    if (settings.log_format or "JSON").upper() == "TEXT":
+        stream.setFormatter(logging.Formatter(TEXT_FORMAT))
+    else:
+        stream.setFormatter(JsonFormatter())
+
+    q: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    handler = DroppingQueueHandler(q)
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(settings.log_level)
+
+    for name, every in (settings.log_sample_every or {}).items():
+        logging.getLogger(name).addFilter(SampleFilter(every))
+
+    _listener = logging.handlers.QueueListener(q, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+access_log = logging.getLogger("lifetracker.access")
+
+
+class RequestLogMiddleware:
+    """
+    Чистый ASGI-middleware: request_id (из X-Request-ID или новый),
+    одна структурная запись на запрос — route (шаблон), status, latency_ms.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-request-id", request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if access_log.isEnabledFor(logging.INFO):
+                route = scope.get("route")
+                access_log.info(
+                    "%s %s %s",
+                    scope.get("method"),
+                    scope.get("path"),
+                    status[0],
+                    extra={
+                        "route": getattr(route, "path", None),
+                        "method": scope.get("method"),
+                        "status": status[0],
+                        "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                    },
+                )
+            request_id_var.reset(token)
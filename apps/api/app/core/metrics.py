@@ -0,0 +1,311 @@
+# apps/api/app/core/metrics.py
+#
+# Метрики в текстовом формате Prometheus (exposition 0.0.4), без внешних зависимостей.
+# Как и кэши — на процесс: каждый воркер отдаёт свои ряды, агрегирует Prometheus.
+# Горячий путь: observe() = bisect по бакетам + два сложения, без блокировок
+# (один event loop; потоки APScheduler сюда не пишут).
+
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.cache import cache_stats
+from app.core.logging import DroppingQueueHandler
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# секунды: от быстрых кэш-попаданий до таймаутов
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+JOB_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_REGISTRY: list["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        _REGISTRY.append(self)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labels, v in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_num(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [counts по бакетам (+Inf последним), sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = _labels(self.labelnames, labels, f'le="{_num(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lbl = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{lbl} {_num(total)}")
+            lines.append(f"{self.name}_count{lbl} {cumulative}")
+        return lines
+
+
+class GaugeCallback(_Metric):
+    """Значения снимаются в момент scrape: fn() -> {labels: value}."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames, fn, kind: str = "gauge"):
+        super().__init__(name, help_text, labelnames)
+        self.kind = kind
+        self._fn = fn
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labels, v in self._fn().items():
+            if v is None:
+                continue
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_num(v)}")
+        return lines
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- HTTP ---
+
+http_requests = Counter(
+    "lifetracker_http_requests_total",
+    "HTTP requests by route template, method and status.",
+    ("route", "method", "status"),
+)
+http_latency = Histogram(
+    "lifetracker_http_request_duration_seconds",
+    "HTTP request latency by route template and method.",
+    ("route", "method"),
+)
+
+
+class MetricsMiddleware:
+    """
+    Чистый ASGI-middleware (без BaseHTTPMiddleware и его лишней задачи на запрос).
+    Метка route — шаблон маршрута FastAPI (/challenges/{challenge_id}),
+    чтобы кардинальность не росла с числом id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "<unmatched>"
+            method = scope.get("method", "")
+            http_requests.inc((path, method, status[0]))
+            http_latency.observe((path, method), time.perf_counter() - start)
+
+
+# --- DB ---
+
+db_queries = Counter(
+    "lifetracker_db_queries_total",
+    "SQL statements executed, by statement kind.",
+    ("kind",),
+)
+db_latency = Histogram(
+    "lifetracker_db_query_duration_seconds",
+    "SQL statement execution time, by statement kind.",
+    ("kind",),
+)
+
+_STATEMENT_KINDS = ("SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK")
+
+
+def _statement_kind(statement: str) -> str:
+    head = statement.lstrip()[:8].upper()
+    for kind in _STATEMENT_KINDS:
+        if head.startswith(kind):
+            return kind
+    return "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("lt_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["lt_query_start"].pop()
+    kind = _statement_kind(statement)
+    db_queries.inc((kind,))
+    db_latency.observe((kind,), time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute не вызывается — снимаем отметку старта
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("lt_query_start"):
+        conn.info["lt_query_start"].pop()
+
+
+_DB_LISTENERS = (
+    ("before_cursor_execute", _before_cursor_execute),
+    ("after_cursor_execute", _after_cursor_execute),
+    ("handle_error", _handle_error),
+)
+
+
+def install_db_metrics(async_engine: AsyncEngine) -> None:
+    for name, fn in _DB_LISTENERS:
+        event.listen(async_engine.sync_engine, name, fn)
+
+
+def uninstall_db_metrics(async_engine: AsyncEngine) -> None:
+    for name, fn in _DB_LISTENERS:
+        event.remove(async_engine.sync_engine, name, fn)
+
+
+# --- планировщик ---
+
+job_runs = Counter(
+    "lifetracker_job_runs_total",
+    "Scheduler job runs by job and outcome.",
+    ("job", "outcome"),
+)
+job_latency = Histogram(
+    "lifetracker_job_duration_seconds",
+    "Scheduler job duration.",
+    ("job",),
+    buckets=JOB_BUCKETS,
+)
+job_rows_written = Counter(
+    "lifetracker_job_rows_written_total",
+    "Rows written by scheduler jobs.",
+    ("job",),
+)
+
+
+class JobRun:
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = 0
+
+
+@contextmanager
+def track_job(job: str):
+    """with track_job("close_tz") as run: ...; run.rows += written"""
+    run = JobRun()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield run
+        outcome = "ok"
+    finally:
+        job_runs.inc((job, outcome))
+        job_latency.observe((job,), time.perf_counter() - start)
+        if run.rows:
+            job_rows_written.inc((job,), run.rows)
+
+
+# --- кэши (снимаются при scrape из cache_stats) ---
+
+def _cache_field(field: str):
+    def collect() -> dict:
+        return {(name,): s[field] for name, s in cache_stats().items()}
+    return collect
+
+
+GaugeCallback(
+    "lifetracker_cache_hits_total", "Cache hits.", ("cache",), _cache_field("hits"), kind="counter"
+)
+GaugeCallback(
+    "lifetracker_cache_misses_total", "Cache misses.", ("cache",), _cache_field("misses"), kind="counter"
+)
+GaugeCallback("lifetracker_cache_entries", "Cache entries.", ("cache",), _cache_field("size"))
+GaugeCallback(
+    "lifetracker_cache_hit_ratio", "Cache hit ratio since start.", ("cache",), _cache_field("hit_ratio")
+)
+
+
+GaugeCallback(
+    "lifetracker_log_records_dropped_total",
+    "Log records dropped because the log queue was full.",
+    (),
+    lambda: {(): DroppingQueueHandler.dropped},
+    kind="counter",
+)
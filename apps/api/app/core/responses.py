@@ -0,0 +1,15 @@
+# apps/api/app/core/responses.py
+#
+# Класс ответа по умолчанию (FastAPI(default_response_class=...)).
+# Контент к этому моменту уже приведён к JSON-типам: с response_model —
+# pydantic-core (validate + serialize), без него — jsonable_encoder.
+# Здесь только байты: orjson, если установлен, иначе stdlib json.
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - необязательная зависимость
+    orjson = None
+
+DefaultJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
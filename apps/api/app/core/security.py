@@ -3,11 +3,59 @@
 from fastapi import HTTPException
 import hmac
 import hashlib
+import json
+import time
+from functools import lru_cache
 from urllib.parse import parse_qsl
 
+from app.core.cache import TTLCache
+from app.settings import settings
+
+# hash из initData -> (сырой initData, проверенный payload)
+init_data_cache = TTLCache(
+    "init_data",
+    maxsize=settings.init_data_cache_max_entries,
+    ttl_seconds=settings.init_data_cache_max_age_seconds,
+)
+
+
+@lru_cache(maxsize=4)
+def _webapp_secret_key(bot_token: str) -> bytes:
+    # секрет зависит только от токена бота — считаем один раз на процесс
+    return hmac.new(
+        b"WebAppData",
+        bot_token.encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+
+
+def _cache_ttl_for(data: dict) -> float:
+    # запись живёт не дольше, чем auth_date + max_age; без auth_date — не кэшируем
+    try:
+        auth_date = int(data.get("auth_date") or 0)
+    except (TypeError, ValueError):
+        return 0
+    return auth_date + settings.init_data_cache_max_age_seconds - time.time()
+
+
+def _raw_hash_param(init_data: str) -> str | None:
+    # hash — hex, url-экранирования в нём нет: достаточно найти параметр
+    for part in init_data.split("&"):
+        if part.startswith("hash="):
+            return part[5:]
+    return None
+
 
 def verify_telegram_init_data(init_data: str, bot_token: str) -> dict:
     # init_data: "query_id=...&user=...&auth_date=...&hash=..."
+
+    # тёплый путь: тот же initData уже проверялся (сравниваем строку целиком)
+    raw_hash = _raw_hash_param(init_data)
+    if raw_hash:
+        cached = init_data_cache.get((raw_hash,))
+        if cached is not None and cached[0] == init_data:
+            return cached[1]
+
     data = dict(parse_qsl(init_data, keep_blank_values=True))
     their_hash = data.pop("hash", None)
     if not their_hash:
@@ -16,14 +64,8 @@ def verify_telegram_init_data(init_data: str, bot_token: str) -> dict:
     pairs = [f"{k}={v}" for k, v in sorted(data.items())]
     check_string = "\n".join(pairs)
 
-    secret_key = hmac.new(
-        b"WebAppData",
-        bot_token.encode("utf-8"),
-        hashlib.sha256,
-    ).digest()
-
     our_hash = hmac.new(
-        secret_key,
+        _webapp_secret_key(bot_token),
         check_string.encode("utf-8"),
         hashlib.sha256,
     ).hexdigest()
@@ -34,7 +76,10 @@ def verify_telegram_init_data(init_data: str, bot_token: str) -> dict:
     # user приходит JSON строкой
     # вернём распарсенное как dict (дальше используем id)
     if "user" in data:
-        import json
         data["user"] = json.loads(data["user"])
 
+    ttl = _cache_ttl_for(data)
+    if ttl > 0:
+        init_data_cache.set((their_hash,), (init_data, data), ttl_seconds=ttl)
+
     return data
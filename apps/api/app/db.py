@@ -1,9 +1,66 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import declarative_base
 from .settings import settings
+from .repositories._sqlite_pragmas import apply_sqlite_pragmas
+from .core.metrics import install_db_metrics
 
 Base = declarative_base()
-engine = create_async_engine(settings.database_url, echo=False)
+
+
+def sqlite_pragmas_from_settings() -> dict:
+    if (settings.sqlite_profile or "PROD").upper() == "OFF":
+        return {}
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "temp_store": settings.sqlite_temp_store,
+    }
+
+
+def install_sqlite_pragmas(async_engine: AsyncEngine, pragmas: dict) -> None:
+    if async_engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        apply_sqlite_pragmas(dbapi_conn, pragmas)
+
+
+def make_engine(database_url: str) -> AsyncEngine:
+    url = make_url(database_url)
+
+    if url.get_backend_name() != "postgresql":
+        eng = create_async_engine(url, echo=False)
+        install_sqlite_pragmas(eng, sqlite_pragmas_from_settings())
+        return eng
+
+    connect_args = {}
+    if url.get_driver_name() == "asyncpg":
+        # кэш на стороне SQLAlchemy-адаптера + собственный кэш asyncpg
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.db_statement_cache_size)}
+        )
+        connect_args["statement_cache_size"] = settings.db_statement_cache_size
+
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+    )
+
+
+engine = make_engine(settings.database_url)
+install_db_metrics(engine)
 SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
 
 async def get_db():
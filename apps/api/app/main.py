@@ -1,16 +1,21 @@
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, RequestLogMiddleware
 setup_logging()
 
 from fastapi import FastAPI
-from sqlalchemy import select
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi.middleware.cors import CORSMiddleware
 
-from .db import Base, engine, SessionLocal 
-from .models import ChallengeTemplate
+from .db import engine
 from .settings import settings
+from .core.metrics import MetricsMiddleware
+from .core.responses import DefaultJSONResponse
+from .repositories.schema_repo import migrate
 
 from app.services.auto_assign import auto_assign_missed
+from app.services.close_schedule import start_close_jobs
+from app.services.challenge_stats import start_stats_jobs
+from app.services.health_sampler import health_sampler
+from app.services.scheduler_leader import scheduler_leader
 
 from app.routers.health import router as health_router
 from app.routers.templates import router as templates_router
@@ -18,99 +23,66 @@ from app.routers.today import router as today_router
 from app.routers.daily_log import router as daily_log_router
 from app.routers.history import router as history_router
 from app.routers.challenges import router as challenges_router
+from app.routers.export import router as export_router
 from app.routers.diag import router as diag_router
+from app.routers.metrics import router as metrics_router
 
 import logging
-log = logging.getLogger("lifetracker.auth")
+initdata_log = logging.getLogger("lifetracker.initdata")
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, default_response_class=DefaultJSONResponse)
 app.include_router(health_router)
 app.include_router(templates_router)
 app.include_router(today_router)
 app.include_router(daily_log_router)
 app.include_router(history_router)
 app.include_router(challenges_router)
+app.include_router(export_router)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=False,
     allow_methods=["*"],
-    allow_headers=["*"],)
+    allow_headers=["*"],
+    expose_headers=["X-Next-Before", "X-Request-ID"],)
 app.include_router(diag_router)
+app.include_router(metrics_router)
+app.add_middleware(MetricsMiddleware)
 
-@app.middleware("http")
-async def _log_initdata_header(request, call_next):
-    if request.url.path in ("/today", "/templates"):
-        init_data = request.headers.get("x-telegram-init-data")  # None если нет
-        ua = request.headers.get("user-agent", "")
-        state = (
-            "ABSENT" if init_data is None else
-            "EMPTY" if init_data == "" else
-            f"len={len(init_data)} head={init_data[:60]!r}"
-        )
-        log.warning("UA=%r | X-Telegram-Init-Data %s", ua[:120], state)
-    return await call_next(request)
+class _InitDataTrace:
+    """Трасса X-Telegram-Init-Data для /today и /templates (прорежена, см. log_sample_every)."""
 
-@app.on_event("startup")
-async def on_startup():
-    # 1) Таблицы
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-        # --- SAFE ALTER: challenges.deleted_at (soft-delete) ---
-        try:
-            res = await conn.exec_driver_sql("PRAGMA table_info(challenges)")
-            cols = [row[1] for row in res.fetchall()]  # row[1] = name
-            if "deleted_at" not in cols:
-                await conn.exec_driver_sql("ALTER TABLE challenges ADD COLUMN deleted_at DATETIME")
-        except Exception as e:
-            # не блокируем запуск, но логируем
-            log.warning("SAFE ALTER challenges.deleted_at failed: %r", e)
-
-    # 2) Инициализация 3 шаблонов (добавляем только недостающие)
-    async with SessionLocal() as db:
-        need = {
-            "Fit": dict(
-                title="Fit",
-                description="Домашняя тренировка каждый день (минимум — короткая сессия).",
-                miss_policy="FAIL",
-                min_minutes=10,
-                min_activity_text="Минимум 10 минут движения/упражнений дома",
-                bonus_text="Бонус: 30+ минут или более сложная тренировка",
-            ),
-            "Reading": dict(
-                title="Reading",
-                description="Читать каждый день (книга/статья).",
-                miss_policy="FAIL",
-                min_minutes=10,
-                min_activity_text="Минимум 10 минут чтения",
-                bonus_text="Бонус: 30+ минут или конспект",
-            ),
-            "Python": dict(
-                title="Python",
-                description="Учить Python каждый день (практика/разбор кода).",
-                miss_policy="FAIL",
-                min_minutes=20,
-                min_activity_text="Минимум 20 минут практики/разбора",
-                bonus_text="Бонус: решить 1 задачу или сделать мини-правку",
-            ),
-        }
-
-        q = await db.execute(select(ChallengeTemplate))
-        existing = {t.title for t in q.scalars().all()}
-
-        to_add = []
-        for title, data in need.items():
-            if title not in existing:
-                to_add.append(ChallengeTemplate(**data))
-
-        if to_add:
-            db.add_all(to_add)
-            await db.commit()
-
-    # 3) Планировщик (один экземпляр)
-    if not getattr(app.state, "scheduler", None):
-        scheduler = AsyncIOScheduler(timezone="UTC")
+    PATHS = ("/today", "/templates")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.PATHS and initdata_log.isEnabledFor(logging.INFO):
+            headers = dict(scope["headers"])
+            init_data = headers.get(b"x-telegram-init-data")  # None если нет
+            if init_data is not None:
+                init_data = init_data.decode("latin-1")
+            state = (
+                "ABSENT" if init_data is None else
+                "EMPTY" if init_data == "" else
+                f"len={len(init_data)} head={init_data[:60]!r}"
+            )
+            initdata_log.info(
+                "X-Telegram-Init-Data %s",
+                state,
+                extra={"ua": headers.get(b"user-agent", b"").decode("latin-1")[:120]},
+            )
+        await self.app(scope, receive, send)
+
+app.add_middleware(_InitDataTrace)
+app.add_middleware(RequestLogMiddleware)
+
+async def _start_scheduler():
+    if getattr(app.state, "scheduler", None):
+        return
+    scheduler = AsyncIOScheduler(timezone="UTC")
+    if (settings.close_schedule_mode or "TZ").upper() == "INTERVAL":
         scheduler.add_job(
             auto_assign_missed,
             trigger="interval",
@@ -120,6 +92,33 @@ async def on_startup():
             coalesce=True,
             max_instances=1,
         )
-        scheduler.start()
-        app.state.scheduler = scheduler
+    else:
+        await start_close_jobs(scheduler, settings.close_tz_refresh_minutes)
+    start_stats_jobs(scheduler)
+    scheduler.start()
+    app.state.scheduler = scheduler
+
+
+async def _stop_scheduler():
+    scheduler = getattr(app.state, "scheduler", None)
+    if scheduler is not None:
+        scheduler.shutdown(wait=False)
+        app.state.scheduler = None
+
+
+@app.on_event("startup")
+async def on_startup():
+    # 1) Схема и шаблоны: версионированные миграции (актуальная версия — без DDL)
+    await migrate(engine)
+
+    # 2) Планировщик — только в воркере, держащем аренду (services/scheduler_leader)
+    await scheduler_leader.start(_start_scheduler, _stop_scheduler)
+
+    # 3) Фоновый сэмплер для /diag (build, БД, публичный API)
+    await health_sampler.start(settings.admin_telegram_id)
+
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await scheduler_leader.stop()
+    await health_sampler.stop()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, Date, ForeignKey, Text, DateTime, Index
 from sqlalchemy.sql import func
 from datetime import datetime
 from .db import Base
@@ -6,12 +6,19 @@ from .db import Base
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True)
-    telegram_id = Column(Integer, unique=True, nullable=False, index=True)
+    # id Telegram давно вышли за int32 (важно для PostgreSQL)
+    telegram_id = Column(BigInteger, unique=True, nullable=False, index=True)
     username = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     timezone = Column(String, nullable=False, default="Europe/Vilnius")
     last_closed_date = Column(Date, nullable=True)
 
+    __table_args__ = (
+        # поиск должников закрытия дня: timezone = ? AND last_closed_date < ?
+        # (проход по всем таймзонам — каждые close_tz_refresh_minutes)
+        Index("ix_users_timezone_last_closed_date", "timezone", "last_closed_date"),
+    )
+
 class Challenge(Base):
     __tablename__ = "challenges"
     id = Column(Integer, primary_key=True)
@@ -63,9 +70,15 @@ class DailyLog(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    edited_at = Column(DateTime)
+    edited_at = Column(DateTime(timezone=True))
     edited_origin = Column(String)
 
+    __table_args__ = (
+        # Один факт на (user, challenge, day): ключ всех горячих запросов,
+        # ON CONFLICT для upsert и опора anti-join закрытия дня.
+        Index("ux_daily_log_user_challenge_date", "user_id", "challenge_id", "date", unique=True),
+    )
+
 class ChallengeTemplate(Base):
     __tablename__ = "challenge_templates"
     id = Column(Integer, primary_key=True)
@@ -92,3 +105,65 @@ class ChallengeTemplate(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+
+class ChallengeStats(Base):
+    """
+    Счётчики челленджа, поддерживаемые на записи (services/challenge_stats).
+    Серия — подряд идущие дни MIN/BONUS; SKIP серию не рвёт и не продлевает,
+    FAIL и пропущенный день — рвут.
+    """
+    __tablename__ = "challenge_stats"
+    challenge_id = Column(Integer, ForeignKey("challenges.id"), primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    current_streak = Column(Integer, nullable=False, default=0)
+    best_streak = Column(Integer, nullable=False, default=0)
+    # последний день с логом (хвост серии)
+    last_date = Column(Date, nullable=True)
+
+    count_min = Column(Integer, nullable=False, default=0)
+    count_bonus = Column(Integer, nullable=False, default=0)
+    count_skip = Column(Integer, nullable=False, default=0)
+    count_fail = Column(Integer, nullable=False, default=0)
+    minutes_total = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class DailySummary(Base):
+    """
+    Сводка дня пользователя по daily_log (services/daily_summary):
+    число логов, счётчики по status_view и сумма минут.
+    Правится дельтами в транзакции записи логов (под блокировкой записи пользователя).
+    """
+    __tablename__ = "daily_summary"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, autoincrement=False)
+    date = Column(Date, primary_key=True)
+
+    total = Column(Integer, nullable=False, default=0)
+    count_min = Column(Integer, nullable=False, default=0)
+    count_bonus = Column(Integer, nullable=False, default=0)
+    count_skip = Column(Integer, nullable=False, default=0)
+    count_fail = Column(Integer, nullable=False, default=0)
+    minutes_total = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+    # номер шага из repositories/schema_repo.MIGRATIONS
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class SchedulerLease(Base):
+    """
+    Аренда фоновых задач между воркерами (services/scheduler_leader):
+    планировщик запускает только текущий holder, пока expires_at в будущем.
+    """
+    __tablename__ = "scheduler_lease"
+    name = Column(String, primary_key=True)
+    # "host:pid:token" воркера-лидера
+    holder = Column(String, nullable=False)
+    acquired_at = Column(DateTime(timezone=True), nullable=False)
+    renewed_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,17 +1,11 @@
-﻿import sqlite3
-from pathlib import Path
+import asyncio
 
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 
-def _resolve_db_path() -> Path:
-    api_root = Path(__file__).resolve().parents[2]  # .../apps/api
-    candidates = [
-        api_root / "life_tracker.db",
-        api_root / "app" / "life_tracker.db",
-    ]
-    for p in candidates:
-        if p.exists():
-            return p
-    return candidates[0]
+from app.repositories.daily_summary_repo import find_summary_drift
+from app.settings import settings
 
 
 # PROD must-have (по факту: daily_log, без history)
@@ -24,49 +18,76 @@ MUST_TABLES = {
 
 # optional tables (может появиться позже)
 OPTIONAL_TABLES = {
+    "daily_summary",
+    "scheduler_lease",
     "history",
     "daily_logs",  # если в будущем переименуем
 }
 
 
-def run_db_check():
-    db_path = _resolve_db_path()
-    uri = f"file:{db_path}?mode=ro"
-    con = sqlite3.connect(uri, uri=True)
-    cur = con.cursor()
-
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = {r[0] for r in cur.fetchall()}
+def _check(sync_conn, label: str) -> None:
+    tables = set(inspect(sync_conn).get_table_names())
 
     missing = MUST_TABLES - tables
     if missing:
         # DEV база может отличаться — smoke не должен падать
-        print(f"DB CHECK SKIP (schema mismatch, missing={sorted(missing)}) ({db_path})")
+        print(f"DB CHECK SKIP (schema mismatch, missing={sorted(missing)}) ({label})")
         return
 
     # orphans for daily_log
-    cur.execute("""
+    orphans = sync_conn.execute(text("""
         SELECT COUNT(*)
         FROM daily_log dl
         LEFT JOIN users u ON u.id = dl.user_id
         LEFT JOIN challenges c ON c.id = dl.challenge_id
         WHERE u.id IS NULL OR c.id IS NULL
-    """)
-    if cur.fetchone()[0] != 0:
+    """)).scalar()
+    if orphans != 0:
         raise RuntimeError("Orphan daily_log detected")
 
-    # duplicates for daily_log (soft uniqueness check)
-    cur.execute("""
+    # duplicates for daily_log (страховка к уникальному индексу)
+    dup = sync_conn.execute(text("""
         SELECT user_id, challenge_id, date, COUNT(*)
         FROM daily_log
         GROUP BY user_id, challenge_id, date
         HAVING COUNT(*) > 1
-    """)
-    if cur.fetchone():
+    """)).first()
+    if dup:
         raise RuntimeError("Duplicate daily_log entries detected")
 
+    # сводка дня против сырых логов (если миграция её уже создала)
+    if "daily_summary" in tables:
+        drift, examples = find_summary_drift(sync_conn)
+        if drift:
+            raise RuntimeError(
+                f"daily_summary drift detected: {drift} day(s), e.g. (user_id, date) {examples}"
+            )
+
     extras = sorted((tables - MUST_TABLES) & OPTIONAL_TABLES)
     if extras:
-        print(f"DB CHECK OK (+optional={extras}) ({db_path})")
+        print(f"DB CHECK OK (+optional={extras}) ({label})")
     else:
-        print(f"DB CHECK OK ({db_path})")
+        print(f"DB CHECK OK ({label})")
+
+
+async def _run(database_url: str) -> None:
+    url = make_url(database_url)
+    label = url.render_as_string(hide_password=True)
+    if url.get_backend_name() == "sqlite" and url.database:
+        # как и раньше — файл открываем только на чтение
+        url = url.set(database=f"file:{url.database}").update_query_dict(
+            {"mode": "ro", "uri": "true"}
+        )
+
+    # отдельный engine без PRAGMA-профиля: проверка только читает
+    eng = create_async_engine(url)
+    try:
+        async with eng.connect() as conn:
+            await conn.run_sync(_check, label)
+    finally:
+        await eng.dispose()
+
+
+def run_db_check(database_url: str | None = None):
+    """Работает на SQLite и PostgreSQL — по DATABASE_URL приложения."""
+    asyncio.run(_run(database_url or settings.database_url))
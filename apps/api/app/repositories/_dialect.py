@@ -0,0 +1,14 @@
+# apps/api/app/repositories/_dialect.py
+#
+# INSERT с поддержкой ON CONFLICT под текущий диалект сессии/соединения.
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+# уникальный ключ daily_log (см. models.DailyLog.__table_args__)
+DAILY_LOG_KEY = ["user_id", "challenge_id", "date"]
+
+
+def dialect_insert(bind, table):
+    if bind.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
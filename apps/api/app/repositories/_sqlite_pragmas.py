@@ -0,0 +1,35 @@
+# apps/api/app/repositories/_sqlite_pragmas.py
+#
+# PRAGMA-профиль SQLite: применяется на каждом новом соединении (engine "connect")
+# и читается обратно для /diag.
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# порядок важен: journal_mode до synchronous
+PRAGMA_NAMES = (
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "mmap_size",
+    "cache_size",
+    "temp_store",
+)
+
+
+def apply_sqlite_pragmas(dbapi_conn, pragmas: dict) -> None:
+    cur = dbapi_conn.cursor()
+    try:
+        for name in PRAGMA_NAMES:
+            if name in pragmas and pragmas[name] is not None:
+                cur.execute(f"PRAGMA {name}={pragmas[name]}")
+    finally:
+        cur.close()
+
+
+async def get_sqlite_pragmas(db: AsyncSession) -> dict:
+    out = {}
+    for name in PRAGMA_NAMES:
+        q = await db.execute(text(f"PRAGMA {name}"))
+        out[name] = q.scalar()
+    return out
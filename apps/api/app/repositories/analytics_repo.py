@@ -0,0 +1,58 @@
+# apps/api/app/repositories/analytics_repo.py
+
+from datetime import date
+
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Challenge, ChallengeStats, DailyLog
+from app.repositories.history_repo import status_view_case
+
+
+async def get_challenge_window_rows(
+    db: AsyncSession, user_id: int, challenge_id: int, since: date, until: date
+) -> list[tuple] | None:
+    """
+    (date, status_view, minutes_fact) логов челленджа за [since, until] — кортежи,
+    статус считает БД (status_view_case). Челлендж — ведущая таблица LEFT JOIN:
+    None — не найден/не принадлежит пользователю, [] — логов в окне нет.
+    """
+    q = await db.execute(
+        select(Challenge.id, DailyLog.date, status_view_case, DailyLog.minutes_fact)
+        .select_from(Challenge)
+        .outerjoin(
+            DailyLog,
+            and_(
+                DailyLog.challenge_id == Challenge.id,
+                DailyLog.user_id == Challenge.user_id,
+                DailyLog.date >= since,
+                DailyLog.date <= until,
+            ),
+        )
+        .where(and_(Challenge.id == challenge_id, Challenge.user_id == user_id))
+    )
+    rows = q.tuples().all()
+    if not rows:
+        return None
+    return [row[1:] for row in rows if row[1] is not None]
+
+
+async def get_challenge_version(db: AsyncSession, user_id: int, challenge_id: int) -> tuple | None:
+    """
+    Версия логов челленджа для сверки кэша между воркерами: строка challenge_stats
+    по первичному ключу (её переписывает каждая запись логов, ручная и AUTO).
+    None — счётчиков ещё нет.
+    """
+    q = await db.execute(
+        select(
+            ChallengeStats.updated_at,
+            ChallengeStats.last_date,
+            ChallengeStats.count_min,
+            ChallengeStats.count_bonus,
+            ChallengeStats.count_skip,
+            ChallengeStats.count_fail,
+            ChallengeStats.minutes_total,
+        ).where(and_(ChallengeStats.challenge_id == challenge_id, ChallengeStats.user_id == user_id))
+    )
+    row = q.first()
+    return tuple(row) if row is not None else None
@@ -1,47 +1,110 @@
 # apps/api/app/repositories/auto_assign_repo.py
 
 from datetime import date
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, and_, or_, case
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User, Challenge, DailyLog
+from app.repositories._dialect import DAILY_LOG_KEY, dialect_insert
 
 
-async def get_all_users(db: AsyncSession) -> list[User]:
-    q = await db.execute(select(User))
-    return q.scalars().all()
+async def get_user_timezones(db: AsyncSession) -> list[str]:
+    q = await db.execute(select(User.timezone).distinct())
+    return [tz for (tz,) in q.all()]
 
 
-async def get_active_user_challenges(db: AsyncSession, user_id: int) -> list[Challenge]:
+async def get_due_users(
+    db: AsyncSession,
+    tz_name: str,
+    yesterday: date,
+    after_id: int,
+    limit: int,
+) -> list[tuple[int, date | None]]:
+    """
+    Пользователи таймзоны, у которых "вчера" ещё не закрыто.
+    Keyset-пагинация по id: (id, last_closed_date).
+    """
     q = await db.execute(
-        select(Challenge).where(
+        select(User.id, User.last_closed_date)
+        .where(
             and_(
-                Challenge.user_id == user_id,
-                Challenge.is_active == True,
-                Challenge.is_template == False,
+                User.timezone == tz_name,
+                User.id > after_id,
+                or_(
+                    User.last_closed_date.is_(None),
+                    User.last_closed_date < yesterday,
+                ),
             )
         )
+        .order_by(User.id.asc())
+        .limit(limit)
     )
-    return q.scalars().all()
+    return [(row.id, row.last_closed_date) for row in q.all()]
 
 
-async def get_daily_log_for_date(
+async def get_close_candidates(
     db: AsyncSession,
-    user_id: int,
-    challenge_id: int,
-    day: date,
-) -> DailyLog | None:
+    user_ids: list[int],
+    since: date,
+    until: date,
+) -> list[tuple[int, int, str, date | None]]:
+    """
+    Активные челленджи пользователей пачки + даты их логов в [since, until]
+    (LEFT JOIN: строка на каждый лог окна, челлендж без логов — одна строка с None).
+    Недостающие дни вычисляет сервис. Возвращает (user_id, challenge_id,
+    miss_policy, date); у NO_DO политика всегда MIN (невыполнение — успех),
+    что бы ни лежало в колонке.
+    """
+    miss_policy = case(
+        (Challenge.type == "NO_DO", "MIN"), else_=Challenge.miss_policy
+    ).label("miss_policy")
     q = await db.execute(
-        select(DailyLog).where(
+        select(Challenge.user_id, Challenge.id, miss_policy, DailyLog.date)
+        .outerjoin(
+            DailyLog,
             and_(
-                DailyLog.user_id == user_id,
-                DailyLog.challenge_id == challenge_id,
-                DailyLog.date == day,
+                DailyLog.user_id == Challenge.user_id,
+                DailyLog.challenge_id == Challenge.id,
+                DailyLog.date >= since,
+                DailyLog.date <= until,
+            ),
+        )
+        .where(
+            and_(
+                Challenge.user_id.in_(user_ids),
+                Challenge.is_active == True,
+                Challenge.is_template == False,
+                Challenge.deleted_at.is_(None),
             )
         )
+        .order_by(Challenge.user_id.asc(), Challenge.id.asc())
     )
-    return q.scalar_one_or_none()
+    return [tuple(row) for row in q.all()]
+
 
+async def bulk_create_auto_logs(db: AsyncSession, rows: list[dict]) -> set[tuple[int, date]]:
+    """
+    Один INSERT на всю пачку: Core executemany, statement компилируется
+    один раз и кэшируется (в отличие от .values([...]) на каждый вызов).
+    ON CONFLICT DO NOTHING: ручная отметка, успевшая между anti-join и
+    INSERT, побеждает. Возвращает (challenge_id, date) реально вставленных
+    строк (RETURNING отдаёт только их).
+    """
+    if not rows:
+        return set()
+    stmt = (
+        dialect_insert(db.get_bind(), DailyLog.__table__)
+        .on_conflict_do_nothing(index_elements=DAILY_LOG_KEY)
+        .returning(DailyLog.challenge_id, DailyLog.date)
+    )
+    q = await db.execute(stmt, rows)
+    return {tuple(row) for row in q.all()}
 
-async def create_daily_log(db: AsyncSession, log: DailyLog) -> None:
-    db.add(log)
+
+async def mark_users_closed(db: AsyncSession, user_ids: list[int], day: date) -> None:
+    await db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(last_closed_date=day)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,145 @@
+# apps/api/app/repositories/challenge_stats_repo.py
+
+from collections.abc import AsyncIterator
+from datetime import date
+
+from sqlalchemy import select, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Challenge, ChallengeStats, DailyLog
+from app.repositories._dialect import dialect_insert
+
+STATS_COLUMNS = (
+    "current_streak",
+    "best_streak",
+    "last_date",
+    "count_min",
+    "count_bonus",
+    "count_skip",
+    "count_fail",
+    "minutes_total",
+)
+
+# для пересчёта статуса из лога (см. services.status.compute_status_view)
+LOG_STATUS_COLUMNS = (
+    DailyLog.flag_min,
+    DailyLog.flag_bonus,
+    DailyLog.flag_skip,
+    DailyLog.flag_fail,
+    DailyLog.minutes_fact,
+)
+
+
+# колонки, а не ORM-объект: строка счётчиков потом переписывается Core-upsert'ом,
+# и устаревший экземпляр в identity map сессии не нужен
+_STATS_NAMES = ("challenge_id", "user_id", *STATS_COLUMNS)
+_STATS_SELECT = tuple(getattr(ChallengeStats, name) for name in _STATS_NAMES)
+
+
+def _stats_dict(row) -> dict:
+    return dict(row._mapping)
+
+
+async def get_owned_challenge_state(
+    db: AsyncSession, user_id: int, keys: list[tuple[int, date]]
+) -> tuple[dict[int, dict | None], dict[tuple[int, date], tuple]]:
+    """
+    Всё, что нужно записи логов по keys=(challenge_id, date), одним запросом:
+    владение + текущие счётчики + прежние логи (LEFT OUTER JOIN'ы от челленджа).
+    Возвращает (owned, old):
+    owned — только челленджи пользователя, None — счётчиков ещё нет;
+    old — (flag_min, flag_bonus, flag_skip, flag_fail, minutes_fact) по ключам,
+    у которых лог уже есть.
+    """
+    q = await db.execute(
+        select(
+            Challenge.id.label("owned_id"),
+            *_STATS_SELECT,
+            DailyLog.date.label("log_date"),
+            *LOG_STATUS_COLUMNS,
+        )
+        .select_from(Challenge)
+        .outerjoin(ChallengeStats, ChallengeStats.challenge_id == Challenge.id)
+        .outerjoin(
+            DailyLog,
+            and_(
+                DailyLog.user_id == Challenge.user_id,
+                DailyLog.challenge_id == Challenge.id,
+                DailyLog.date.in_(sorted({d for _, d in keys})),
+            ),
+        )
+        .where(
+            and_(
+                Challenge.user_id == user_id,
+                Challenge.id.in_(sorted({cid for cid, _ in keys})),
+            )
+        )
+    )
+    wanted = set(keys)
+    owned: dict[int, dict | None] = {}
+    old: dict[tuple[int, date], tuple] = {}
+    log_at = 1 + len(_STATS_NAMES)
+    for row in q.all():
+        stats = dict(zip(_STATS_NAMES, row[1:log_at]))
+        owned[row.owned_id] = stats if stats["challenge_id"] is not None else None
+        key = (row.owned_id, row.log_date)
+        if key in wanted:
+            old[key] = tuple(row[log_at + 1 :])
+    return owned, old
+
+
+async def get_challenge_stats(db: AsyncSession, challenge_ids: list[int]) -> dict[int, dict]:
+    q = await db.execute(
+        select(*_STATS_SELECT).where(ChallengeStats.challenge_id.in_(challenge_ids))
+    )
+    return {row.challenge_id: _stats_dict(row) for row in q.all()}
+
+
+async def stream_challenge_logs(
+    db: AsyncSession, challenge_ids: list[int]
+) -> AsyncIterator[tuple]:
+    """
+    История челленджей для полного пересчёта, по (challenge_id, date).
+    (challenge_id, user_id, date, flag_min, flag_bonus, flag_skip, flag_fail, minutes_fact)
+    Читаем пачками: построчный async-итератор платит переключением greenlet за строку.
+    """
+    result = await db.stream(
+        select(DailyLog.challenge_id, DailyLog.user_id, DailyLog.date, *LOG_STATUS_COLUMNS)
+        .where(DailyLog.challenge_id.in_(challenge_ids))
+        .order_by(DailyLog.challenge_id.asc(), DailyLog.date.asc())
+        .execution_options(yield_per=5000)
+    )
+    async for partition in result.partitions():
+        for row in partition:
+            yield tuple(row)
+
+
+async def get_challenge_ids_page(
+    db: AsyncSession, after_id: int, limit: int, only_missing: bool = False
+) -> list[tuple[int, int]]:
+    """Keyset-страница (challenge_id, user_id) для пересчёта; only_missing — без строки счётчиков."""
+    stmt = select(Challenge.id, Challenge.user_id).where(
+        and_(Challenge.id > after_id, Challenge.is_template == False)
+    )
+    if only_missing:
+        stmt = stmt.outerjoin(
+            ChallengeStats, ChallengeStats.challenge_id == Challenge.id
+        ).where(ChallengeStats.challenge_id.is_(None))
+    q = await db.execute(stmt.order_by(Challenge.id.asc()).limit(limit))
+    return [(cid, uid) for cid, uid in q.tuples().all()]
+
+
+async def upsert_challenge_stats(db: AsyncSession, rows: list[dict]) -> None:
+    """Пачка счётчиков одним executemany INSERT ... ON CONFLICT (challenge_id) DO UPDATE."""
+    if not rows:
+        return
+    stmt = dialect_insert(db.get_bind(), ChallengeStats.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["challenge_id"],
+        set_={
+            **{name: stmt.excluded[name] for name in STATS_COLUMNS},
+            # onupdate не срабатывает внутри ON CONFLICT — проставляем явно
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt, rows)
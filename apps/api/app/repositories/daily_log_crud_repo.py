@@ -1,8 +1,9 @@
-from datetime import date
-from sqlalchemy import select, and_
+from datetime import datetime, timezone
+from sqlalchemy import select, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Challenge, DailyLog
+from app.repositories._dialect import DAILY_LOG_KEY, dialect_insert
 
 
 async def get_user_challenge(
@@ -16,23 +17,37 @@ async def get_user_challenge(
     return q.scalar_one_or_none()
 
 
-async def get_daily_log(
-    db: AsyncSession,
-    user_id: int,
-    challenge_id: int,
-    d: date,
-) -> DailyLog | None:
-    q = await db.execute(
-        select(DailyLog).where(
-            and_(
-                DailyLog.user_id == user_id,
-                DailyLog.challenge_id == challenge_id,
-                DailyLog.date == d,
-            )
-        )
-    )
-    return q.scalar_one_or_none()
+# колонки, которые задаёт ручная фиксация
+MANUAL_VALUE_COLUMNS = (
+    "flag_min",
+    "flag_bonus",
+    "flag_skip",
+    "flag_fail",
+    "minutes_fact",
+    "comment",
+)
 
 
-async def create_daily_log(db: AsyncSession, log: DailyLog) -> None:
-    db.add(log)
+async def upsert_manual_daily_logs(db: AsyncSession, rows: list[dict]) -> None:
+    """
+    Пачка ручных фиксаций: один statement, executemany.
+    rows: user_id / challenge_id / date + flag_* / minutes_fact / comment.
+    Новая запись — MANUAL; существующая — MANUAL + след правки (edited_*),
+    значения берутся из EXCLUDED.
+    """
+    if not rows:
+        return
+    stmt = dialect_insert(db.get_bind(), DailyLog.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=DAILY_LOG_KEY,
+        set_={
+            **{
+                name: stmt.excluded[name]
+                for name in (*MANUAL_VALUE_COLUMNS, "origin")
+            },
+            "edited_at": datetime.now(timezone.utc),
+            "edited_origin": "MANUAL",
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt, [{**row, "origin": "MANUAL"} for row in rows])
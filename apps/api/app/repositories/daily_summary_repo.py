@@ -0,0 +1,105 @@
+# apps/api/app/repositories/daily_summary_repo.py
+
+from datetime import date
+
+from sqlalchemy import select, delete, and_, or_, case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import DailyLog, DailySummary
+from app.repositories._dialect import dialect_insert
+from app.repositories.history_repo import status_view_case
+
+SUMMARY_KEY = ["user_id", "date"]
+
+SUMMARY_COLUMNS = (
+    "total",
+    "count_min",
+    "count_bonus",
+    "count_skip",
+    "count_fail",
+    "minutes_total",
+)
+
+
+def _count_status(status: str):
+    return func.sum(case((status_view_case == status, 1), else_=0))
+
+
+def summary_from_logs(*conditions):
+    """
+    Та же сводка, посчитанная из daily_log (GROUP BY user_id, date):
+    источник истины для пересборки и проверки.
+    """
+    stmt = select(
+        DailyLog.user_id,
+        DailyLog.date,
+        func.count().label("total"),
+        _count_status("MIN").label("count_min"),
+        _count_status("BONUS").label("count_bonus"),
+        _count_status("SKIP").label("count_skip"),
+        _count_status("FAIL").label("count_fail"),
+        func.coalesce(func.sum(DailyLog.minutes_fact), 0).label("minutes_total"),
+    )
+    if conditions:
+        stmt = stmt.where(and_(*conditions))
+    return stmt.group_by(DailyLog.user_id, DailyLog.date)
+
+
+def rebuild_daily_summary(sync_conn) -> None:
+    """Полная пересборка одним INSERT ... SELECT (sync — для conn.run_sync)."""
+    sync_conn.execute(delete(DailySummary))
+    sync_conn.execute(
+        DailySummary.__table__.insert().from_select(
+            ["user_id", "date", *SUMMARY_COLUMNS], summary_from_logs()
+        )
+    )
+
+
+def find_summary_drift(sync_conn, limit: int = 5) -> tuple[int, list[tuple[int, date]]]:
+    """
+    Расхождения сводки с daily_log: дни без строки/с другими счётчиками
+    и строки сводки без логов. Возвращает (число дней, примеры (user_id, date)).
+    """
+    raw = summary_from_logs().subquery()
+    s = DailySummary.__table__
+
+    differs = [s.c[name] != raw.c[name] for name in SUMMARY_COLUMNS]
+    stale = (
+        select(raw.c.user_id, raw.c.date)
+        .select_from(
+            raw.outerjoin(s, and_(s.c.user_id == raw.c.user_id, s.c.date == raw.c.date))
+        )
+        .where(or_(s.c.user_id.is_(None), *differs))
+    )
+    orphan = (
+        select(s.c.user_id, s.c.date)
+        .select_from(
+            s.outerjoin(raw, and_(s.c.user_id == raw.c.user_id, s.c.date == raw.c.date))
+        )
+        .where(and_(raw.c.user_id.is_(None), s.c.total != 0))
+    )
+
+    bad: list[tuple[int, date]] = []
+    for stmt in (stale, orphan):
+        bad += [tuple(row) for row in sync_conn.execute(stmt).all()]
+    return len(bad), sorted(bad)[:limit]
+
+
+async def apply_summary_deltas(db: AsyncSession, rows: list[dict]) -> None:
+    """
+    Дельты по (user_id, date) одним executemany:
+    INSERT ... ON CONFLICT DO UPDATE SET col = col + EXCLUDED.col.
+    Сложение на стороне БД — параллельные записи одного дня не теряют друг друга.
+    """
+    if not rows:
+        return
+    table = DailySummary.__table__
+    stmt = dialect_insert(db.get_bind(), table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=SUMMARY_KEY,
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in SUMMARY_COLUMNS},
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt, rows)
@@ -0,0 +1,43 @@
+# apps/api/app/repositories/export_repo.py
+
+from collections.abc import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import DailyLog, Challenge
+
+# строк на одну выборку из курсора (и на один кусок ответа)
+EXPORT_PARTITION_ROWS = 1000
+
+
+async def stream_user_logs(
+    db: AsyncSession,
+    user_id: int,
+    partition_rows: int = EXPORT_PARTITION_ROWS,
+) -> AsyncIterator[list]:
+    """
+    Все логи пользователя с названием челленджа, по дате.
+    Серверный курсор (AsyncSession.stream + yield_per): в памяти — одна пачка строк.
+    """
+    result = await db.stream(
+        select(
+            DailyLog.date,
+            DailyLog.challenge_id,
+            Challenge.title,
+            DailyLog.origin,
+            DailyLog.flag_min,
+            DailyLog.flag_bonus,
+            DailyLog.flag_skip,
+            DailyLog.flag_fail,
+            DailyLog.minutes_fact,
+            DailyLog.comment,
+            DailyLog.edited_at,
+        )
+        .join(Challenge, Challenge.id == DailyLog.challenge_id)
+        .where(DailyLog.user_id == user_id)
+        .order_by(DailyLog.date.asc(), DailyLog.challenge_id.asc())
+        .execution_options(yield_per=partition_rows)
+    )
+    async for partition in result.partitions():
+        yield partition
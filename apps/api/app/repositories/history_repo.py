@@ -1,36 +1,121 @@
 from datetime import date
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, case, cast, extract, Integer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import DailyLog, Challenge
+from app.models import Challenge, DailyLog, DailySummary
 
-async def get_day_logs(db: AsyncSession, user_id: int, day: date):
-    q = await db.execute(
-        select(DailyLog, Challenge.title)
-        .join(Challenge, Challenge.id == DailyLog.challenge_id)
-        .where(DailyLog.user_id == user_id)
-        .where(DailyLog.date == day)
-        .order_by(Challenge.title.asc())
-    )
-    return q.all()  # list[tuple[DailyLog, str]]
+# SQL-зеркало services.status.status_from_flags: FAIL > SKIP > BONUS > MIN
+status_view_case = case(
+    (DailyLog.flag_fail == True, "FAIL"),
+    (DailyLog.flag_skip == True, "SKIP"),
+    (DailyLog.flag_bonus == True, "BONUS"),
+    (DailyLog.flag_min == True, "MIN"),
+    else_=None,
+)
 
-async def get_challenge_logs_since(
+async def get_days_counts(
     db: AsyncSession,
     user_id: int,
-    challenge_id: int | None,
     since: date,
-) -> list[DailyLog]:
+    before: date | None = None,
+):
+    """Счётчики статусов по дням за [since, before) — готовые строки daily_summary."""
     conditions = [
-        DailyLog.user_id == user_id,
-        DailyLog.date >= since,
+        DailySummary.user_id == user_id,
+        DailySummary.date >= since,
+        DailySummary.total > 0,
     ]
-    if challenge_id is not None:
-        conditions.append(DailyLog.challenge_id == challenge_id)
+    if before is not None:
+        conditions.append(DailySummary.date < before)
 
     q = await db.execute(
-        select(DailyLog)
+        select(
+            DailySummary.date,
+            DailySummary.total,
+            DailySummary.count_min.label("min"),
+            DailySummary.count_bonus.label("bonus"),
+            DailySummary.count_skip.label("skip"),
+            DailySummary.count_fail.label("fail"),
+        )
         .where(and_(*conditions))
-        .order_by(DailyLog.date.desc())
+        .order_by(DailySummary.date.desc())
+    )
+    return q.all()
+
+
+async def has_logs_before(db: AsyncSession, user_id: int, day: date) -> bool:
+    q = await db.execute(
+        select(DailySummary.date)
+        .where(
+            and_(
+                DailySummary.user_id == user_id,
+                DailySummary.date < day,
+                DailySummary.total > 0,
+            )
+        )
+        .limit(1)
+    )
+    return q.first() is not None
+
+
+def _day_of_year(column):
+    # 1..366; на PostgreSQL EXTRACT отдаёт numeric — приводим к int
+    return cast(extract("doy", column), Integer)
+
+
+async def get_summary_counts_between(
+    db: AsyncSession, user_id: int, start: date, end: date
+) -> list[tuple]:
+    """(day_of_year, count_min, count_bonus, count_skip, count_fail) за [start, end) одного года."""
+    q = await db.execute(
+        select(
+            _day_of_year(DailySummary.date),
+            DailySummary.count_min,
+            DailySummary.count_bonus,
+            DailySummary.count_skip,
+            DailySummary.count_fail,
+        ).where(
+            and_(
+                DailySummary.user_id == user_id,
+                DailySummary.date >= start,
+                DailySummary.date < end,
+            )
+        )
+    )
+    return q.tuples().all()
+
+
+async def get_challenge_flags_between(
+    db: AsyncSession, user_id: int, challenge_id: int, start: date, end: date
+) -> list[tuple] | None:
+    """
+    (day_of_year, flag_min, flag_bonus, flag_skip, flag_fail) за [start, end) одного года —
+    без ORM-объектов. Челлендж — ведущая таблица LEFT JOIN (как в analytics_repo):
+    None — не найден/не принадлежит пользователю, [] — логов за год нет.
+    """
+    q = await db.execute(
+        select(
+            Challenge.id,
+            _day_of_year(DailyLog.date),
+            DailyLog.flag_min,
+            DailyLog.flag_bonus,
+            DailyLog.flag_skip,
+            DailyLog.flag_fail,
+        )
+        .select_from(Challenge)
+        .outerjoin(
+            DailyLog,
+            and_(
+                DailyLog.challenge_id == Challenge.id,
+                DailyLog.user_id == Challenge.user_id,
+                DailyLog.date >= start,
+                DailyLog.date < end,
+            ),
+        )
+        .where(and_(Challenge.id == challenge_id, Challenge.user_id == user_id))
     )
-    return q.scalars().all()
+    rows = q.tuples().all()
+    if not rows:
+        return None
+    return [row[1:] for row in rows if row[1] is not None]
@@ -0,0 +1,61 @@
+# apps/api/app/repositories/scheduler_lease_repo.py
+
+from datetime import datetime
+
+from sqlalchemy import select, delete, and_, or_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import SchedulerLease
+from app.repositories._dialect import dialect_insert
+
+
+async def try_acquire_lease(
+    db: AsyncSession,
+    name: str,
+    holder: str,
+    now: datetime,
+    expires_at: datetime,
+) -> bool:
+    """
+    Взять или продлить аренду одним INSERT ... ON CONFLICT DO UPDATE WHERE:
+    строки нет, она уже наша или истекла — пишем себя; иначе строка не
+    меняется и RETURNING пуст. Атомарно для любого числа воркеров.
+    Коммит — у вызывающего.
+    """
+    table = SchedulerLease.__table__
+    stmt = dialect_insert(db.get_bind(), table).values(
+        name=name,
+        holder=holder,
+        acquired_at=now,
+        renewed_at=now,
+        expires_at=expires_at,
+    )
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={
+            "holder": excluded.holder,
+            # продление не сбрасывает момент захвата
+            "acquired_at": case(
+                (table.c.holder == excluded.holder, table.c.acquired_at),
+                else_=excluded.acquired_at,
+            ),
+            "renewed_at": excluded.renewed_at,
+            "expires_at": excluded.expires_at,
+        },
+        where=or_(table.c.holder == excluded.holder, table.c.expires_at < excluded.renewed_at),
+    ).returning(table.c.holder)
+    q = await db.execute(stmt)
+    return q.scalar_one_or_none() == holder
+
+
+async def get_lease(db: AsyncSession, name: str) -> SchedulerLease | None:
+    q = await db.execute(select(SchedulerLease).where(SchedulerLease.name == name))
+    return q.scalar_one_or_none()
+
+
+async def release_lease(db: AsyncSession, name: str, holder: str) -> None:
+    # только свою: чужую (уже перехваченную) аренду не трогаем
+    await db.execute(
+        delete(SchedulerLease).where(and_(SchedulerLease.name == name, SchedulerLease.holder == holder))
+    )
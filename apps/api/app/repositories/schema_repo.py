@@ -0,0 +1,265 @@
+# apps/api/app/repositories/schema_repo.py
+#
+# Версионированные миграции схемы.
+# Шаги (sync-функции для conn.run_sync) пронумерованы в MIGRATIONS;
+# применённые записываются в schema_migrations. Если сохранённая версия
+# равна последней — старт не делает ни DDL, ни сидинга.
+
+import logging
+
+from sqlalchemy import select, delete, func, inspect, case
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db import Base
+from app.models import (
+    Challenge,
+    ChallengeStats,
+    ChallengeTemplate,
+    DailyLog,
+    DailySummary,
+    SchedulerLease,
+    SchemaMigration,
+    User,
+)
+from app.repositories._dialect import dialect_insert
+from app.repositories.daily_summary_repo import rebuild_daily_summary
+
+log = logging.getLogger("lifetracker.schema")
+
+DAILY_LOG_UNIQUE_INDEX = "ux_daily_log_user_challenge_date"
+# неуникальный предшественник (создавался до появления ux_*)
+LEGACY_DAILY_LOG_INDEX = "ix_daily_log_user_challenge_date"
+
+
+# колонки, добавленные в модели после первого релиза таблицы (nullable, без default)
+ADDED_COLUMNS = [
+    Challenge.__table__.c.deleted_at,
+]
+
+
+def ensure_added_columns(sync_conn) -> None:
+    """
+    ALTER TABLE ... ADD COLUMN для недостающих колонок.
+    Через inspector и компиляцию типа под диалект — работает и на SQLite, и на PostgreSQL.
+    """
+    insp = inspect(sync_conn)
+    for col in ADDED_COLUMNS:
+        table = col.table.name
+        existing = {c["name"] for c in insp.get_columns(table)}
+        if col.name in existing:
+            continue
+        col_type = col.type.compile(dialect=sync_conn.dialect)
+        sync_conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {col.name} {col_type}")
+        log.warning("schema: added column %s.%s %s", table, col.name, col_type)
+
+
+def dedupe_daily_log(sync_conn) -> int:
+    """
+    Оставляет по одной записи на (user_id, challenge_id, date):
+    MANUAL важнее AUTO, среди равных — самая свежая (max id).
+    Возвращает число удалённых строк.
+    """
+    groups = sync_conn.execute(
+        select(DailyLog.user_id, DailyLog.challenge_id, DailyLog.date)
+        .group_by(DailyLog.user_id, DailyLog.challenge_id, DailyLog.date)
+        .having(func.count() > 1)
+    ).all()
+
+    removed = 0
+    for user_id, challenge_id, day in groups:
+        ids = sync_conn.execute(
+            select(DailyLog.id)
+            .where(
+                DailyLog.user_id == user_id,
+                DailyLog.challenge_id == challenge_id,
+                DailyLog.date == day,
+            )
+            .order_by(
+                case((DailyLog.origin == "MANUAL", 0), else_=1),
+                DailyLog.id.desc(),
+            )
+        ).scalars().all()
+        drop_ids = ids[1:]
+        sync_conn.execute(delete(DailyLog).where(DailyLog.id.in_(drop_ids)))
+        removed += len(drop_ids)
+
+    return removed
+
+
+def ensure_daily_log_unique_key(sync_conn) -> None:
+    names = {ix["name"] for ix in inspect(sync_conn).get_indexes("daily_log")}
+    if DAILY_LOG_UNIQUE_INDEX in names:
+        return
+
+    removed = dedupe_daily_log(sync_conn)
+    if removed:
+        log.warning("daily_log: removed %d duplicate rows before unique index", removed)
+
+    if LEGACY_DAILY_LOG_INDEX in names:
+        sync_conn.exec_driver_sql(f"DROP INDEX IF EXISTS {LEGACY_DAILY_LOG_INDEX}")
+
+    for idx in DailyLog.__table__.indexes:
+        if idx.name == DAILY_LOG_UNIQUE_INDEX:
+            idx.create(sync_conn)
+
+
+# колонки, тип которых расширили после первого релиза (важно только для PostgreSQL:
+# SQLite не различает INTEGER/BIGINT и naive/aware TIMESTAMP)
+WIDENED_COLUMNS = [
+    User.__table__.c.telegram_id,
+    DailyLog.__table__.c.edited_at,
+]
+
+
+def widen_column_types(sync_conn) -> None:
+    if sync_conn.dialect.name != "postgresql":
+        return
+    insp = inspect(sync_conn)
+    for col in WIDENED_COLUMNS:
+        table = col.table.name
+        want = col.type.compile(dialect=sync_conn.dialect)
+        current = {c["name"]: c["type"] for c in insp.get_columns(table)}[col.name]
+        if current.compile(dialect=sync_conn.dialect) == want:
+            continue
+        sync_conn.exec_driver_sql(f"ALTER TABLE {table} ALTER COLUMN {col.name} TYPE {want}")
+        log.warning("schema: altered column %s.%s -> %s", table, col.name, want)
+
+
+def create_missing_indexes(sync_conn) -> None:
+    # create_all создаёт индексы только вместе с новой таблицей
+    for table in Base.metadata.sorted_tables:
+        for idx in table.indexes:
+            idx.create(sync_conn, checkfirst=True)
+
+
+DEFAULT_TEMPLATES = [
+    dict(
+        title="Fit",
+        description="Домашняя тренировка каждый день (минимум — короткая сессия).",
+        miss_policy="FAIL",
+        min_minutes=10,
+        min_activity_text="Минимум 10 минут движения/упражнений дома",
+        bonus_text="Бонус: 30+ минут или более сложная тренировка",
+    ),
+    dict(
+        title="Reading",
+        description="Читать каждый день (книга/статья).",
+        miss_policy="FAIL",
+        min_minutes=10,
+        min_activity_text="Минимум 10 минут чтения",
+        bonus_text="Бонус: 30+ минут или конспект",
+    ),
+    dict(
+        title="Python",
+        description="Учить Python каждый день (практика/разбор кода).",
+        miss_policy="FAIL",
+        min_minutes=20,
+        min_activity_text="Минимум 20 минут практики/разбора",
+        bonus_text="Бонус: решить 1 задачу или сделать мини-правку",
+    ),
+]
+
+
+def seed_default_templates(sync_conn) -> None:
+    """Добавляет только недостающие шаблоны (по title)."""
+    existing = set(sync_conn.execute(select(ChallengeTemplate.title)).scalars().all())
+    to_add = [t for t in DEFAULT_TEMPLATES if t["title"] not in existing]
+    if to_add:
+        sync_conn.execute(ChallengeTemplate.__table__.insert(), to_add)
+
+
+def create_challenge_stats(sync_conn) -> None:
+    # заполнение — задача challenge_stats_repair после старта (services/challenge_stats)
+    ChallengeStats.__table__.create(sync_conn, checkfirst=True)
+
+
+def create_daily_summary(sync_conn) -> None:
+    # заполнение — одним INSERT ... SELECT GROUP BY прямо в миграции
+    DailySummary.__table__.create(sync_conn, checkfirst=True)
+    rebuild_daily_summary(sync_conn)
+
+
+def create_scheduler_lease(sync_conn) -> None:
+    SchedulerLease.__table__.create(sync_conn, checkfirst=True)
+
+
+USERS_CLOSE_INDEX = "ix_users_timezone_last_closed_date"
+# одноколоночный предшественник: префикс составного, больше не нужен
+LEGACY_USERS_TIMEZONE_INDEX = "ix_users_timezone"
+
+
+def users_close_index(sync_conn) -> None:
+    for idx in User.__table__.indexes:
+        if idx.name == USERS_CLOSE_INDEX:
+            idx.create(sync_conn, checkfirst=True)
+    sync_conn.exec_driver_sql(f"DROP INDEX IF EXISTS {LEGACY_USERS_TIMEZONE_INDEX}")
+
+
+# Порядок менять нельзя, только дописывать в конец.
+# Каждый шаг идемпотентен: базы, созданные до появления версий,
+# проходят всю цепочку и получают недостающее.
+MIGRATIONS = [
+    (1, "create_tables", Base.metadata.create_all),
+    (2, "challenges_deleted_at", ensure_added_columns),
+    (3, "daily_log_unique_key", ensure_daily_log_unique_key),
+    (4, "widen_column_types", widen_column_types),
+    (5, "create_missing_indexes", create_missing_indexes),
+    (6, "seed_default_templates", seed_default_templates),
+    (7, "challenge_stats", create_challenge_stats),
+    (8, "daily_summary", create_daily_summary),
+    (9, "scheduler_lease", create_scheduler_lease),
+    (10, "users_close_index", users_close_index),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# ключ pg_advisory_xact_lock: несколько воркеров не мигрируют одновременно
+_MIGRATION_LOCK_KEY = 7_240_001
+
+
+def get_schema_version(sync_conn) -> int:
+    if not inspect(sync_conn).has_table(SchemaMigration.__tablename__):
+        return 0
+    return sync_conn.execute(select(func.max(SchemaMigration.version))).scalar() or 0
+
+
+def _lock_migrations(sync_conn) -> None:
+    if sync_conn.dialect.name == "postgresql":
+        sync_conn.execute(select(func.pg_advisory_xact_lock(_MIGRATION_LOCK_KEY)))
+
+
+def _apply_step(sync_conn, version: int, name: str, step) -> bool:
+    _lock_migrations(sync_conn)
+    # перепроверка под блокировкой: соседний воркер мог успеть раньше
+    if get_schema_version(sync_conn) >= version:
+        return False
+
+    step(sync_conn)
+    SchemaMigration.__table__.create(sync_conn, checkfirst=True)
+    sync_conn.execute(
+        dialect_insert(sync_conn, SchemaMigration.__table__)
+        .values(version=version, name=name)
+        .on_conflict_do_nothing(index_elements=["version"])
+    )
+    return True
+
+
+async def migrate(engine: AsyncEngine) -> list[str]:
+    """
+    Применяет недостающие шаги, каждый в своей транзакции
+    (на PostgreSQL упавший DDL ломает всю транзакцию).
+    Быстрый путь — одно чтение версии. Возвращает имена применённых шагов.
+    """
+    async with engine.connect() as conn:
+        current = await conn.run_sync(get_schema_version)
+    if current >= LATEST_VERSION:
+        return []
+
+    applied: list[str] = []
+    for version, name, step in MIGRATIONS:
+        if version <= current:
+            continue
+        async with engine.begin() as conn:
+            if await conn.run_sync(_apply_step, version, name, step):
+                applied.append(name)
+                log.warning("schema: migration %d %s applied", version, name)
+    return applied
@@ -2,12 +2,35 @@
 
 from __future__ import annotations
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
 
 
+# пустой UPDATE строк users: блокировка записи логов пользователя до конца транзакции
+_lock_stmt = (
+    update(User.__table__)
+    .where(User.id.in_(bindparam("user_ids", expanding=True)))
+    .values(id=User.id)
+)
+
+
+async def lock_user_writes(db: AsyncSession, user_ids) -> None:
+    """
+    Сериализует запись логов/счётчиков пользователей: первым statement'ом
+    транзакции записи. PostgreSQL — блокировки строк users до commit;
+    SQLite — первая запись открывает пишущую транзакцию (pysqlite не
+    открывает её на SELECT), и чтения после неё не устаревают до commit.
+    """
+    await db.execute(_lock_stmt, {"user_ids": sorted(set(user_ids))})
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
+    q = await db.execute(select(User).where(User.id == user_id))
+    return q.scalar_one_or_none()
+
+
 async def get_user_by_telegram_id(db: AsyncSession, tg_id: int) -> User | None:
     q = await db.execute(select(User).where(User.telegram_id == tg_id))
     return q.scalar_one_or_none()
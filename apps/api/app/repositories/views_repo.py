@@ -0,0 +1,139 @@
+# apps/api/app/repositories/views_repo.py
+#
+# Чтение для view-эндпоинтов (/today, /challenges, история челленджа, день):
+# только нужные колонки, строки-кортежи вместо ORM-объектов (без identity map,
+# без загрузки Text-колонок), статус считает БД (status_view_case).
+# Запросы собраны один раз при импорте, параметры — bindparam: построение
+# select() на каждый вызов стоило дороже самого запроса (см. _bench/read_path).
+
+from datetime import date
+
+from sqlalchemy import and_, bindparam, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Challenge, ChallengeStats, DailyLog, DailySummary
+from app.repositories.challenge_stats_repo import STATS_COLUMNS
+from app.repositories.history_repo import status_view_case
+
+_user_id = bindparam("user_id")
+
+# (challenge_id, title, type, status_view) — активные челленджи + статус за день
+_today_stmt = (
+    select(Challenge.id, Challenge.title, Challenge.type, status_view_case)
+    .outerjoin(
+        DailyLog,
+        and_(
+            DailyLog.challenge_id == Challenge.id,
+            DailyLog.user_id == _user_id,
+            DailyLog.date == bindparam("day"),
+        ),
+    )
+    .where(
+        and_(
+            Challenge.user_id == _user_id,
+            Challenge.is_active == True,
+            Challenge.is_template == False,
+            Challenge.deleted_at.is_(None),
+        )
+    )
+    .order_by(Challenge.id.asc())
+)
+
+# версия /today для сверки кэша между воркерами: челленджи пользователя
+# (число, max id, max updated_at — создание, правка, удаление) + счётчики
+# сводки дня (любая смена статуса лога меняет их)
+_today_version_stmt = (
+    select(
+        func.count(Challenge.id),
+        func.max(Challenge.id),
+        func.max(Challenge.updated_at),
+        DailySummary.total,
+        DailySummary.count_min,
+        DailySummary.count_bonus,
+        DailySummary.count_skip,
+        DailySummary.count_fail,
+    )
+    .select_from(Challenge)
+    .outerjoin(
+        DailySummary,
+        and_(DailySummary.user_id == Challenge.user_id, DailySummary.date == bindparam("day")),
+    )
+    .where(Challenge.user_id == _user_id)
+    .group_by(
+        DailySummary.total,
+        DailySummary.count_min,
+        DailySummary.count_bonus,
+        DailySummary.count_skip,
+        DailySummary.count_fail,
+    )
+)
+
+# колонки challenge_stats — под своими именами: stats_view читает их из row._mapping
+_challenge_list_stmt = (
+    select(
+        Challenge.id,
+        Challenge.type,
+        Challenge.title,
+        Challenge.description,
+        Challenge.miss_policy,
+        Challenge.is_active,
+        Challenge.created_at,
+        Challenge.updated_at,
+        *(getattr(ChallengeStats, c) for c in STATS_COLUMNS),
+    )
+    .outerjoin(ChallengeStats, ChallengeStats.challenge_id == Challenge.id)
+    .where(Challenge.user_id == _user_id)
+    .where(Challenge.deleted_at.is_(None))
+    .order_by(Challenge.id.desc())
+)
+
+# (date, status_view, minutes_fact, comment) — новые сверху
+_challenge_history_stmt = (
+    select(DailyLog.date, status_view_case, DailyLog.minutes_fact, DailyLog.comment)
+    .where(
+        and_(
+            DailyLog.user_id == _user_id,
+            DailyLog.challenge_id == bindparam("challenge_id"),
+            DailyLog.date >= bindparam("since"),
+        )
+    )
+    .order_by(DailyLog.date.desc())
+)
+
+# (challenge_id, title, status_view, minutes_fact, comment) — по названию
+_day_detail_stmt = (
+    select(DailyLog.challenge_id, Challenge.title, status_view_case, DailyLog.minutes_fact, DailyLog.comment)
+    .join(Challenge, Challenge.id == DailyLog.challenge_id)
+    .where(DailyLog.user_id == _user_id)
+    .where(DailyLog.date == bindparam("day"))
+    .order_by(Challenge.title.asc())
+)
+
+
+async def get_today_rows(db: AsyncSession, user_id: int, day: date):
+    q = await db.execute(_today_stmt, {"user_id": user_id, "day": day})
+    return q.all()
+
+
+async def get_today_version(db: AsyncSession, user_id: int, day: date) -> tuple | None:
+    """Один агрегат по индексу challenges.user_id + строка сводки по ключу; None — челленджей нет."""
+    q = await db.execute(_today_version_stmt, {"user_id": user_id, "day": day})
+    row = q.first()
+    return tuple(row) if row is not None else None
+
+
+async def get_challenge_list_rows(db: AsyncSession, user_id: int):
+    q = await db.execute(_challenge_list_stmt, {"user_id": user_id})
+    return q.all()
+
+
+async def get_challenge_history_rows(db: AsyncSession, user_id: int, challenge_id: int, since: date):
+    q = await db.execute(
+        _challenge_history_stmt, {"user_id": user_id, "challenge_id": challenge_id, "since": since}
+    )
+    return q.all()
+
+
+async def get_day_detail_rows(db: AsyncSession, user_id: int, day: date):
+    q = await db.execute(_day_detail_stmt, {"user_id": user_id, "day": day})
+    return q.all()
@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_db
 from app.models import User
-from app.schemas import ChallengeCreate, ChallengePatch
+from app.schemas import ChallengeCreate, ChallengePatch, ChallengeListItem, ChallengeView, ChallengeAnalytics
 from app.core.auth import get_current_user
 from app.services.challenges_service import (
     create_user_challenge,
@@ -12,6 +12,7 @@ from app.services.challenges_service import (
     list_user_challenges,
     soft_delete_user_challenge,
 )
+from app.services.challenge_analytics import get_challenge_analytics
 
 router = APIRouter()
 
@@ -39,7 +40,7 @@ async def patch_challenge(
     return {"ok": True}
 
 
-@router.get("/challenges")
+@router.get("/challenges", response_model=list[ChallengeListItem])
 async def list_challenges(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
@@ -47,7 +48,7 @@ async def list_challenges(
     return await list_user_challenges(db, user.id)
 
 
-@router.get("/challenges/{challenge_id}")
+@router.get("/challenges/{challenge_id}", response_model=ChallengeView)
 async def get_challenge(
     challenge_id: int,
     db: AsyncSession = Depends(get_db),
@@ -59,6 +60,19 @@ async def get_challenge(
     return out
 
 
+@router.get("/challenges/{challenge_id}/analytics", response_model=ChallengeAnalytics)
+async def challenge_analytics(
+    challenge_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Окна 7/30/90 дней + неделя к неделе; кэш до следующей записи логов челленджа."""
+    out = await get_challenge_analytics(db, user, challenge_id)
+    if out is None:
+        raise HTTPException(status_code=404, detail="Challenge not found")
+    return out
+
+
 @router.delete("/challenges/{challenge_id}")
 async def delete_challenge(
     challenge_id: int,
@@ -3,9 +3,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_db
 from app.models import User
-from app.schemas import DailyFlagSet
+from app.schemas import DailyFlagSet, DailyFlagBatch, DailyFlagBatchResult
 from app.core.auth import get_current_user
-from app.services.daily_log_service import upsert_daily_log
+from app.services.daily_log_service import upsert_daily_log, upsert_daily_logs_batch
 
 router = APIRouter()
 
@@ -20,3 +20,14 @@ async def upsert_daily(
     if not ok:
         raise HTTPException(404, "Challenge not found")
     return {"ok": True}
+
+
+@router.post("/daily-log/batch", response_model=DailyFlagBatchResult)
+async def upsert_daily_batch(
+    payload: DailyFlagBatch,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    # не найденные/чужие челленджи — ok=false в своём элементе, остальные сохраняются
+    results = await upsert_daily_logs_batch(db, user, payload.items)
+    return {"ok": all(r.ok for r in results), "results": results}
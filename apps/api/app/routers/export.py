@@ -0,0 +1,35 @@
+# apps/api/app/routers/export.py
+
+from datetime import date
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.models import User
+from app.core.auth import get_current_user
+from app.services.export_service import export_csv, export_ndjson
+
+router = APIRouter()
+
+
+def _attachment(ext: str) -> dict:
+    return {"Content-Disposition": f'attachment; filename="lifetracker-{date.today().isoformat()}.{ext}"'}
+
+
+@router.get("/export/ndjson")
+async def export_logs_ndjson(user: User = Depends(get_current_user)):
+    """Все логи пользователя, по строке JSON на лог (date, challenge_title, status_view, ...)."""
+    return StreamingResponse(
+        export_ndjson(user.id),
+        media_type="application/x-ndjson",
+        headers=_attachment("ndjson"),
+    )
+
+
+@router.get("/export/csv")
+async def export_logs_csv(user: User = Depends(get_current_user)):
+    return StreamingResponse(
+        export_csv(user.id),
+        media_type="text/csv; charset=utf-8",
+        headers=_attachment("csv"),
+    )
@@ -1,27 +1,53 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_db
 from app.models import User
 from app.core.auth import get_current_user
+from app.schemas import ChallengeHistory, DayDetail, Heatmap, HistoryDay
 from app.services.history_service import build_challenge_history, build_days_history, build_day_detail
-from datetime import date
+from app.services.heatmap import build_heatmap
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
 
 router = APIRouter()
 
-@router.get("/history/days")
+@router.get("/history/days", response_model=list[HistoryDay])
 async def history_days(
+    response: Response,
     days: int = 30,
+    before: date | None = None,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """
     Агрегированная история по дням.
-    Возвращает только дни, где были логи.
+    Возвращает только дни, где были логи, за окно `days` дней до `before`.
+    Следующая (более старая) страница: ?before=<X-Next-Before>.
     """
-    return await build_days_history(db, user.id, days)
+    today_d = datetime.now(ZoneInfo(user.timezone)).date()
+    items, next_before = await build_days_history(db, user.id, days, before, today_d)
+    if next_before is not None:
+        response.headers["X-Next-Before"] = next_before.isoformat()
+    return items
 
-@router.get("/challenges/{challenge_id}/history")
+@router.get("/history/heatmap", response_model=Heatmap)
+async def history_heatmap(
+    year: int | None = Query(default=None, ge=2000, le=2100),
+    challenge_id: int | None = None,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Годовая тепловая карта: status/ratio — base64-массивы uint8 по дню года
+    (коды — services/heatmap). Без challenge_id — по всем челленджам.
+    """
+    out = await build_heatmap(db, user.id, year or date.today().year, challenge_id)
+    if out is None:
+        raise HTTPException(404, "Challenge not found")
+    return out
+
+@router.get("/challenges/{challenge_id}/history", response_model=ChallengeHistory)
 async def challenge_history(
     challenge_id: int,
     days: int = 30,
@@ -30,7 +56,7 @@ async def challenge_history(
 ):
     return await build_challenge_history(db, user.id, challenge_id, days)
 
-@router.get("/history/day/{day}")
+@router.get("/history/day/{day}", response_model=DayDetail)
 async def history_day_detail(
     day: date,
     db: AsyncSession = Depends(get_db),
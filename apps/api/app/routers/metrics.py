@@ -0,0 +1,12 @@
+# apps/api/app/routers/metrics.py
+
+from fastapi import APIRouter, Depends, Response
+
+from app.core.auth import require_diag_token
+from app.core.metrics import CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", dependencies=[Depends(require_diag_token)], include_in_schema=False)
+async def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
@@ -4,17 +4,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db import get_db
 from app.models import User
 from app.core.auth import get_current_user
+from app.schemas import TemplateOut, TemplateAddResult
 from app.services.templates import list_templates, add_template_to_user
 
 router = APIRouter()
 
 
-@router.get("/templates")
+@router.get("/templates", response_model=list[TemplateOut])
 async def get_templates(db: AsyncSession = Depends(get_db)):
     return await list_templates(db)
 
 
-@router.post("/templates/{template_id}/add")
+@router.post("/templates/{template_id}/add", response_model=TemplateAddResult)
 async def add_template(
     template_id: int,
     db: AsyncSession = Depends(get_db),
@@ -1,9 +1,10 @@
-from pydantic import BaseModel, model_validator
-from datetime import date
+from pydantic import BaseModel, Field, model_validator
+import datetime as dt
 from typing import Optional, Literal
 
 MissPolicy = Literal["FAIL", "MIN"]
 ChallengeType = Literal["DO", "NO_DO"]
+StatusView = Literal["MIN", "BONUS", "SKIP", "FAIL"]
 
 class ChallengeCreate(BaseModel):
     title: str
@@ -19,7 +20,8 @@ class ChallengePatch(BaseModel):
 
 class DailyFlagSet(BaseModel):
     challenge_id: int
-    date: Optional[date] = None  # если пусто — today на сервере
+    # dt.date: поле с именем date затеняет тип date в аннотации (pydantic v2)
+    date: Optional[dt.date] = None  # если пусто — today на сервере
     flag: Literal["MIN", "BONUS", "SKIP", "FAIL"]
     minutes_fact: Optional[int] = None
     comment: Optional[str] = None
@@ -31,11 +33,146 @@ class DailyFlagSet(BaseModel):
                 raise ValueError("comment is required for FAIL/SKIP")
         return self
 
+# лимит пачки: одна транзакция, держим её короткой
+DAILY_LOG_BATCH_MAX_ITEMS = 200
+
+class DailyFlagBatch(BaseModel):
+    # каждый элемент проходит ту же валидацию (comment для FAIL/SKIP)
+    items: list[DailyFlagSet] = Field(min_length=1, max_length=DAILY_LOG_BATCH_MAX_ITEMS)
+
+class DailyFlagResult(BaseModel):
+    challenge_id: int
+    date: dt.date
+    ok: bool
+    error: Optional[str] = None
+
+class DailyFlagBatchResult(BaseModel):
+    ok: bool
+    results: list[DailyFlagResult]
+
+# --- ответы чтения ---
+# Сервисы отдают dict; модели описывают их для OpenAPI и сериализуются
+# pydantic-core (а не jsonable_encoder) — см. core/responses.
+# Даты сервисы уже дают строкой ISO; dt.date выдаёт её же.
+
 class TodayItem(BaseModel):
     challenge_id: int
     title: str
     type: ChallengeType
-    status_view: Optional[Literal["MIN", "BONUS", "SKIP", "FAIL"]] = None
+    status_view: Optional[StatusView] = None
+
+class TodayView(BaseModel):
+    date: dt.date
+    is_day_closed: bool
+    first_uncompleted: Optional[TodayItem] = None
+    all: list[TodayItem]
+
+class StatusTotals(BaseModel):
+    MIN: int
+    BONUS: int
+    SKIP: int
+    FAIL: int
+
+class ChallengeStatsOut(BaseModel):
+    current_streak: int
+    best_streak: int
+    last_date: Optional[dt.date] = None
+    totals: StatusTotals
+    minutes_total: int
+    completion_rate: Optional[float] = None
+
+class ChallengeListItem(BaseModel):
+    id: int
+    type: ChallengeType
+    title: str
+    description: Optional[str] = None
+    # как в БД: auto_assign трактует неизвестное значение как FAIL
+    miss_policy: str
+    is_active: bool
+    # ISO-строка как есть (SQLite — без зоны, PostgreSQL — с зоной)
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    stats: ChallengeStatsOut
+
+class ChallengeView(BaseModel):
+    id: int
+    type: ChallengeType
+    title: str
+    description: Optional[str] = None
+    miss_policy: str
+    is_active: bool
+    goal: Optional[str] = None
+    checkpoints: Optional[str] = None
+    min_activity_text: Optional[str] = None
+    min_minutes: Optional[int] = None
+    bonus_text: Optional[str] = None
+    constraints: Optional[str] = None
+    success_metrics: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    stats: ChallengeStatsOut
+
+class AnalyticsWindow(BaseModel):
+    since: dt.date
+    logged: int
+    totals: StatusTotals
+    completion_rate: Optional[float] = None
+    bonus_ratio: Optional[float] = None
+    minutes_sum: int
+    # медиана целых минут — int или x.5
+    minutes_median: Optional[int | float] = None
+
+class AnalyticsTrend(BaseModel):
+    previous_7d: AnalyticsWindow
+    completion_rate_delta: Optional[float] = None
+    minutes_sum_delta: int
+
+class ChallengeAnalytics(BaseModel):
+    challenge_id: int
+    date: dt.date
+    # "7d" | "30d" | "90d"
+    windows: dict[str, AnalyticsWindow]
+    trend: AnalyticsTrend
+
+class ChallengeHistoryItem(BaseModel):
+    date: dt.date
+    status_view: Optional[StatusView] = None
+    minutes_fact: Optional[int] = None
+    comment: Optional[str] = None
+
+class ChallengeHistory(BaseModel):
+    challenge_id: int
+    items: list[ChallengeHistoryItem]
+
+class HistoryDay(BaseModel):
+    date: dt.date
+    total: int
+    min: int
+    bonus: int
+    skip: int
+    fail: int
+
+class DayDetailItem(BaseModel):
+    challenge_id: int
+    title: str
+    status_view: Optional[StatusView] = None
+    minutes_fact: Optional[int] = None
+    comment: Optional[str] = None
+
+class DayDetail(BaseModel):
+    date: dt.date
+    items: list[DayDetailItem]
+
+class Heatmap(BaseModel):
+    year: int
+    challenge_id: Optional[int] = None
+    start: dt.date
+    days: int
+    # "base64:uint8": status/ratio — по байту на день года (services/heatmap)
+    encoding: str
+    status: str
+    ratio: str
 
 class TemplateOut(BaseModel):
     id: int
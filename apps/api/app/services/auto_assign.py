@@ -1,66 +1,170 @@
-from datetime import datetime, timezone, timedelta
-from zoneinfo import ZoneInfo
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.metrics import track_job
 from app.db import SessionLocal
-from app.models import User, Challenge, DailyLog
 from app.repositories.auto_assign_repo import (
-    get_daily_log_for_date,
-    create_daily_log,
+    get_user_timezones,
+    get_due_users,
+    get_close_candidates,
+    bulk_create_auto_logs,
+    mark_users_closed,
 )
+from app.repositories.challenge_stats_repo import get_challenge_stats
+from app.services.challenge_analytics import invalidate_analytics
+from app.services.challenge_stats import record_log_writes
+from app.services.daily_summary import record_summary_writes
+from app.services.today_service import invalidate_today
+
+log = logging.getLogger("lifetracker.auto_assign")
+
+# сколько пользователей закрываем за одну пачку (один SELECT + один INSERT)
+CLOSE_BATCH_SIZE = 500
+# догон после простоя: дней на одну транзакцию пачки (держит запись короткой)
+CLOSE_CHUNK_DAYS = 7
+
+
+def _auto_log_row(user_id: int, challenge_id: int, miss_policy: str, day: date) -> dict:
+    # miss_policy ∈ {MIN, FAIL}; всё остальное трактуем как FAIL
+    policy = (miss_policy or "FAIL").upper()
+    return {
+        "user_id": user_id,
+        "challenge_id": challenge_id,
+        "date": day,
+        "origin": "AUTO",
+        "flag_min": policy == "MIN",
+        "flag_bonus": False,
+        "flag_skip": False,
+        "flag_fail": policy != "MIN",
+    }
+
+
+async def _record_auto_writes(db: AsyncSession, rows: list[dict], inserted: set[tuple[int, date]]) -> set[int]:
+    # новые логи: "в хвост" или рвущий лог в пропущенный день — O(1) на челлендж
+    writes = [
+        (
+            row["challenge_id"],
+            row["user_id"],
+            row["date"],
+            None,
+            (row["flag_min"], row["flag_bonus"], row["flag_skip"], row["flag_fail"], None),
+        )
+        for row in rows
+        if (row["challenge_id"], row["date"]) in inserted
+    ]
+    challenge_ids = {challenge_id for challenge_id, _ in inserted}
+    stats = await get_challenge_stats(db, sorted(challenge_ids))
+    await record_log_writes(db, stats, writes)
+    await record_summary_writes(db, [w[1:] for w in writes])
+    return challenge_ids
+
+
+async def _close_window(
+    db: AsyncSession,
+    first_day: dict[int, date],
+    since: date,
+    until: date,
+) -> tuple[int, set[int]]:
+    """
+    Дни [max(first_day[user], since), until] пачки пользователей: недостающие
+    AUTO-логи одним INSERT, last_closed_date = until одним UPDATE (помечаем
+    закрытым даже без челленджей).
+    Возвращает (вставлено строк, затронутые challenge_id). Коммит — у вызывающего.
+    """
+    user_ids = list(first_day)
+    # первым statement'ом: UPDATE строк users — ещё и блокировка записи этих
+    # пользователей до commit (счётчики ниже читаются уже под ней)
+    await mark_users_closed(db, user_ids, until)
+    logged: dict[int, set[date]] = defaultdict(set)
+    owners: dict[int, tuple[int, str]] = {}
+    for user_id, challenge_id, miss_policy, day in await get_close_candidates(db, user_ids, since, until):
+        owners[challenge_id] = (user_id, miss_policy)
+        if day is not None:
+            logged[challenge_id].add(day)
+
+    rows = []
+    for challenge_id, (user_id, miss_policy) in owners.items():
+        day = max(first_day[user_id], since)
+        while day <= until:
+            if day not in logged[challenge_id]:
+                rows.append(_auto_log_row(user_id, challenge_id, miss_policy, day))
+            day += timedelta(days=1)
+
+    inserted = await bulk_create_auto_logs(db, rows)
+    touched = await _record_auto_writes(db, rows, inserted) if inserted else set()
+    return len(inserted), touched
+
+
+async def close_due_users(
+    db: AsyncSession,
+    tz_name: str,
+    yesterday: date,
+    batch_size: int = CLOSE_BATCH_SIZE,
+    chunk_days: int = CLOSE_CHUNK_DAYS,
+) -> int:
+    """
+    Закрывает пользователям таймзоны все незакрытые дни: last_closed_date+1 .. yesterday
+    (без last_closed_date — только вчера). Стоимость: O(due users), а не O(users × challenges).
+    Длинный простой идёт окнами по chunk_days: каждое окно пачки — одна транзакция,
+    прогресс (last_closed_date) фиксируется после неё.
+    Возвращает число вставленных AUTO-логов.
+    """
+    written = 0
+    after_id = 0
+
+    while True:
+        due = await get_due_users(db, tz_name, yesterday, after_id, batch_size)
+        if not due:
+            break
+        after_id = due[-1][0]
+
+        first_day = {
+            user_id: last_closed + timedelta(days=1) if last_closed is not None else yesterday
+            for user_id, last_closed in due
+        }
+        since = min(first_day.values())
+        while since <= yesterday:
+            until = min(since + timedelta(days=chunk_days - 1), yesterday)
+            window = {user_id: day for user_id, day in first_day.items() if day <= until}
+            if window:
+                inserted, touched = await _close_window(db, window, since, until)
+                written += inserted
+
+                await db.commit()
+                for user_id in window:
+                    invalidate_today(user_id)
+                invalidate_analytics(touched)
+            since = until + timedelta(days=1)
+
+    return written
+
+
+async def close_timezone(db: AsyncSession, tz_name: str, now_utc: datetime) -> int:
+    try:
+        user_today = now_utc.astimezone(ZoneInfo(tz_name)).date()
+    except (ZoneInfoNotFoundError, ValueError):
+        log.warning("auto_assign: unknown timezone %r, skipped", tz_name)
+        return 0
+
+    return await close_due_users(db, tz_name, user_today - timedelta(days=1))
 
 
 async def auto_assign_missed() -> None:
-    async with SessionLocal() as db:
-        users = (await db.execute(
-            User.__table__.select()
-        )).fetchall()
-
-        for user_row in users:
-            user = User(**user_row)
-
-            # текущее время пользователя
-            now_utc = datetime.now(timezone.utc)
-            local_now = now_utc.astimezone(ZoneInfo(user.timezone))
-            user_today = local_now.date()
-
-            last_closed = user.last_closed_date
-
-            # если вчера уже закрыт — делать нечего
-            if last_closed is not None and last_closed >= user_today - timedelta(days=1):
-                continue
-
-            # день, который разрешено закрывать
-            day_to_close = (
-                last_closed + timedelta(days=1)
-                if last_closed is not None
-                else user_today - timedelta(days=1)
-            )
-
-            challenges = (await db.execute(
-                Challenge.__table__.select()
-            )).fetchall()
-
-            for ch_row in challenges:
-                ch = Challenge(**ch_row)
-
-                existing = await get_daily_log_for_date(
-                    db, user.id, ch.id, day_to_close
-                )
-                if existing:
-                    continue
-
-                log = DailyLog(
-                    user_id=user.id,
-                    challenge_id=ch.id,
-                    date=day_to_close,
-                    flag_fail=True,
-                    origin="AUTO",
-                )
-                await create_daily_log(db, log)
-
-            user.last_closed_date = day_to_close
-            db.add(user)
-
-        await db.commit()
+    """Полный проход по всем таймзонам (режим INTERVAL и догон после простоя)."""
+    now_utc = datetime.now(timezone.utc)
+
+    with track_job("auto_assign_missed") as run:
+        async with SessionLocal() as db:
+            for tz_name in await get_user_timezones(db):
+                run.rows += await close_timezone(db, tz_name, now_utc)
+
+
+async def auto_assign_timezone(tz_name: str) -> None:
+    """Закрытие дня одной таймзоны — вызывается в её локальную полночь."""
+    with track_job("close_timezone") as run:
+        async with SessionLocal() as db:
+            run.rows += await close_timezone(db, tz_name, datetime.now(timezone.utc))
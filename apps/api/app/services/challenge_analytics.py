@@ -0,0 +1,123 @@
+# apps/api/app/services/challenge_analytics.py
+#
+# Аналитика челленджа по скользящим окнам 7/30/90 дней (до "сегодня"
+# пользователя включительно) + неделя к неделе.
+# Один запрос: не больше 90 кортежей (date, status_view, minutes) без ORM,
+# статус считает БД; окна — один проход по колонкам в Python.
+# (Условные агрегаты на ~30 колонок в SQL выходили вдвое дороже —
+# объём ограничен 90 днями при любой длине истории.)
+# Результат кэшируется до следующей записи логов этого челленджа:
+# группа ключа — challenge_id, в своём воркере сбрасывают daily_log_service
+# и auto_assign. Записи других воркеров (и AUTO-закрытие у лидера
+# планировщика) ловит сверка версии: строка challenge_stats по ключу —
+# один дешёвый SELECT на попадание вместо пересборки.
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from statistics import median
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.repositories.analytics_repo import get_challenge_version, get_challenge_window_rows
+from app.settings import settings
+
+ANALYTICS_WINDOWS = (7, 30, 90)
+WINDOW_STATUSES = ("MIN", "BONUS", "SKIP", "FAIL")
+# предыдущая неделя (дни 8..14 назад) — база для тренда
+PREVIOUS_WEEK = "prev_7d"
+
+# (challenge_id, user_id, local date) -> (версия, готовый dict)
+analytics_cache = TTLCache(
+    "analytics",
+    maxsize=settings.analytics_cache_max_entries,
+    ttl_seconds=settings.analytics_cache_ttl_seconds,
+)
+
+
+def invalidate_analytics(challenge_ids) -> None:
+    """Вызывать после commit записи логов этих челленджей."""
+    for challenge_id in challenge_ids:
+        analytics_cache.invalidate_group(challenge_id)
+
+
+def _windows(today: date) -> dict[str, tuple[date, date]]:
+    out = {f"{days}d": (today - timedelta(days=days - 1), today) for days in ANALYTICS_WINDOWS}
+    out[PREVIOUS_WEEK] = (today - timedelta(days=13), today - timedelta(days=7))
+    return out
+
+
+def _rate(part: int, whole: int) -> float | None:
+    return round(part / whole, 4) if whole else None
+
+
+def _window_view(span: tuple[date, date], dates, statuses, minutes) -> dict:
+    since, until = span
+    totals = dict.fromkeys(WINDOW_STATUSES, 0)
+    logged = 0
+    values = []
+    for day, status, m in zip(dates, statuses, minutes):
+        if not since <= day <= until:
+            continue
+        logged += 1
+        if status is not None:
+            totals[status] += 1
+        if m is not None:
+            values.append(m)
+    done = totals["MIN"] + totals["BONUS"]
+    return {
+        "since": since.isoformat(),
+        "logged": logged,
+        "totals": totals,
+        # SKIP — уважительный пропуск, в знаменатель не идёт (как stats_view)
+        "completion_rate": _rate(done, done + totals["FAIL"]),
+        # доля BONUS среди выполненных дней
+        "bonus_ratio": _rate(totals["BONUS"], done),
+        "minutes_sum": sum(values),
+        "minutes_median": median(values) if values else None,
+    }
+
+
+def _delta(current, previous):
+    if current is None or previous is None:
+        return None
+    return round(current - previous, 4)
+
+
+async def build_challenge_analytics(
+    db: AsyncSession, user_id: int, challenge_id: int, today: date
+) -> dict | None:
+    windows = _windows(today)
+    since = min(s for s, _ in windows.values())
+    rows = await get_challenge_window_rows(db, user_id, challenge_id, since, today)
+    if rows is None:
+        return None
+
+    columns = tuple(zip(*rows)) if rows else ((), (), ())
+    views = {name: _window_view(span, *columns) for name, span in windows.items()}
+    week, previous = views["7d"], views.pop(PREVIOUS_WEEK)
+    return {
+        "challenge_id": challenge_id,
+        "date": today.isoformat(),
+        "windows": views,
+        "trend": {
+            "previous_7d": previous,
+            "completion_rate_delta": _delta(week["completion_rate"], previous["completion_rate"]),
+            "minutes_sum_delta": week["minutes_sum"] - previous["minutes_sum"],
+        },
+    }
+
+
+async def get_challenge_analytics(db: AsyncSession, user, challenge_id: int) -> dict | None:
+    today = datetime.now(ZoneInfo(user.timezone)).date()
+    key = (challenge_id, user.id, today)
+    version = await get_challenge_version(db, user.id, challenge_id)
+    entry = analytics_cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    out = await build_challenge_analytics(db, user.id, challenge_id, today)
+    if out is not None:
+        analytics_cache.set(key, (version, out))
+    return out
@@ -0,0 +1,220 @@
+# apps/api/app/services/challenge_stats.py
+#
+# Счётчики челленджа (серии + итоги по статусам), поддерживаемые на записи.
+# Запись "в хвост" (день позже last_date) — O(1); новый FAIL/пустой лог в
+# пропущенный прошлый день — тоже O(1) (пропуск и так рвал серию, меняются
+# только итоги). Правка прошлого дня, смена класса статуса в последний день
+# или отсутствие строки счётчиков — пересчёт истории этого челленджа.
+# Полный пересчёт — задача починки.
+#
+# Серия: подряд идущие дни MIN/BONUS. SKIP серию не рвёт и не продлевает.
+# FAIL, пропущенный день и лог без флагов — рвут.
+# NO_DO: невыполнение = успех, закрытие дня ставит MIN (см. auto_assign) —
+# отдельной ветки здесь не нужно, MIN продлевает серию.
+#
+# Чтение-изменение-запись под блокировкой записи пользователя
+# (users_repo.lock_user_writes, первым statement'ом транзакции): вторая
+# запись того же челленджа ждёт commit первой и читает уже её счётчики и
+# логи. Пересчёт-починка берёт ту же блокировку на пользователей пачки.
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import track_job
+from app.db import SessionLocal
+from app.repositories.challenge_stats_repo import (
+    get_challenge_ids_page,
+    stream_challenge_logs,
+    upsert_challenge_stats,
+)
+from app.repositories.users_repo import lock_user_writes
+from app.services.status import STATUS_COUNT_COLUMNS, status_from_flags
+
+RECOMPUTE_BATCH_SIZE = 500
+
+def _streak_class(status: str | None) -> str:
+    if status in ("MIN", "BONUS"):
+        return "extend"
+    if status == "SKIP":
+        return "keep"
+    return "break"
+
+
+def empty_stats(challenge_id: int, user_id: int) -> dict:
+    return {
+        "challenge_id": challenge_id,
+        "user_id": user_id,
+        "current_streak": 0,
+        "best_streak": 0,
+        "last_date": None,
+        "count_min": 0,
+        "count_bonus": 0,
+        "count_skip": 0,
+        "count_fail": 0,
+        "minutes_total": 0,
+    }
+
+
+def _add_totals(stats: dict, status: str | None, minutes: int | None, sign: int) -> None:
+    column = STATUS_COUNT_COLUMNS.get(status)
+    if column:
+        stats[column] += sign
+    stats["minutes_total"] += sign * (minutes or 0)
+
+
+def _append_day(stats: dict, day: date, status: str | None) -> None:
+    """День строго после last_date: серия продолжается только без разрыва в днях."""
+    last = stats["last_date"]
+    current = stats["current_streak"] if last is not None and day == last + timedelta(days=1) else 0
+    kind = _streak_class(status)
+    if kind == "extend":
+        current += 1
+    elif kind == "break":
+        current = 0
+    stats["current_streak"] = current
+    stats["best_streak"] = max(stats["best_streak"], current)
+    stats["last_date"] = day
+
+
+def apply_log_write(stats: dict, day: date, old: tuple | None, new: tuple) -> bool:
+    """
+    old/new: (flag_min, flag_bonus, flag_skip, flag_fail, minutes_fact); old=None — новый лог.
+    Итоги правятся всегда; False — серия требует пересчёта истории.
+    """
+    new_status = status_from_flags(*new[:4])
+    old_status = status_from_flags(*old[:4]) if old is not None else None
+
+    if old is not None:
+        _add_totals(stats, old_status, old[4], -1)
+    _add_totals(stats, new_status, new[4], +1)
+
+    last = stats["last_date"]
+    if old is None and (last is None or day > last):
+        _append_day(stats, day, new_status)
+        return True
+    if old is None and _streak_class(new_status) == "break":
+        # пропущенный день становится рвущим: серии те же
+        return True
+    if old is not None and day == last and _streak_class(old_status) == _streak_class(new_status):
+        return True
+    return False
+
+
+def stats_from_history(challenge_id: int, user_id: int, logs) -> dict:
+    """logs: (date, flag_min, flag_bonus, flag_skip, flag_fail, minutes_fact) по возрастанию даты."""
+    stats = empty_stats(challenge_id, user_id)
+    for day, *values in logs:
+        status = status_from_flags(*values[:4])
+        _add_totals(stats, status, values[4], +1)
+        _append_day(stats, day, status)
+    return stats
+
+
+async def recompute_stats(db: AsyncSession, owners: dict[int, int]) -> list[dict]:
+    """Пересчёт по истории для {challenge_id: user_id}: один потоковый SELECT."""
+    history: dict[int, list] = {cid: [] for cid in owners}
+    async for challenge_id, _user_id, *log in stream_challenge_logs(db, list(owners)):
+        history[challenge_id].append(log)
+    return [stats_from_history(cid, owners[cid], logs) for cid, logs in history.items()]
+
+
+async def record_log_writes(
+    db: AsyncSession,
+    stats_by_id: dict[int, dict | None],
+    writes: list[tuple],
+) -> None:
+    """
+    Обновляет счётчики в транзакции вызывающего, ПОСЛЕ записи логов и под
+    lock_user_writes (счётчики stats_by_id прочитаны уже под ней).
+    stats_by_id: текущие счётчики (None — строки ещё нет);
+    writes: (challenge_id, user_id, day, old, new) — см. apply_log_write.
+    """
+    touched: dict[int, dict] = {}
+    dirty: dict[int, int] = {}
+
+    for challenge_id, user_id, day, old, new in sorted(writes, key=lambda w: w[2]):
+        if challenge_id in dirty:
+            continue
+        stats = touched.get(challenge_id) or stats_by_id.get(challenge_id)
+        if stats is None:
+            # нет строки — счётчики не знают прошлой истории
+            dirty[challenge_id] = user_id
+            continue
+        stats = touched[challenge_id] = dict(stats)
+        if not apply_log_write(stats, day, old, new):
+            dirty[challenge_id] = user_id
+
+    for cid in dirty:
+        touched.pop(cid, None)
+    rows = list(touched.values())
+    if dirty:
+        rows += await recompute_stats(db, dirty)
+
+    await upsert_challenge_stats(db, rows)
+
+
+def stats_view(stats: dict | None) -> dict:
+    stats = stats or {}
+    counts = {status: stats.get(column) or 0 for status, column in STATUS_COUNT_COLUMNS.items()}
+    done = counts["MIN"] + counts["BONUS"]
+    # SKIP — уважительный пропуск, в знаменатель не идёт
+    rated = done + counts["FAIL"]
+    last_date = stats.get("last_date")
+    return {
+        "current_streak": stats.get("current_streak") or 0,
+        "best_streak": stats.get("best_streak") or 0,
+        "last_date": last_date.isoformat() if last_date else None,
+        "totals": counts,
+        "minutes_total": stats.get("minutes_total") or 0,
+        "completion_rate": round(done / rated, 4) if rated else None,
+    }
+
+
+async def recompute_all_challenge_stats(
+    only_missing: bool = False,
+    batch_size: int = RECOMPUTE_BATCH_SIZE,
+) -> int:
+    """
+    Починка: пересчёт счётчиков из daily_log пачками по batch_size челленджей.
+    only_missing — только челленджи без строки счётчиков (после миграции).
+    """
+    job = "challenge_stats_repair" if only_missing else "challenge_stats_recompute"
+    with track_job(job) as run:
+        async with SessionLocal() as db:
+            after_id = 0
+            while True:
+                page = await get_challenge_ids_page(db, after_id, batch_size, only_missing)
+                if not page:
+                    break
+                after_id = page[-1][0]
+                # иначе запись между чтением истории и upsert'ом затиралась бы
+                await lock_user_writes(db, {user_id for _, user_id in page})
+                rows = await recompute_stats(db, dict(page))
+                await upsert_challenge_stats(db, rows)
+                await db.commit()
+                run.rows += len(rows)
+    return run.rows
+
+
+def start_stats_jobs(scheduler) -> None:
+    """Досчёт челленджей без счётчиков сразу после старта + полный пересчёт раз в сутки."""
+    scheduler.add_job(
+        recompute_all_challenge_stats,
+        kwargs={"only_missing": True},
+        id="challenge_stats_repair",
+        next_run_time=datetime.now(timezone.utc),
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        recompute_all_challenge_stats,
+        trigger="cron",
+        hour=3,
+        minute=30,
+        id="challenge_stats_recompute",
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1,
+    )
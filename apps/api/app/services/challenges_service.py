@@ -1,8 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.models import Challenge
 from app.schemas import ChallengeCreate, ChallengePatch
+from app.services.challenge_stats import stats_view
+from app.services.today_service import invalidate_today
+from app.repositories.challenge_stats_repo import get_challenge_stats
+from app.repositories.views_repo import get_challenge_list_rows
 from app.repositories.challenges_crud_repo import (
     create_challenge,
     get_user_challenge,
@@ -25,6 +28,7 @@ async def create_user_challenge(
     )
     await create_challenge(db, ch)
     await db.commit()
+    invalidate_today(user_id)
     await db.refresh(ch)
     return ch.id
 
@@ -37,10 +41,14 @@ async def patch_user_challenge(
         return False
 
     data = payload.model_dump(exclude_unset=True)
+    # NO_DO: политика всегда MIN (как при создании)
+    if ch.type == "NO_DO" and "miss_policy" in data:
+        data["miss_policy"] = "MIN"
     for k, v in data.items():
         setattr(ch, k, v)
 
     await db.commit()
+    invalidate_today(user_id)
     return True
 
 
@@ -50,6 +58,7 @@ async def get_user_challenge_view(
     ch = await get_user_challenge(db, challenge_id, user_id)
     if not ch:
         return None
+    stats = await get_challenge_stats(db, [ch.id])
 
     return {
         "id": ch.id,
@@ -68,29 +77,24 @@ async def get_user_challenge_view(
         "notes": ch.notes,
         "created_at": ch.created_at.isoformat() if ch.created_at else None,
         "updated_at": ch.updated_at.isoformat() if ch.updated_at else None,
+        "stats": stats_view(stats.get(ch.id)),
     }
 
 async def list_user_challenges(db: AsyncSession, user_id: int) -> list[dict]:
-    q = await db.execute(
-        select(Challenge)
-        .where(Challenge.user_id == user_id)
-        .where(Challenge.deleted_at.is_(None))
-        .order_by(Challenge.id.desc())
-    )
-    items = q.scalars().all()
-
+    # счётчики — тем же запросом (LEFT OUTER JOIN), без прохода по daily_log
     return [
         {
-            "id": ch.id,
-            "type": ch.type,
-            "title": ch.title,
-            "description": ch.description,
-            "miss_policy": ch.miss_policy,
-            "is_active": ch.is_active,
-            "created_at": ch.created_at.isoformat() if ch.created_at else None,
-            "updated_at": ch.updated_at.isoformat() if ch.updated_at else None,
+            "id": row.id,
+            "type": row.type,
+            "title": row.title,
+            "description": row.description,
+            "miss_policy": row.miss_policy,
+            "is_active": row.is_active,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+            "stats": stats_view(row._mapping),
         }
-        for ch in items
+        for row in await get_challenge_list_rows(db, user_id)
     ]
 
 from datetime import datetime, timezone
@@ -104,4 +108,5 @@ async def soft_delete_user_challenge(db: AsyncSession, user_id: int, challenge_i
     ch.deleted_at = datetime.now(timezone.utc)
 
     await db.commit()
+    invalidate_today(user_id)
     return True
@@ -0,0 +1,110 @@
+# apps/api/app/services/close_schedule.py
+#
+# TZ-режим закрытия дня: вместо полного прохода раз в минуту —
+# по одной cron-задаче на каждую IANA-таймзону пользователей,
+# срабатывающей в её локальную полночь (DST считает APScheduler).
+# Каждый запуск закрывает весь незакрытый диапазон (close_due_users), а
+# периодическая пересинхронизация добирает должников, оставшихся после
+# упавшего или пропущенного полуночного запуска, — не ждём следующей полуночи.
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from apscheduler.triggers.cron import CronTrigger
+
+from app.core.metrics import track_job
+from app.db import SessionLocal
+from app.repositories.auto_assign_repo import get_user_timezones
+from app.services.auto_assign import auto_assign_missed, auto_assign_timezone
+
+log = logging.getLogger("lifetracker.close_schedule")
+
+CLOSE_JOB_PREFIX = "close_tz:"
+# сколько можно опоздать с полуночным запуском (например, рестарт) и всё же выполнить
+CLOSE_MISFIRE_GRACE_SECONDS = 6 * 3600
+
+
+def _close_job_id(tz_name: str) -> str:
+    return f"{CLOSE_JOB_PREFIX}{tz_name}"
+
+
+def sync_close_jobs(scheduler, timezones: list[str]) -> list[str]:
+    """
+    Приводит набор cron-задач закрытия дня к списку таймзон пользователей.
+    Возвращает таймзоны, для которых задача только что добавлена.
+    """
+    wanted: dict[str, str] = {}
+    for tz_name in timezones:
+        try:
+            ZoneInfo(tz_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            log.warning("close_schedule: unknown timezone %r, skipped", tz_name)
+            continue
+        wanted[_close_job_id(tz_name)] = tz_name
+
+    existing = {
+        j.id for j in scheduler.get_jobs() if j.id.startswith(CLOSE_JOB_PREFIX)
+    }
+
+    for job_id in existing - wanted.keys():
+        scheduler.remove_job(job_id)
+
+    added: list[str] = []
+    for job_id in wanted.keys() - existing:
+        tz_name = wanted[job_id]
+        added.append(tz_name)
+        scheduler.add_job(
+            auto_assign_timezone,
+            trigger=CronTrigger(hour=0, minute=0, second=5, timezone=tz_name),
+            args=[tz_name],
+            id=job_id,
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            misfire_grace_time=CLOSE_MISFIRE_GRACE_SECONDS,
+        )
+    return added
+
+
+async def refresh_close_jobs(scheduler) -> None:
+    with track_job("close_tz_refresh"):
+        async with SessionLocal() as db:
+            timezones = await get_user_timezones(db)
+    sync_close_jobs(scheduler, timezones)
+    # страховка до пустого списка должников: новая таймзона уже за полночью,
+    # полуночный запуск упал или вышел за misfire_grace_time; без должников —
+    # один SELECT на таймзону, и тот по индексу (timezone, last_closed_date)
+    await auto_assign_missed()
+
+
+async def start_close_jobs(scheduler, refresh_minutes: int) -> None:
+    """
+    Регистрирует TZ-задачи до scheduler.start():
+    1) догон: один полный проход сразу после старта (всё, что пропущено за простой);
+    2) cron-задача на локальную полночь каждой таймзоны;
+    3) периодическая пересинхронизация списка таймзон (новые пользователи)
+       и добор всех, кто всё ещё не закрыт.
+    """
+    async with SessionLocal() as db:
+        timezones = await get_user_timezones(db)
+    sync_close_jobs(scheduler, timezones)
+
+    scheduler.add_job(
+        auto_assign_missed,
+        id="auto_assign_catchup",
+        next_run_time=datetime.now(timezone.utc),
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        refresh_close_jobs,
+        trigger="interval",
+        minutes=refresh_minutes,
+        args=[scheduler],
+        id="close_tz_refresh",
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1,
+    )
@@ -1,15 +1,34 @@
-from datetime import date, datetime, timezone
+from datetime import datetime
 from zoneinfo import ZoneInfo
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import DailyLog
-from app.schemas import DailyFlagSet
-from app.services.status import apply_single_flag
-from app.repositories.daily_log_crud_repo import (
-    get_user_challenge,
-    get_daily_log,
-    create_daily_log,
-)
+from app.schemas import DailyFlagSet, DailyFlagResult
+from app.services.challenge_analytics import invalidate_analytics
+from app.services.challenge_stats import record_log_writes
+from app.services.daily_summary import record_summary_writes
+from app.services.status import single_flag_values
+from app.services.today_service import invalidate_today
+from app.repositories.challenge_stats_repo import get_owned_challenge_state
+from app.repositories.daily_log_crud_repo import upsert_manual_daily_logs
+from app.repositories.users_repo import lock_user_writes
+
+
+def _manual_values(payload: DailyFlagSet) -> dict:
+    return {
+        **single_flag_values(payload.flag),
+        "minutes_fact": payload.minutes_fact,
+        "comment": payload.comment,
+    }
+
+
+def _stats_values(row: dict) -> tuple:
+    return (
+        row["flag_min"],
+        row["flag_bonus"],
+        row["flag_skip"],
+        row["flag_fail"],
+        row["minutes_fact"],
+    )
 
 
 async def upsert_daily_log(
@@ -17,30 +36,60 @@ async def upsert_daily_log(
     user,
     payload: DailyFlagSet,
 ) -> bool:
-    user_today = datetime.now(ZoneInfo(user.timezone)).date()
-    d = payload.date or user_today
-    user_id = user.id
+    # Любая ручная фиксация/правка = MANUAL, и если это не новая запись — фиксируем след правки
+    results = await upsert_daily_logs_batch(db, user, [payload])
+    return results[0].ok
 
-    ch = await get_user_challenge(db, payload.challenge_id, user_id)
-    if not ch:
-        return False
 
-    log = await get_daily_log(db, user_id, ch.id, d)
-    is_new = log is None
+async def upsert_daily_logs_batch(
+    db: AsyncSession,
+    user,
+    items: list[DailyFlagSet],
+) -> list[DailyFlagResult]:
+    """
+    Пачка отметок (в т.ч. за разные даты): блокировка записи пользователя,
+    один SELECT владения + счётчиков + прежних логов, executemany-upsert,
+    upsert счётчиков, дельты сводки дня, один commit.
+    Результат — по элементу, в порядке items.
+    Повтор (challenge_id, date) внутри пачки — побеждает последний.
+    """
+    user_today = datetime.now(ZoneInfo(user.timezone)).date()
+    user_id = user.id
+    keyed = [((item.challenge_id, item.date or user_today), item) for item in items]
 
-    if is_new:
-        log = DailyLog(user_id=user_id, challenge_id=ch.id, date=d)
-        await create_daily_log(db, log)
+    # до чтения счётчиков и прежних логов: параллельная запись того же
+    # пользователя ждёт нашего commit, и дельты считаются от свежих строк
+    await lock_user_writes(db, [user_id])
+    owned, old = await get_owned_challenge_state(db, user_id, [key for key, _ in keyed])
 
-    apply_single_flag(log, payload.flag)
-    log.minutes_fact = payload.minutes_fact
-    log.comment = payload.comment
+    results: list[DailyFlagResult] = []
+    rows: dict[tuple, dict] = {}
+    for (challenge_id, d), item in keyed:
+        if challenge_id not in owned:
+            results.append(
+                DailyFlagResult(
+                    challenge_id=challenge_id, date=d, ok=False, error="Challenge not found"
+                )
+            )
+            continue
+        rows[(challenge_id, d)] = {
+            "user_id": user_id,
+            "challenge_id": challenge_id,
+            "date": d,
+            **_manual_values(item),
+        }
+        results.append(DailyFlagResult(challenge_id=challenge_id, date=d, ok=True))
 
-    # Любая ручная фиксация/правка = MANUAL, и если это не новая запись — фиксируем след правки
-    log.origin = "MANUAL"
-    if not is_new:
-        log.edited_at = datetime.now(timezone.utc)
-        log.edited_origin = "MANUAL"
+    if rows:
+        await upsert_manual_daily_logs(db, list(rows.values()))
+        writes = [
+            (cid, user_id, d, old.get((cid, d)), _stats_values(row))
+            for (cid, d), row in rows.items()
+        ]
+        await record_log_writes(db, owned, writes)
+        await record_summary_writes(db, [w[1:] for w in writes])
+        await db.commit()
+        invalidate_today(user_id)
+        invalidate_analytics({cid for cid, _ in rows})
 
-    await db.commit()
-    return True
+    return results
@@ -0,0 +1,52 @@
+# apps/api/app/services/daily_summary.py
+#
+# Сводка дня (daily_summary) поддерживается дельтами в транзакции записи логов:
+# ручные upsert'ы (daily_log_service) и AUTO-пачки закрытия дня (auto_assign).
+# Дельта = новый лог минус прежний; складывает их БД (ON CONFLICT DO UPDATE),
+# поэтому параллельные записи одного дня не затирают друг друга. Прежний лог
+# читается под блокировкой записи пользователя (users_repo.lock_user_writes):
+# вторая отметка того же лога ждёт commit первой и видит её как old.
+# Проверка против daily_log — repositories/_db_check_repo.run_db_check.
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.daily_summary_repo import SUMMARY_COLUMNS, apply_summary_deltas
+from app.services.status import STATUS_COUNT_COLUMNS, status_from_flags
+
+
+def _add_log(delta: dict, values: tuple, sign: int) -> None:
+    """values: (flag_min, flag_bonus, flag_skip, flag_fail, minutes_fact)."""
+    delta["total"] += sign
+    column = STATUS_COUNT_COLUMNS.get(status_from_flags(*values[:4]))
+    if column:
+        delta[column] += sign
+    delta["minutes_total"] += sign * (values[4] or 0)
+
+
+def summary_deltas(writes: list[tuple]) -> list[dict]:
+    """
+    writes: (user_id, day, old, new); old=None — новый лог.
+    Дельты по (user_id, day), нулевые (правка комментария и т.п.) отброшены.
+    """
+    deltas: dict[tuple[int, date], dict] = {}
+    for user_id, day, old, new in writes:
+        delta = deltas.get((user_id, day))
+        if delta is None:
+            delta = deltas[(user_id, day)] = {
+                "user_id": user_id,
+                "date": day,
+                **{name: 0 for name in SUMMARY_COLUMNS},
+            }
+        if old is not None:
+            _add_log(delta, old, -1)
+        _add_log(delta, new, +1)
+    return [d for d in deltas.values() if any(d[name] for name in SUMMARY_COLUMNS)]
+
+
+async def record_summary_writes(db: AsyncSession, writes: list[tuple]) -> None:
+    """В транзакции вызывающего, ПОСЛЕ записи логов и под lock_user_writes; commit — за вызывающим."""
+    await apply_summary_deltas(db, summary_deltas(writes))
@@ -1,18 +1,17 @@
 from __future__ import annotations
 
-import asyncio
-import time
-import urllib.request
-import os
-import subprocess
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.models import User
+from app.core.cache import cache_stats
+from app.services.health_sampler import (
+    DEFAULT_TIMEZONE,
+    PUBLIC_API_URL,
+    HealthSampler,
+    health_sampler,
+)
+from app.services.scheduler_leader import SchedulerLeader, scheduler_leader
 
 
 @dataclass(frozen=True)
@@ -23,14 +22,15 @@ class DiagResult:
 
 async def build_diag_payload(
     *,
-    db: AsyncSession,
     telegram_init_data_header: str | None,
-    admin_telegram_id: int | None,
     scheduler: object | None,
+    sampler: HealthSampler = health_sampler,
+    leader: SchedulerLeader = scheduler_leader,
 ) -> DiagResult:
     """Build a minimal but canonical diagnostic snapshot.
 
-    Safe to call frequently. Must not mutate DB state.
+    Safe to call frequently: no I/O here, DB and public API results
+    come from the background sampler (each with its age).
     """
     timestamp_utc = (
         datetime.now(timezone.utc)
@@ -45,33 +45,17 @@ async def build_diag_payload(
     # --- auth context ---
     tg_state = "ABSENT" if telegram_init_data_header is None else "PRESENT"
 
-    # --- database ---
-    db_connected = False
-    db_error: str | None = None
-    admin_timezone = "Europe/Vilnius"
+    # --- database (последний сэмпл) ---
+    db_sample = sampler.database.snapshot()
+    db_connected = sampler.database.ok
+    admin_timezone = sampler.database.extra.get("admin_timezone") or DEFAULT_TIMEZONE
     admin_today: str | None = None
 
-    try:
-        if admin_telegram_id is not None:
-            q = await db.execute(select(User).where(User.telegram_id == admin_telegram_id))
-            admin_user = q.scalar_one_or_none()
-            if admin_user and admin_user.timezone:
-                admin_timezone = admin_user.timezone
-        else:
-            q = await db.execute(select(User).limit(1))
-            u = q.scalar_one_or_none()
-            if u and u.timezone:
-                admin_timezone = u.timezone
-
-        db_connected = True
-    except Exception as e:
-        db_error = f"{type(e).__name__}: {e}"
-
     # --- time ---
     try:
         admin_today = datetime.now(ZoneInfo(admin_timezone)).date().isoformat()
     except Exception:
-        admin_timezone = "Europe/Vilnius"
+        admin_timezone = DEFAULT_TIMEZONE
         admin_today = datetime.now(ZoneInfo(admin_timezone)).date().isoformat()
 
     # --- scheduler ---
@@ -86,69 +70,49 @@ async def build_diag_payload(
         scheduler_running = False
         job_ids = []
 
-    # --- public api health (stdlib only) ---
-    public_api_url = "https://api.lifetracker.site/api/health"
-    public_ok = False
-    public_latency_ms: int | None = None
-    public_error: str | None = None
-
-    def _probe(url: str) -> int:
-        req = urllib.request.Request(url, method="GET")
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            return int(getattr(resp, "status", 0) or 0)
-
-    try:
-        start = time.perf_counter()
-        status_code = await asyncio.to_thread(_probe, public_api_url)
-        public_latency_ms = int((time.perf_counter() - start) * 1000)
+    # планировщик живёт только у лидера: у остальных воркеров важно,
+    # что лидер вообще есть (аренда не истекла)
+    leader_state = leader.snapshot()
+    scheduler_ok = scheduler_running if leader.is_leader else leader_state["lease_alive"]
 
-        public_ok = status_code == 200
-        if not public_ok:
-            public_error = f"HTTP {status_code}"
-    except Exception as e:
-        public_error = f"{type(e).__name__}: {e}"
+    # --- public api health (последний сэмпл) ---
+    public_sample = sampler.public.snapshot()
+    public_ok = sampler.public.ok
 
     # --- overall status ---
     if not backend_alive or not db_connected:
         overall = "FAIL"
-    elif not scheduler_running or not public_ok:
+    elif not scheduler_ok or not public_ok:
         overall = "DEGRADED"
     else:
         overall = "OK"
 
-    # --- build/version ---
-    build = os.getenv("APP_BUILD")
-    if not build:
-        try:
-            build = (
-                subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.getcwd())
-                .decode("utf-8")
-                .strip()
-            )
-        except Exception:
-            build = "unknown"
-
     payload = {
         "status": overall,
         "timestamp_utc": timestamp_utc,
         "backend": {"alive": backend_alive},
-        "database": {"connected": db_connected, "error": db_error},
+        "database": {
+            "connected": db_connected,
+            "error": db_sample["error"],
+            "dialect": sampler.database.extra.get("dialect"),
+            "pragmas": sampler.database.extra.get("pragmas"),
+            "latency_ms": db_sample["latency_ms"],
+            "latency_window_ms": db_sample["latency_window_ms"],
+            "sampled_at": db_sample["sampled_at"],
+            "age_seconds": db_sample["age_seconds"],
+        },
         "time": {
             "server_utc": timestamp_utc,
             "admin_timezone": admin_timezone,
             "admin_today": admin_today,
         },
-        "scheduler": {"running": scheduler_running, "jobs": job_ids},
-        "public": {
-            "api_health_url": public_api_url,
-            "ok": public_ok,
-            "latency_ms": public_latency_ms,
-            "error": public_error,
-        },
+        "scheduler": {"running": scheduler_running, "jobs": job_ids, "leader": leader_state},
+        "public": {"api_health_url": PUBLIC_API_URL, **public_sample},
         "build": {
-            "app_build": build,
-        },        
+            "app_build": sampler.build,
+        },
         "auth": {"telegram_init_data": tg_state},
+        "caches": cache_stats(),
     }
 
     return DiagResult(status=overall, payload=payload)
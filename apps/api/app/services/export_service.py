@@ -0,0 +1,65 @@
+# apps/api/app/services/export_service.py
+#
+# Потоковый экспорт: генераторы отдают текст кусками по пачке строк курсора.
+# Сессия открывается внутри генератора — зависимость get_db закрывается
+# до того, как StreamingResponse начнёт читать тело.
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+
+from app.db import SessionLocal
+from app.repositories.export_repo import stream_user_logs
+from app.services.status import compute_status_view
+
+EXPORT_FIELDS = (
+    "date",
+    "challenge_id",
+    "challenge_title",
+    "status_view",
+    "origin",
+    "minutes_fact",
+    "comment",
+    "edited_at",
+)
+
+
+def _export_record(row) -> tuple:
+    return (
+        row.date.isoformat(),
+        row.challenge_id,
+        row.title,
+        compute_status_view(row),
+        row.origin,
+        row.minutes_fact,
+        row.comment,
+        row.edited_at.isoformat() if row.edited_at else None,
+    )
+
+
+async def export_ndjson(user_id: int) -> AsyncIterator[str]:
+    async with SessionLocal() as db:
+        async for partition in stream_user_logs(db, user_id):
+            yield "".join(
+                json.dumps(dict(zip(EXPORT_FIELDS, _export_record(row))), ensure_ascii=False)
+                + "\n"
+                for row in partition
+            )
+
+
+async def export_csv(user_id: int) -> AsyncIterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+
+    async with SessionLocal() as db:
+        async for partition in stream_user_logs(db, user_id):
+            writer.writerows(_export_record(row) for row in partition)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+
+    # пустая история — только заголовок
+    if buf.tell():
+        yield buf.getvalue()
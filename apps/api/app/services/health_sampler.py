@@ -0,0 +1,188 @@
+# apps/api/app/services/health_sampler.py
+#
+# Фоновый сэмплер для /diag: БД и публичный API опрашиваются задачей
+# раз в interval, а не на каждом запросе. /diag отдаёт готовый снимок
+# (+ возраст каждого сэмпла и перцентили задержки по скользящему окну).
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import time
+import urllib.request
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+from app.db import SessionLocal
+from app.models import User
+from app.repositories._sqlite_pragmas import get_sqlite_pragmas
+from app.settings import settings
+
+PUBLIC_API_URL = "https://api.lifetracker.site/api/health"
+PUBLIC_PROBE_TIMEOUT_SECONDS = 5
+DEFAULT_TIMEZONE = "Europe/Vilnius"
+
+
+def resolve_build() -> str:
+    """APP_BUILD или короткий git-хэш; вызывается один раз на процесс."""
+    build = os.getenv("APP_BUILD")
+    if build:
+        return build
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=os.getcwd(),
+                stderr=subprocess.DEVNULL,
+            )
+            .decode("utf-8")
+            .strip()
+        )
+    except Exception:
+        return "unknown"
+
+
+def latency_percentiles(samples_ms, ndigits: int | None = None) -> dict:
+    """Nearest-rank p50/p95/p99 по окну; пустое окно — None. ndigits — округление (бенчи)."""
+    values = sorted(samples_ms)
+    if not values:
+        return {"n": 0, "p50": None, "p95": None, "p99": None, "max": None}
+
+    def pick(p: float) -> float:
+        value = values[min(len(values) - 1, int(p * len(values)))]
+        return value if ndigits is None else round(value, ndigits)
+
+    return {
+        "n": len(values),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": pick(1.0),
+    }
+
+
+def _utc_iso(ts: datetime | None) -> str | None:
+    if ts is None:
+        return None
+    return ts.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+class Sample:
+    """Последний результат одной пробы + окно задержек."""
+
+    def __init__(self, window: int):
+        self.ok = False
+        self.error: str | None = None
+        self.latency_ms: float | None = None
+        self.sampled_at: datetime | None = None
+        self._sampled_mono: float | None = None
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.extra: dict = {}
+
+    def record(self, ok: bool, latency_ms: float | None, error: str | None = None) -> None:
+        self.ok = ok
+        self.error = error
+        self.latency_ms = latency_ms
+        self.sampled_at = datetime.now(timezone.utc)
+        self._sampled_mono = time.monotonic()
+        if latency_ms is not None:
+            self.latencies.append(latency_ms)
+
+    def age_seconds(self) -> float | None:
+        if self._sampled_mono is None:
+            return None
+        return round(time.monotonic() - self._sampled_mono, 3)
+
+    def snapshot(self) -> dict:
+        return {
+            "ok": self.ok,
+            "error": self.error,
+            "latency_ms": self.latency_ms,
+            "latency_window_ms": latency_percentiles(self.latencies),
+            "sampled_at": _utc_iso(self.sampled_at),
+            "age_seconds": self.age_seconds(),
+        }
+
+
+class HealthSampler:
+    def __init__(self, interval_seconds: float, window: int):
+        self.interval_seconds = interval_seconds
+        self.build = "unknown"
+        self.database = Sample(window)
+        self.public = Sample(window)
+        self.admin_telegram_id: int | None = None
+        self._task: asyncio.Task | None = None
+
+    async def sample_database(self) -> None:
+        start = time.perf_counter()
+        try:
+            async with SessionLocal() as db:
+                stmt = select(User.timezone)
+                if self.admin_telegram_id is not None:
+                    stmt = stmt.where(User.telegram_id == self.admin_telegram_id)
+                admin_timezone = (await db.execute(stmt.limit(1))).scalar_one_or_none()
+
+                dialect = db.get_bind().dialect.name
+                # эффективные PRAGMA (то, что реально применилось на соединении)
+                pragmas = await get_sqlite_pragmas(db) if dialect == "sqlite" else None
+
+            self.database.extra = {
+                "dialect": dialect,
+                "pragmas": pragmas,
+                "admin_timezone": admin_timezone or DEFAULT_TIMEZONE,
+            }
+            self.database.record(True, round((time.perf_counter() - start) * 1000, 2))
+        except Exception as e:
+            self.database.record(False, None, f"{type(e).__name__}: {e}")
+
+    async def sample_public(self) -> None:
+        def _probe(url: str) -> int:
+            req = urllib.request.Request(url, method="GET")
+            with urllib.request.urlopen(req, timeout=PUBLIC_PROBE_TIMEOUT_SECONDS) as resp:
+                return int(getattr(resp, "status", 0) or 0)
+
+        start = time.perf_counter()
+        try:
+            status_code = await asyncio.to_thread(_probe, PUBLIC_API_URL)
+            latency_ms = round((time.perf_counter() - start) * 1000, 2)
+            ok = status_code == 200
+            self.public.record(ok, latency_ms, None if ok else f"HTTP {status_code}")
+        except Exception as e:
+            self.public.record(False, None, f"{type(e).__name__}: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await self.sample_public()
+            await asyncio.sleep(self.interval_seconds)
+            await self.sample_database()
+
+    async def start(self, admin_telegram_id: int | None = None) -> None:
+        """
+        Build — один раз; первый сэмпл БД — сразу (быстрый),
+        публичный API — уже в фоне (до 5 с таймаута не держат старт).
+        """
+        if self._task is not None:
+            return
+        self.admin_telegram_id = admin_telegram_id
+        self.build = await asyncio.to_thread(resolve_build)
+        await self.sample_database()
+        self._task = asyncio.create_task(self._run(), name="health_sampler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+health_sampler = HealthSampler(
+    interval_seconds=settings.diag_sample_interval_seconds,
+    window=settings.diag_latency_window,
+)
@@ -0,0 +1,166 @@
+# apps/api/app/services/heatmap.py
+#
+# Годовая тепловая карта: по байту на день года (индекс = день года - 1).
+#   status — 0 нет логов, 1 MIN, 2 BONUS, 3 SKIP, 4 FAIL; по всем челленджам —
+#            "худший" статус дня, приоритет как у status_view (FAIL > SKIP > BONUS > MIN);
+#   ratio  — выполнено, %: (MIN + BONUS) / (MIN + BONUS + FAIL), округление к ближнему;
+#            255 — оценивать нечего (нет логов или только SKIP).
+# Оба массива уходят base64-строками: ~1 КБ на год вместо 365 словарей.
+#
+# Считается векторно на NumPy; numpy — необязательная зависимость (на сервере
+# её может не быть), без неё тот же результат байт-в-байт даёт цикл на Python.
+
+from __future__ import annotations
+
+import base64
+from datetime import date
+from itertools import chain
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.history_repo import (
+    get_challenge_flags_between,
+    get_summary_counts_between,
+)
+from app.services.status import status_from_flags
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HEATMAP_ENCODING = "base64:uint8"
+RATIO_NONE = 255
+
+# код статуса в массиве status
+STATUS_CODES = {None: 0, "MIN": 1, "BONUS": 2, "SKIP": 3, "FAIL": 4}
+
+# код по четырём битам (min | bonus << 1 | skip << 2 | fail << 3) — таблица из
+# status_from_flags: приоритет статусов не повторяется в кодировщиках
+CODE_BY_FLAG_BITS = bytes(
+    STATUS_CODES[status_from_flags(bits & 1, bits & 2, bits & 4, bits & 8)] for bits in range(16)
+)
+
+
+def _ratio_percent(done: int, rated: int) -> int:
+    # целочисленное round-half-up: одинаково в обеих реализациях
+    return (done * 200 + rated) // (2 * rated)
+
+
+# строки на входе: (день года 1..366, ...) — индекс считает БД, без объектов date
+
+
+# --- чистый Python ---------------------------------------------------------
+
+
+def _encode_counts_py(rows, days: int) -> tuple[bytes, bytes]:
+    """rows: (doy, count_min, count_bonus, count_skip, count_fail)."""
+    status = bytearray(days)
+    ratio = bytearray([RATIO_NONE]) * days
+    for doy, c_min, c_bonus, c_skip, c_fail in rows:
+        i = doy - 1
+        status[i] = STATUS_CODES[status_from_flags(c_min, c_bonus, c_skip, c_fail)]
+        done = c_min + c_bonus
+        if done + c_fail:
+            ratio[i] = _ratio_percent(done, done + c_fail)
+    return bytes(status), bytes(ratio)
+
+
+def _encode_flags_py(rows, days: int) -> tuple[bytes, bytes]:
+    """rows: (doy, flag_min, flag_bonus, flag_skip, flag_fail)."""
+    status = bytearray(days)
+    ratio = bytearray([RATIO_NONE]) * days
+    for doy, *flags in rows:
+        code = STATUS_CODES[status_from_flags(*flags)]
+        status[doy - 1] = code
+        if code in (1, 2):
+            ratio[doy - 1] = 100
+        elif code == 4:
+            ratio[doy - 1] = 0
+    return bytes(status), bytes(ratio)
+
+
+# --- NumPy -------------------------------------------------------------------
+
+
+def _columns_np(rows):
+    # один проход по кортежам в плоский int64-буфер — без промежуточных списков
+    flat = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 5)
+    doy, *values = flat.reshape(-1, 5).T
+    return doy - 1, values
+
+
+def _codes_np(v_min, v_bonus, v_skip, v_fail):
+    bits = (v_min > 0) * 1 + (v_bonus > 0) * 2 + (v_skip > 0) * 4 + (v_fail > 0) * 8
+    return np.frombuffer(CODE_BY_FLAG_BITS, dtype=np.uint8)[bits]
+
+
+def _scatter_np(index, codes, done, rated, days: int) -> tuple[bytes, bytes]:
+    status = np.zeros(days, dtype=np.uint8)
+    status[index] = codes
+    ratio = np.full(days, RATIO_NONE, dtype=np.uint8)
+    mask = rated > 0
+    ratio[index[mask]] = (done[mask] * 200 + rated[mask]) // (2 * rated[mask])
+    return status.tobytes(), ratio.tobytes()
+
+
+def _encode_counts_np(rows, days: int) -> tuple[bytes, bytes]:
+    if not rows:
+        return _encode_counts_py(rows, days)
+    index, (c_min, c_bonus, c_skip, c_fail) = _columns_np(rows)
+    codes = _codes_np(c_min, c_bonus, c_skip, c_fail)
+    done = c_min + c_bonus
+    return _scatter_np(index, codes, done, done + c_fail, days)
+
+
+def _encode_flags_np(rows, days: int) -> tuple[bytes, bytes]:
+    if not rows:
+        return _encode_flags_py(rows, days)
+    index, (f_min, f_bonus, f_skip, f_fail) = _columns_np(rows)
+    codes = _codes_np(f_min, f_bonus, f_skip, f_fail)
+    done = ((codes == 1) | (codes == 2)).astype(np.int64)
+    return _scatter_np(index, codes, done, done + (codes == 4), days)
+
+
+if np is not None:
+    encode_counts, encode_flags = _encode_counts_np, _encode_flags_np
+else:
+    encode_counts, encode_flags = _encode_counts_py, _encode_flags_py
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii")
+
+
+async def build_heatmap(
+    db: AsyncSession,
+    user_id: int,
+    year: int,
+    challenge_id: int | None = None,
+) -> dict | None:
+    """
+    Без challenge_id — по всем челленджам (строки daily_summary, <= 366 штук);
+    с ним — флаги логов одного челленджа. Оба запроса отдают кортежи int/bool.
+    None — челлендж не найден/не принадлежит пользователю.
+    """
+    start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    days = (end - start).days
+
+    if challenge_id is None:
+        rows = await get_summary_counts_between(db, user_id, start, end)
+        status, ratio = encode_counts(rows, days)
+    else:
+        rows = await get_challenge_flags_between(db, user_id, challenge_id, start, end)
+        if rows is None:
+            return None
+        status, ratio = encode_flags(rows, days)
+
+    return {
+        "year": year,
+        "challenge_id": challenge_id,
+        "start": start.isoformat(),
+        "days": days,
+        "encoding": HEATMAP_ENCODING,
+        "status": _b64(status),
+        "ratio": _b64(ratio),
+    }
@@ -1,9 +1,11 @@
 from datetime import date, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
-
-from app.repositories.history_repo import get_challenge_logs_since, get_day_logs
-from app.services.status import compute_status_view
+from app.repositories.history_repo import (
+    get_days_counts,
+    has_logs_before,
+)
+from app.repositories.views_repo import get_challenge_history_rows, get_day_detail_rows
 
 
 async def build_challenge_history(
@@ -14,98 +16,68 @@ async def build_challenge_history(
 ) -> dict:
     since = date.today() - timedelta(days=days - 1)
 
-    logs = await get_challenge_logs_since(db, user_id, challenge_id, since)
-    logs = logs or []
+    rows = await get_challenge_history_rows(db, user_id, challenge_id, since)
 
     out = []
-    for log in logs:
+    for day, status_view, minutes_fact, comment in rows:
         out.append(
             {
-                "date": str(log.date),
-                "status_view": compute_status_view(log),
-                "minutes_fact": log.minutes_fact,
-                "comment": log.comment,
+                "date": str(day),
+                "status_view": status_view,
+                "minutes_fact": minutes_fact,
+                "comment": comment,
             }
         )
 
     return {"challenge_id": challenge_id, "items": out}
 
-from collections import defaultdict
-from app.repositories.history_repo import get_challenge_logs_since
-
-
 async def build_days_history(
     db: AsyncSession,
     user_id: int,
     days: int = 30,
-) -> list[dict]:
+    before: date | None = None,
+    today: date | None = None,
+) -> tuple[list[dict], date | None]:
     """
     Агрегированная история по дням.
-    Возвращает только дни, где были логи.
+    Возвращает только дни, где были логи, в окне из `days` дней
+    (до `before`, не включая; без `before` — последние `days` дней по `today`
+    включительно, плюс уже записанные будущие дни),
+    и курсор для следующей страницы (None — старше данных нет).
+    `today` — локальная дата пользователя (роутер), без неё — дата сервера.
     """
-    from sqlalchemy import select
-    from app.models import DailyLog
-
-    q = await db.execute(
-        select(DailyLog)
-        .where(DailyLog.user_id == user_id)
-        .order_by(DailyLog.date.desc())
-    )
-    logs = q.scalars().all()
-
-
-    by_day: dict[str, list] = defaultdict(list)
-
-    for log in logs:
-        by_day[str(log.date)].append(log)
-
-    result = []
-
-    for day, items in sorted(by_day.items(), reverse=True):
-        total = len(items)
-
-        min_cnt = 0
-        bonus_cnt = 0
-        skip_cnt = 0
-        fail_cnt = 0
-
-        for log in items:
-            view = compute_status_view(log)
-
-            if view == "MIN":
-                min_cnt += 1
-            elif view == "BONUS":
-                bonus_cnt += 1
-            elif view == "SKIP":
-                skip_cnt += 1
-            elif view == "FAIL":
-                fail_cnt += 1
-
-        result.append(
-            {
-                "date": day,
-                "total": total,
-                "min": min_cnt,
-                "bonus": bonus_cnt,
-                "skip": skip_cnt,
-                "fail": fail_cnt,
-            }
-        )
-
-    return result
+    days = max(days, 1)
+    end = before or ((today or date.today()) + timedelta(days=1))
+    since = end - timedelta(days=days)
+
+    rows = await get_days_counts(db, user_id, since, before)
+    result = [
+        {
+            "date": str(r.date),
+            "total": r.total,
+            "min": r.min,
+            "bonus": r.bonus,
+            "skip": r.skip,
+            "fail": r.fail,
+        }
+        for r in rows
+    ]
+
+    next_before = since if await has_logs_before(db, user_id, since) else None
+    return result, next_before
 
 async def build_day_detail(db: AsyncSession, user_id: int, day: date) -> dict:
-    rows = await get_day_logs(db, user_id, day)
+    rows = await get_day_detail_rows(db, user_id, day)
 
     items = []
-    for log, title in rows:
+    for challenge_id, title, status_view, minutes_fact, comment in rows:
         items.append(
             {
-                "challenge_id": log.challenge_id,
+                "challenge_id": challenge_id,
                 "title": title,
-                "status_view": compute_status_view(log),
-                "minutes_fact": log.minutes_fact,
-                "comment": log.comment,
+                "status_view": status_view,
+                "minutes_fact": minutes_fact,
+                "comment": comment,
             }
         )
 
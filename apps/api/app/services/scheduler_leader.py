@@ -0,0 +1,169 @@
+# apps/api/app/services/scheduler_leader.py
+#
+# Один планировщик на все воркеры (uvicorn --workers / gunicorn): аренда
+# строки scheduler_lease. Каждый воркер раз в renew-интервал пытается взять
+# или продлить её (repositories/scheduler_lease_repo); держатель запускает
+# AsyncIOScheduler, потерявший аренду — останавливает свой.
+# Упавший лидер перестаёт продлевать — через ttl аренду забирает другой
+# воркер (и первым делом делает догон закрытия дня); штатная остановка
+# отдаёт аренду сразу.
+# Задачи идемпотентны (ON CONFLICT DO NOTHING, пересчёты), поэтому короткое
+# перекрытие двух лидеров (например, event loop завис дольше ttl) безопасно.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import secrets
+import socket
+from datetime import datetime, timedelta, timezone
+
+from app.db import SessionLocal
+from app.repositories.scheduler_lease_repo import get_lease, release_lease, try_acquire_lease
+from app.settings import settings
+
+log = logging.getLogger("lifetracker.scheduler_leader")
+
+LEASE_NAME = "scheduler"
+
+
+def worker_id() -> str:
+    # токен: перезапуск с тем же pid (pid 1 в контейнере) — уже другой воркер
+    return f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(3)}"
+
+
+def _as_utc(ts: datetime | None) -> datetime | None:
+    # SQLite отдаёт наивное время (пишем всегда UTC)
+    if ts is None or ts.tzinfo is not None:
+        return ts
+    return ts.replace(tzinfo=timezone.utc)
+
+
+def _utc_iso(ts: datetime | None) -> str | None:
+    if ts is None:
+        return None
+    return ts.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+class SchedulerLeader:
+    def __init__(self, ttl_seconds: float, renew_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.renew_seconds = renew_seconds
+        self.worker = worker_id()
+        self.is_leader = False
+        # до какого момента аренда точно наша (по последнему успешному продлению)
+        self.expires_at: datetime | None = None
+        # последняя увиденная строка аренды: holder/acquired_at/expires_at
+        self.lease: dict | None = None
+        self.checked_at: datetime | None = None
+        self.error: str | None = None
+        self._on_acquire = None
+        self._on_release = None
+        self._task: asyncio.Task | None = None
+
+    async def tick(self) -> None:
+        now = datetime.now(timezone.utc)
+        try:
+            async with SessionLocal() as db:
+                won = await try_acquire_lease(
+                    db, LEASE_NAME, self.worker, now, now + timedelta(seconds=self.ttl_seconds)
+                )
+                await db.commit()
+                row = await get_lease(db, LEASE_NAME)
+            self.error = None
+            if won:
+                self.expires_at = now + timedelta(seconds=self.ttl_seconds)
+            self.lease = row and {
+                "holder": row.holder,
+                "acquired_at": _as_utc(row.acquired_at),
+                "expires_at": _as_utc(row.expires_at),
+            }
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            log.warning("scheduler lease check failed: %s", self.error)
+            # без БД лидер работает до конца уже продлённой аренды
+            won = self.is_leader and self.expires_at is not None and now < self.expires_at
+        self.checked_at = now
+
+        if won and not self.is_leader:
+            await self._promote()
+        elif not won and self.is_leader:
+            await self._demote()
+
+    async def _promote(self) -> None:
+        log.info("scheduler lease acquired by %s", self.worker)
+        self.is_leader = True
+        try:
+            await self._on_acquire()
+        except Exception:
+            # аренда остаётся нашей — следующий tick попробует снова
+            log.exception("scheduler start failed")
+            self.is_leader = False
+
+    async def _demote(self) -> None:
+        holder = self.lease["holder"] if self.lease else None
+        log.warning("scheduler lease lost by %s (holder now %s)", self.worker, holder)
+        self.is_leader = False
+        await self._on_release()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.renew_seconds)
+            await self.tick()
+
+    async def start(self, on_acquire, on_release) -> None:
+        """
+        on_acquire/on_release — async-колбэки запуска/остановки планировщика.
+        Первая попытка — сразу: одиночный воркер стартует с планировщиком, как раньше.
+        """
+        if self._task is not None:
+            return
+        self._on_acquire = on_acquire
+        self._on_release = on_release
+        await self.tick()
+        self._task = asyncio.create_task(self._run(), name="scheduler_leader")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self.is_leader:
+            self.is_leader = False
+            await self._on_release()
+            # отдаём аренду сразу, не дожидаясь ttl
+            try:
+                async with SessionLocal() as db:
+                    await release_lease(db, LEASE_NAME, self.worker)
+                    await db.commit()
+            except Exception as e:
+                log.warning("scheduler lease release failed: %s: %s", type(e).__name__, e)
+
+    def snapshot(self) -> dict:
+        lease = self.lease or {}
+        expires_at = lease.get("expires_at")
+        return {
+            "worker": self.worker,
+            "is_leader": self.is_leader,
+            "holder": lease.get("holder"),
+            "acquired_at": _utc_iso(lease.get("acquired_at")),
+            "expires_at": _utc_iso(expires_at),
+            # есть ли живой лидер (этот или другой воркер) по последней проверке
+            "lease_alive": expires_at is not None
+            and self.checked_at is not None
+            and expires_at > self.checked_at,
+            "checked_at": _utc_iso(self.checked_at),
+            "error": self.error,
+        }
+
+
+scheduler_leader = SchedulerLeader(
+    ttl_seconds=settings.scheduler_lease_ttl_seconds,
+    renew_seconds=settings.scheduler_lease_renew_seconds,
+)
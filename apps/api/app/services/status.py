@@ -2,30 +2,36 @@
 
 from __future__ import annotations
 
-def compute_status_view(log):
-    if log is None:
-        return None
-    if log.flag_fail:
+def status_from_flags(flag_min, flag_bonus, flag_skip, flag_fail):
+    # приоритет FAIL > SKIP > BONUS > MIN — единственная копия в Python;
+    # SQL-зеркало — history_repo.status_view_case
+    if flag_fail:
         return "FAIL"
-    if log.flag_skip:
+    if flag_skip:
         return "SKIP"
-    if log.flag_bonus:
+    if flag_bonus:
         return "BONUS"
-    if log.flag_min:
+    if flag_min:
         return "MIN"
     return None
 
-def apply_single_flag(log, flag: str):
-    log.flag_min = False
-    log.flag_bonus = False
-    log.flag_skip = False
-    log.flag_fail = False
+def compute_status_view(log):
+    if log is None:
+        return None
+    return status_from_flags(log.flag_min, log.flag_bonus, log.flag_skip, log.flag_fail)
+
+# статус -> колонка счётчика в challenge_stats / daily_summary
+STATUS_COUNT_COLUMNS = {
+    "MIN": "count_min",
+    "BONUS": "count_bonus",
+    "SKIP": "count_skip",
+    "FAIL": "count_fail",
+}
 
-    if flag == "MIN":
-        log.flag_min = True
-    elif flag == "BONUS":
-        log.flag_bonus = True
-    elif flag == "SKIP":
-        log.flag_skip = True
-    elif flag == "FAIL":
-        log.flag_fail = True
+def single_flag_values(flag: str) -> dict:
+    return {
+        "flag_min": flag == "MIN",
+        "flag_bonus": flag == "BONUS",
+        "flag_skip": flag == "SKIP",
+        "flag_fail": flag == "FAIL",
+    }
@@ -7,6 +7,7 @@ from app.repositories.templates_repo import (
     get_template_by_id,
     create_challenge_from_template,
 )
+from app.services.today_service import invalidate_today
 
 
 async def list_templates(db: AsyncSession) -> list[dict]:
@@ -31,4 +32,5 @@ async def add_template_to_user(
     if not t:
         return 0
     ch = await create_challenge_from_template(db, user_id, t)
+    invalidate_today(user_id)
     return ch.id
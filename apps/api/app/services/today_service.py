@@ -1,30 +1,57 @@
 # apps/api/app/services/today_service.py
+#
+# /today кэшируется на (user_id, local date). Запись в своём воркере
+# сбрасывает кэш сразу; записи других воркеров (и AUTO-закрытие у лидера
+# планировщика) ловит сверка версии (views_repo.get_today_version) —
+# один агрегатный SELECT на попадание вместо JOIN'а и сборки.
 
 from datetime import date
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
 from app.schemas import TodayItem
-from app.services.status import compute_status_view
-from app.repositories.challenges_repo import get_active_user_challenges
-from app.repositories.daily_logs_repo import get_daily_log_for_date
+from app.settings import settings
+from app.repositories.views_repo import get_today_rows, get_today_version
+
+
+# (user_id, local date) -> (версия, готовый dict /today)
+today_cache = TTLCache(
+    "today",
+    maxsize=settings.today_cache_max_entries,
+    ttl_seconds=settings.today_cache_ttl_seconds,
+)
+
+
+def invalidate_today(user_id: int) -> None:
+    """Вызывать после commit любой записи, меняющей /today пользователя."""
+    today_cache.invalidate_group(user_id)
+
+
+async def get_today_view(db, user, day: date) -> dict:
+    key = (user.id, day)
+    # last_closed_date входит в ответ (is_day_closed)
+    version = (user.last_closed_date, await get_today_version(db, user.id, day))
+    entry = today_cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    out = await build_today_view(db, user, day)
+    today_cache.set(key, (version, out))
+    return out
 
 
 async def build_today_view(db, user, day: date):
     is_day_closed = user.last_closed_date == day
-    challenges = await get_active_user_challenges(db, user.id)
+    rows = await get_today_rows(db, user.id, day)
 
     items: list[dict] = []
     first_uncompleted: dict | None = None
 
-    for ch in challenges:
-        log = await get_daily_log_for_date(db, user.id, ch.id, day)
-        status_view = compute_status_view(log)
-
+    for challenge_id, title, type_, status_view in rows:
         item = {
-            "challenge_id": ch.id,
-            "title": ch.title,
-            "type": ch.type,
+            "challenge_id": challenge_id,
+            "title": title,
+            "type": type_,
             "status_view": status_view,
         }
         items.append(item)
@@ -3,6 +3,22 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     app_name: str = "Life-Tracker API"
     database_url: str = "sqlite+aiosqlite:///./life_tracker.db"
+    # PostgreSQL (postgresql+asyncpg://...): пул соединений на воркер
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 10
+    db_pool_recycle_seconds: int = 1800
+    # кэш подготовленных statement'ов asyncpg (0 — для pgbouncer в transaction mode)
+    db_statement_cache_size: int = 500
+
+    # Логи: JSON по строке через очередь и фоновый поток ("JSON" | "TEXT")
+    log_format: str = "JSON"
+    log_level: str = "INFO"
+    # переполнение очереди — запись теряется, запрос не ждёт
+    log_queue_size: int = 10000
+    # прореживание INFO/DEBUG: логгер -> пропускать каждую N-ю запись
+    # (env: LOG_SAMPLE_EVERY='{"lifetracker.initdata": 100}')
+    log_sample_every: dict[str, int] = {"lifetracker.initdata": 100}
 
     # Режим авторизации
     auth_mode: str = "DEV"  # "DEV" | "PROD"
@@ -17,5 +33,48 @@ class Settings(BaseSettings):
 
     # /diag secret (required in PROD)
     diag_token: str | None = None
+    # /diag отдаёт снимок фонового сэмплера: период опроса БД/публичного API
+    # и размер окна задержек для перцентилей (в сэмплах)
+    diag_sample_interval_seconds: int = 30
+    diag_latency_window: int = 120
+
+    # Закрытие дня: "TZ" — по локальной полуночи каждой таймзоны,
+    # "INTERVAL" — полный проход раз в минуту (старый режим)
+    close_schedule_mode: str = "TZ"
+    # как часто подхватываем новые таймзоны и добираем незакрытых (TZ-режим)
+    close_tz_refresh_minutes: int = 10
+    # Планировщик работает в одном воркере: аренда в БД (scheduler_lease).
+    # Лидер продлевает её каждые renew секунд; не продлённую за ttl забирает
+    # другой воркер (ttl — верхняя граница паузы задач при падении лидера).
+    scheduler_lease_ttl_seconds: int = 30
+    scheduler_lease_renew_seconds: int = 10
+
+    # Кэш /today (на процесс): сбрасывается записью в своём воркере, записи
+    # других воркеров ловит сверка версии (челленджи + daily_summary дня);
+    # TTL только ограничивает память
+    today_cache_ttl_seconds: int = 300
+    today_cache_max_entries: int = 4096
+    # Кэш /challenges/{id}/analytics: сбрасывается записью логов челленджа
+    # (в своём воркере), записи других воркеров ловит сверка версии
+    # (challenge_stats); TTL только ограничивает память
+    analytics_cache_ttl_seconds: int = 300
+    analytics_cache_max_entries: int = 4096
+
+    # Кэш проверенного initData: запись живёт до auth_date + max_age
+    init_data_cache_max_entries: int = 4096
+    init_data_cache_max_age_seconds: int = 24 * 3600
+    # Кэш telegram_id -> users.id (строка users читается в каждом запросе по PK)
+    user_cache_ttl_seconds: int = 300
+    user_cache_max_entries: int = 4096
+
+    # SQLite: PRAGMA-профиль на каждое соединение ("PROD" | "OFF").
+    # WAL — читатели /today и /history не ждут записи планировщика.
+    sqlite_profile: str = "PROD"
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size: int = -64 * 1024  # отрицательное = KiB (64 MiB)
+    sqlite_temp_store: str = "MEMORY"
 
 settings = Settings()
\ No newline at end of file